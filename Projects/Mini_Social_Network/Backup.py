@@ -0,0 +1,357 @@
+"""
+Backup.py – incremental, content-addressed backups of Data/
+
+    python Backup.py backup                      # new snapshot in Backups/
+    python Backup.py list
+    python Backup.py restore 20260918-031500     # stop the app first
+    python Backup.py restore latest --to /tmp/restored
+    python Backup.py verify                      # re-hash every stored chunk
+    python Backup.py prune --keep 7              # drop old snapshots + chunks nobody uses
+
+Day-15/checking.py:file_hash reads a whole file and MD5s it. Here every file is
+read in BLOCK_SIZE pieces and cut into chunks, each chunk is hashed with BLAKE2b
+(hashlib, faster than MD5 on 64-bit machines) and stored ONCE under its hash:
+    Backups/chunks/3f/3fa9...   zlib-compressed chunk
+    Backups/snapshots/<time>.json  {"files": {path: {"size", "mtime_ns", "chunks": [hash, ...]}}}
+A chunk that is already there is not written again, so a snapshot costs only
+the bytes that changed since the last one. Files whose size and mtime didn't
+change reuse the previous snapshot's chunk list without being read at all.
+
+Where to cut: a file is cut after a line whose last WINDOW bytes have a CRC
+with the low bits all zero (about every 2^MASK_BITS lines, but never before
+MIN_CHUNK, always by MAX_CHUNK bytes). The cut points depend on the content,
+not on the offset, so a post inserted into users.json or posts.json changes one
+or two chunks instead of shifting every chunk after it. Binary files (few
+newlines) are simply cut every MAX_CHUNK bytes, they change in place.
+
+Consistency: a store and its journal (posts.json + posts.log) are read while
+holding the store's write lock (Write_Coordinator.FileLock), so a compaction
+can't happen in between. The SQLite database is copied with sqlite3's backup
+API. Derived data (timelines, search index, suggestions) is not backed up, it
+is rebuilt on first use after a restore.
+The snapshot manifest is written last: a backup that crashes halfway leaves
+only unused chunks (removed by prune), never a broken snapshot.
+"""
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zlib
+from contextlib import nullcontext
+
+from Storage import DATA_DIR
+from Write_Coordinator import FileLock
+
+BACKUP_DIR = os.path.join(os.path.dirname(os.path.abspath(DATA_DIR)), "Backups")
+BLOCK_SIZE = 4 * 1024 * 1024  # bytes read at once
+MIN_CHUNK = 16 * 1024
+MAX_CHUNK = 256 * 1024
+MASK_BITS = 9                 # a cut about every 512 lines past MIN_CHUNK
+WINDOW = 32                   # bytes before the newline that decide a cut
+HASH_SIZE = 20                # bytes of BLAKE2b digest
+
+# Rebuilt from the real data on first use, not worth backing up
+DERIVED = ("timelines", "search.", "suggestions.")
+SKIPPED_SUFFIXES = (".lock", ".tmp", "-wal", "-shm", "-journal")
+SQLITE_FILES = ("social.db",)
+
+
+def chunk_hash(data):
+    return hashlib.blake2b(data, digest_size=HASH_SIZE).hexdigest()
+
+
+def iter_chunks(file, block_size=BLOCK_SIZE):
+    """Yield content-defined chunks (bytes) of an open binary file."""
+    mask = (1 << MASK_BITS) - 1
+    crc32 = zlib.crc32
+    buf, pos, eof = b"", 0, False
+    while True:
+        if not eof and len(buf) - pos < MAX_CHUNK:
+            block = file.read(block_size)
+            eof = not block
+            buf = buf[pos:] + block  # NOTE: one copy per block, not per chunk
+            pos = 0
+            continue
+        if pos == len(buf):
+            return
+        # bytes.find and crc32 run in C, Python only loops once per candidate line
+        limit = min(len(buf), pos + MAX_CHUNK)
+        cut = limit
+        view = memoryview(buf)
+        newline = buf.find(b"\n", pos + MIN_CHUNK - 1, limit)
+        while newline != -1:
+            if crc32(view[newline - WINDOW:newline]) & mask == 0:
+                cut = newline + 1
+                break
+            newline = buf.find(b"\n", newline + 1, limit)
+        view.release()
+        yield buf[pos:cut]
+        pos = cut
+
+
+class ChunkStore:
+    """chunks/<2 hex>/<hash>, each written once (temp file + os.replace)."""
+
+    def __init__(self, root):
+        self.root = os.path.join(root, "chunks")
+
+    def path(self, digest):
+        return os.path.join(self.root, digest[:2], digest)
+
+    def has(self, digest):
+        return os.path.exists(self.path(digest))
+
+    def put(self, data):
+        """Store a chunk if it's new. Returns (hash, bytes written)."""
+        digest = chunk_hash(data)
+        path = self.path(digest)
+        if os.path.exists(path):
+            return digest, 0
+        packed = zlib.compress(data, 1)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, "wb") as file:
+            file.write(packed)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp, path)
+        return digest, len(packed)
+
+    def get(self, digest):
+        """The chunk's bytes, checked against its hash."""
+        with open(self.path(digest), "rb") as file:
+            data = zlib.decompress(file.read())
+        if chunk_hash(data) != digest:
+            raise ValueError(f"chunk {digest} is corrupt")
+        return data
+
+    def all(self):
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if not name.endswith(".tmp"):
+                    yield name
+
+
+class Backups:
+    def __init__(self, data_dir=DATA_DIR, root=BACKUP_DIR):
+        self.data_dir = data_dir
+        self.root = root
+        self.chunks = ChunkStore(root)
+        self.snapshot_dir = os.path.join(root, "snapshots")
+
+    # ---------- snapshots ----------
+    def snapshots(self):
+        """Snapshot names, oldest first (names are sortable timestamps)."""
+        try:
+            return sorted(name[:-5] for name in os.listdir(self.snapshot_dir) if name.endswith(".json"))
+        except FileNotFoundError:
+            return []
+
+    def manifest(self, name):
+        if name == "latest":
+            names = self.snapshots()
+            if not names:
+                raise FileNotFoundError("no snapshots yet")
+            name = names[-1]
+        with open(os.path.join(self.snapshot_dir, name + ".json")) as file:
+            return json.load(file)
+
+    def _files(self):
+        """Relative paths of the files to back up, grouped by the lock that guards them."""
+        groups = {}
+        for directory, dirs, names in os.walk(self.data_dir):
+            rel_dir = os.path.relpath(directory, self.data_dir)
+            dirs[:] = [d for d in dirs if not d.startswith(DERIVED + (".restore-",))]
+            for name in names:
+                if name.startswith(DERIVED) or name.endswith(SKIPPED_SUFFIXES):
+                    continue
+                rel = os.path.normpath(os.path.join(rel_dir, name))
+                # posts.json and posts.log share posts.json.lock
+                lock = os.path.join(directory, os.path.splitext(name)[0] + ".json.lock")
+                groups.setdefault(lock if os.path.exists(lock) else None, []).append(rel)
+        return groups
+
+    # ---------- backup ----------
+    def backup(self):
+        """Take a snapshot. Returns (its name, stats)."""
+        start = time.perf_counter()
+        previous = self.manifest("latest")["files"] if self.snapshots() else {}
+        files = {}
+        stats = {"files": 0, "read": 0, "reused": 0, "new_chunks": 0, "written": 0}
+        for lock, paths in self._files().items():
+            with FileLock(lock) if lock else nullcontext():
+                for rel in paths:
+                    files[rel] = self._backup_file(rel, previous.get(rel), stats)
+        name = time.strftime("%Y%m%d-%H%M%S")
+        while os.path.exists(os.path.join(self.snapshot_dir, name + ".json")):
+            name += "+"  # two backups in the same second
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        manifest = {"created": time.strftime("%Y-%m-%d %H:%M:%S"), "files": files}
+        temp = os.path.join(self.snapshot_dir, name + ".tmp")
+        with open(temp, "w") as file:
+            json.dump(manifest, file, indent=1)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp, os.path.join(self.snapshot_dir, name + ".json"))
+        stats["seconds"] = round(time.perf_counter() - start, 2)
+        return name, stats
+
+    def _backup_file(self, rel, before, stats):
+        path = os.path.join(self.data_dir, rel)
+        stats["files"] += 1
+        st = os.stat(path)
+        # NOTE: SQLite writes go to social.db-wal first, the .db file's mtime says nothing
+        if (rel not in SQLITE_FILES and before and before["size"] == st.st_size and before["mtime_ns"] == st.st_mtime_ns
+                and all(self.chunks.has(digest) for digest in before["chunks"])):
+            stats["reused"] += 1
+            return before  # unchanged, not even read
+        with _sqlite_copy(path) if rel in SQLITE_FILES else open(path, "rb") as file:
+            digests = []
+            for chunk in iter_chunks(file):
+                digest, written = self.chunks.put(chunk)
+                digests.append(digest)
+                stats["read"] += len(chunk)
+                stats["new_chunks"] += written > 0
+                stats["written"] += written
+        return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "chunks": digests}
+
+    # ---------- restore ----------
+    def restore(self, name, target=None):
+        """
+        Write every file of the snapshot into target (default: Data/). Returns the file count.
+        Restoring over Data/ also deletes the files the snapshot doesn't have (and derived data).
+        """
+        manifest = self.manifest(name)
+        clean = target is None
+        target = target or self.data_dir
+        os.makedirs(target, exist_ok=True)
+        # Rebuild everything in a temp dir first: a missing / corrupt chunk
+        # must not leave Data/ half old, half restored
+        staging = tempfile.mkdtemp(prefix=".restore-", dir=target)
+        try:
+            for rel, entry in manifest["files"].items():
+                path = os.path.join(staging, rel)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as file:
+                    for digest in entry["chunks"]:
+                        file.write(self.chunks.get(digest))
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.utime(path, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+            # Files of the current Data/ that the snapshot didn't have, and derived data
+            for directory, dirs, names in os.walk(target) if clean else ():
+                dirs[:] = [d for d in dirs if os.path.join(directory, d) != staging]
+                for entry_name in names:
+                    rel = os.path.normpath(os.path.relpath(os.path.join(directory, entry_name), target))
+                    if rel not in manifest["files"] and not entry_name.endswith(".lock"):
+                        os.remove(os.path.join(directory, entry_name))
+            if clean:
+                shutil.rmtree(os.path.join(target, "timelines"), ignore_errors=True)
+            for rel in manifest["files"]:
+                os.makedirs(os.path.dirname(os.path.join(target, rel)) or target, exist_ok=True)
+                os.replace(os.path.join(staging, rel), os.path.join(target, rel))
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return len(manifest["files"])
+
+    # ---------- maintenance ----------
+    def verify(self):
+        """(chunks checked, [problems]) for every chunk any snapshot uses."""
+        problems, checked = [], 0
+        for digest in sorted(self._used()):
+            checked += 1
+            try:
+                self.chunks.get(digest)
+            except (OSError, ValueError, zlib.error) as e:
+                problems.append(f"{digest}: {e}")
+        return checked, problems
+
+    def _used(self):
+        return {digest for name in self.snapshots()
+                for entry in self.manifest(name)["files"].values() for digest in entry["chunks"]}
+
+    def prune(self, keep):
+        """Keep the newest `keep` snapshots, delete chunks none of them uses. Returns (snapshots, chunks) removed."""
+        names = self.snapshots()
+        dropped = names[:-keep] if keep > 0 else names
+        for name in dropped:
+            os.remove(os.path.join(self.snapshot_dir, name + ".json"))
+        used = self._used()
+        removed = 0
+        for digest in list(self.chunks.all()):
+            if digest not in used:
+                os.remove(self.chunks.path(digest))
+                removed += 1
+        return len(dropped), removed
+
+
+def _sqlite_copy(path):
+    """A consistent copy of a live SQLite database (backup API), deleted when closed."""
+    import sqlite3
+
+    temp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    temp.close()
+    source, copy = sqlite3.connect(path), sqlite3.connect(temp.name)
+    try:
+        source.backup(copy)
+    finally:
+        source.close()
+        copy.close()
+    file = open(temp.name, "rb")
+    os.unlink(temp.name)  # NOTE: POSIX keeps the open file readable until it's closed
+    return file
+
+
+def _size(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.1f} {unit}" if unit != "B" else f"{n} B"
+        n /= 1024
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Incremental backups of Mini Social Network's Data/")
+    parser.add_argument("--dir", default=BACKUP_DIR, help="where snapshots and chunks are kept")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("backup", help="take a snapshot of Data/")
+    commands.add_parser("list", help="list snapshots")
+    restore = commands.add_parser("restore", help="restore a snapshot (stop the app first)")
+    restore.add_argument("snapshot", help="a name from `list`, or latest")
+    restore.add_argument("--to", help="restore into this directory instead of Data/")
+    restore.add_argument("--yes", action="store_true", help="don't ask before overwriting Data/")
+    commands.add_parser("verify", help="re-hash every chunk the snapshots use")
+    prune = commands.add_parser("prune", help="delete old snapshots and unused chunks")
+    prune.add_argument("--keep", type=int, required=True, help="newest snapshots to keep")
+    args = parser.parse_args()
+
+    backups = Backups(root=args.dir)
+    if args.command == "backup":
+        name, stats = backups.backup()
+        print(f"✔ Snapshot {name}: {stats['files']} files ({stats['reused']} unchanged), "
+              f"read {_size(stats['read'])}, {stats['new_chunks']} new chunks, "
+              f"wrote {_size(stats['written'])} in {stats['seconds']}s")
+    elif args.command == "list":
+        for name in backups.snapshots():
+            files = backups.manifest(name)["files"]
+            print(f"{name}   {len(files):>3} files   {_size(sum(entry['size'] for entry in files.values()))}")
+    elif args.command == "restore":
+        if not args.to and not args.yes:
+            answer = input(f"⚠️ This replaces {os.path.abspath(DATA_DIR)} with snapshot {args.snapshot}. Continue? (y/n): ")
+            if answer.strip().lower() != "y":
+                sys.exit("Cancelled.")
+        count = backups.restore(args.snapshot, args.to)
+        print(f"✔ Restored {count} files. Timelines, search and suggestions are rebuilt on first use.")
+    elif args.command == "verify":
+        checked, problems = backups.verify()
+        for problem in problems:
+            print(f"✖ {problem}")
+        print(f"{'✔' if not problems else '✖'} {checked} chunks checked, {len(problems)} problems")
+        sys.exit(1 if problems else 0)
+    elif args.command == "prune":
+        snapshots, chunks = backups.prune(args.keep)
+        print(f"✔ Removed {snapshots} snapshots and {chunks} unused chunks")
@@ -0,0 +1,167 @@
+"""
+api_load.py – load generator for Http_Api.py
+
+Every client registers its own user, then loops over a mix of requests on one
+kept-alive connection until the time is up:
+    60% feed, 15% post, 15% search user, 10% follow / unfollow
+Prints p50 / p99 latency per endpoint and the total requests per second of the
+timed phase (registration is reported separately, it's scrypt bound).
+
+    python Benchmarks/api_load.py --spawn                  # own server on a copy of Data/
+    python Benchmarks/api_load.py --port 8080 --clients 100 --duration 30
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIX = [("feed", 60), ("post", 15), ("search", 15), ("follow", 10)]
+
+
+class Client:
+    """Minimal HTTP/1.1 client, one kept-alive connection."""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+        self.token = None
+
+    async def request(self, method, path, body=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        raw = json.dumps(body).encode() if body is not None else b""
+        headers = f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Length: {len(raw)}\r\n"
+        if self.token:
+            headers += f"Authorization: Bearer {self.token}\r\n"
+        self.writer.write(headers.encode() + b"\r\n" + raw)
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+
+async def run_client(i, args, usernames, latencies, errors, deadline_box):
+    rng = random.Random(i)
+    client = Client(args.host, args.port)
+    name = f"load{i}_{os.getpid()}_{rng.randrange(10 ** 6)}"
+
+    async def timed(kind, method, path, body=None):
+        start = time.perf_counter()
+        status, payload = await client.request(method, path, body)
+        latencies[kind].append((time.perf_counter() - start) * 1000)
+        if status >= 400:
+            errors[kind] += 1
+        return payload
+
+    payload = await timed("register", "POST", "/register", {"username": name, "password": "pw" + name, "age": 20})
+    client.token = payload.get("token")
+    usernames.append(name)
+    await deadline_box["ready"].wait()
+
+    kinds = [kind for kind, _ in MIX]
+    weights = [weight for _, weight in MIX]
+    cursor = None
+    while time.perf_counter() < deadline_box["deadline"]:
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "feed":
+            path = "/feed?limit=20" + (f"&cursor={cursor}" if cursor else "")
+            cursor = (await timed(kind, "GET", path)).get("next_cursor") if rng.random() < 0.5 else None
+        elif kind == "post":
+            await timed(kind, "POST", "/posts", {"title": "load", "content": f"post from {name} #{rng.randrange(1000)}"})
+        elif kind == "search":
+            target = rng.choice(usernames)
+            await timed(kind, "GET", f"/users/search?q={target[:rng.randint(2, len(target))]}")
+        else:
+            action = rng.choice(("follow", "unfollow"))
+            target = rng.choice(usernames)
+            if target != name:
+                await timed(kind, "POST", "/follow", {"target": target, "action": action})
+    await client.close()
+
+
+async def main(args):
+    latencies, errors, usernames = defaultdict(list), defaultdict(int), []
+    box = {"ready": asyncio.Event(), "deadline": 0}
+    tasks = [asyncio.create_task(run_client(i, args, usernames, latencies, errors, box)) for i in range(args.clients)]
+    while len(usernames) < args.clients and not any(t.done() for t in tasks):
+        await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    box["deadline"] = start + args.duration
+    box["ready"].set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    timed_requests = sum(len(latencies[kind]) for kind, _ in MIX)
+    print(f"\n{args.clients} clients, {elapsed:.1f}s -> {timed_requests / elapsed:,.0f} req/s\n")
+    print("| endpoint | requests | errors | p50 (ms) | p99 (ms) |")
+    print("|---|---|---|---|---|")
+    for kind in ["register"] + [kind for kind, _ in MIX]:
+        samples = latencies[kind]
+        if samples:
+            print(f"| {kind} | {len(samples):,} | {errors[kind]} | {percentile(samples, 50):.2f} | {percentile(samples, 99):.2f} |")
+
+
+def spawn_server(workdir):
+    """Http_Api.py on a free port, in a copy of Data/ so the real data isn't touched."""
+    shutil.copytree(os.path.join(PROJECT_DIR, "Data"), os.path.join(workdir, "Data"))
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    # NOTE: output goes to DEVNULL, an undrained PIPE would fill up and block the server.
+    # --parent-pid: the server exits by itself if we die without cleaning up (kill -9)
+    server = subprocess.Popen([sys.executable, os.path.join(PROJECT_DIR, "Http_Api.py"), "--port", str(port),
+                               "--parent-pid", str(os.getpid())],
+                              cwd=workdir, stdout=subprocess.DEVNULL)
+    while True:  # wait until it's listening
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server, port
+        except OSError:
+            if server.poll() is not None:
+                raise RuntimeError("Http_Api.py exited during startup")
+            time.sleep(0.1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the Mini Social Network HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10, help="seconds of timed load")
+    parser.add_argument("--spawn", action="store_true", help="start a throwaway server on a copy of Data/")
+    args = parser.parse_args()
+
+    if not args.spawn:
+        asyncio.run(main(args))
+    else:
+        # SIGTERM -> SystemExit, so the finally below stops the server and the temp dir is removed
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+        with tempfile.TemporaryDirectory() as tmp:
+            server, args.port = spawn_server(tmp)
+            try:
+                asyncio.run(main(args))
+            finally:
+                server.terminate()
+                server.wait()
@@ -0,0 +1,109 @@
+"""
+feed_check.py – every post shows up in the feed exactly once, exits 1 if not
+
+Runs the app's own code (Post.create_post, Social_Network) on a fresh Data/ in a
+temp directory and checks the feed in the cases that are easy to get wrong:
+    - an author becomes a celebrity (more followers than the threshold, posts
+      merged in at read time): their old posts are in the timelines too, the
+      feed must not show them twice
+    - an author stops being one: the posts they wrote meanwhile were never
+      fanned out, the feed must still show them
+    - "popular" (last hour's likes and views) ranks the same in a fresh process
+      after the engagement log was compacted, and an unlike takes its like back
+
+    python Benchmarks/feed_check.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+
+def register(*usernames):
+    import Repository as repo
+    from user import User
+
+    users = []
+    for username in usernames:
+        user = User(username, "x", 20, "", "(check)", 0)
+        repo.users.add({"username": username, "password": "x", "age": 20, "bio": "", "created_at": "(check)", "ts": 0})
+        users.append(user)
+    return users
+
+
+def post(author, text):
+    from Post import Post
+
+    post_id = Post("check", text, author.username, "(check)", time.time_ns()).create_post()
+    if post_id is None:
+        raise RuntimeError(f"post {text!r} didn't validate")
+    return post_id
+
+
+def feed(user):
+    from Social_Network import Social_Network
+
+    posts, _ = Social_Network.get_feed(user, limit=50)
+    return list(posts.ids)
+
+
+def check_celebrity_threshold():
+    from Social_Network import Social_Network
+    from Timeline import timelines
+
+    problems = []
+    timelines.celebrity_threshold = 1  # a second follower makes a celebrity
+    star, fan, other = register("star", "fan", "other")
+    Social_Network.update_followers(fan, star, "Follow")
+    ids = [post(star, f"before {i}") for i in range(3)]  # fanned out into fan's timeline
+
+    Social_Network.update_followers(other, star, "Follow")  # star crosses the threshold
+    ids.append(post(star, "while famous"))                  # merged at read time only
+    if feed(fan) != ids[::-1]:
+        problems.append(f"celebrity (up): feed {feed(fan)}, expected {ids[::-1]}")
+
+    Social_Network.update_followers(other, star, "Unfollow")  # and back below it
+    ids.append(post(star, "after"))
+    if feed(fan) != ids[::-1]:
+        problems.append(f"celebrity (down): feed {feed(fan)}, expected {ids[::-1]}")
+    return problems
+
+
+def check_popular():
+    from Engagement import LIKE_WEIGHT, Engagement, engagement
+
+    problems = []
+    fan, other = register("popular_fan", "popular_other")
+    liked, unliked = post(fan, "liked"), post(fan, "unliked")
+    engagement.view([liked, liked, unliked])
+    engagement.like(liked, other.username)
+    engagement.like(unliked, other.username)
+    engagement.flush()
+    engagement.unlike(unliked, other.username)  # in a later record than the like
+    engagement.flush()
+    expected = [(liked, LIKE_WEIGHT + 2), (unliked, 1)]
+    if engagement.top_posts() != expected:
+        problems.append(f"popular (unlike): {engagement.top_posts()}, expected {expected}")
+
+    engagement.store.compact()
+    fresh = Engagement()  # loads the snapshot, like another process would
+    if fresh.top_posts() != expected:
+        problems.append(f"popular (after compaction): {fresh.top_posts()} in a fresh store, expected {expected}")
+    return problems
+
+
+CHECKS = [check_celebrity_threshold, check_popular]
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.makedirs("Data")
+        problems = []
+        for check in CHECKS:
+            problems += check()
+        print("\n".join(f"✖ {problem}" for problem in problems) or f"✔ {len(CHECKS)} feed checks passed")
+        sys.exit(1 if problems else 0)
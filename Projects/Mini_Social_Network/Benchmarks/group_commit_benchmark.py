@@ -0,0 +1,77 @@
+"""
+group_commit_benchmark.py – latency vs throughput of the group-commit writer
+
+T threads add posts as fast as they can. For every commit window the post
+store's writer is reconfigured and we report posts/s, the p50 / p99 latency of
+one add() (= until it is durable) and the batch-size histogram.
+window "off" commits every write on its own (max_batch = 1), like before.
+
+    python Benchmarks/group_commit_benchmark.py
+    python Benchmarks/group_commit_benchmark.py --threads 64 --windows 0 0.001 0.005 0.02
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+
+def run(store, threads, posts_per_thread):
+    latencies = []
+    lock = threading.Lock()
+
+    def work(thread):
+        mine = []
+        for i in range(posts_per_thread):
+            start = time.perf_counter()
+            store.add({"title": "bench", "content": f"{thread}/{i}", "username": f"user{thread}",
+                       "created_at": "(bench)", "ts": time.time_ns()})
+            mine.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(mine)
+
+    workers = [threading.Thread(target=work, args=(t,)) for t in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return len(latencies) / (time.perf_counter() - start), latencies
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Group commit: posts/s and latency per commit window")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--posts", type=int, default=100, help="posts per thread")
+    parser.add_argument("--windows", type=float, nargs="+", default=[0, 0.001, 0.002, 0.005, 0.02],
+                        help="commit windows in seconds")
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())
+    os.makedirs("Data")
+    import Repository as repo
+
+    print(f"{args.threads} threads x {args.posts} posts\n")
+    print("| window | posts/s | p50 (ms) | p99 (ms) | mean batch | batch sizes |")
+    print("|---|---|---|---|---|---|")
+    for window in [None] + args.windows:
+        writer = repo.posts.writer
+        writer.window, writer.max_batch = (0, 1) if window is None else (window, 256)
+        writer.batches = writer.writes = 0
+        writer.batch_sizes = Counter()
+        rate, latencies = run(repo.posts, args.threads, args.posts)
+        stats = writer.stats()
+        histogram = ", ".join(f"{size}: {count}" for size, count in stats["histogram"].items())
+        label = "off" if window is None else f"{window * 1000:g} ms"
+        print(f"| {label} | {rate:,.0f} | {percentile(latencies, 50):.2f} | {percentile(latencies, 99):.2f} "
+              f"| {stats['mean_batch']} | {histogram} |")
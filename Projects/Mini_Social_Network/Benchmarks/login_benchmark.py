@@ -0,0 +1,61 @@
+"""
+login_benchmark.py – logins per second vs password hashing cost
+
+For each cost, verifies a burst of logins (a) one after another in this
+process and (b) through Credentials' process pool, and prints a markdown table.
+Pick the highest cost whose pooled rate still covers your peak login rate.
+
+    python Benchmarks/login_benchmark.py --logins 64
+    python Benchmarks/login_benchmark.py --algorithm pbkdf2_sha256
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Credentials
+
+COSTS = {
+    "scrypt": [2 ** 12, 2 ** 13, 2 ** 14, 2 ** 15],
+    "pbkdf2_sha256": [100_000, 300_000, 600_000, 1_200_000],
+}
+
+
+def sequential(password, stored, logins):
+    start = time.perf_counter()
+    for _ in range(logins):
+        assert Credentials.verify_password(password, stored)[0]
+    return logins / (time.perf_counter() - start)
+
+
+def pooled(password, stored, logins):
+    start = time.perf_counter()
+    futures = [Credentials.verify_async(password, stored) for _ in range(logins)]
+    assert all(future.result()[0] for future in futures)
+    return logins / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--algorithm", choices=sorted(COSTS), default=Credentials.ALGORITHM)
+    parser.add_argument("--logins", type=int, default=64)
+    args = parser.parse_args()
+
+    password = "correct horse battery staple"
+    legacy = hashlib.sha256(password.encode()).hexdigest()
+    Credentials.verify_async(password, legacy).result()  # start the workers before timing
+
+    print(f"{Credentials.POOL_WORKERS} worker processes, {args.logins} logins per run\n")
+    print("| hash | cost | ms / login | logins/s (1 process) | logins/s (pool) |")
+    print("|---|---|---|---|---|")
+    rate = sequential(password, legacy, args.logins * 100)
+    print(f"| sha256 (legacy) | - | {1000 / rate:.4f} | {rate:,.0f} | - |")
+    for cost in COSTS[args.algorithm]:
+        stored = Credentials.hash_password(password, args.algorithm, cost)
+        one = sequential(password, stored, max(4, args.logins // 4))
+        many = pooled(password, stored, args.logins)
+        print(f"| {args.algorithm} | {cost:,} | {1000 / one:.1f} | {one:,.1f} | {many:,.1f} |")
+    Credentials.shutdown_pool()
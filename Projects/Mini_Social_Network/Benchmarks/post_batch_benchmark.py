@@ -0,0 +1,127 @@
+"""
+post_batch_benchmark.py – memory and time of the post representations at 1M posts
+
+The same synthetic posts, parsed from JSON (like posts.json) and held four ways:
+    dicts        what the store gives you
+    Post(dict)   one object per post with a __dict__ (Post before __slots__)
+    Post(slots)  one object per post, __slots__
+    PostBatch    columns: arrays + one UTF-8 buffer
+For each: memory still held after building (tracemalloc, strings included),
+build time, and two bulk reads:
+    scan   -> posts newer than a cutoff, counted per author (ts + author only)
+    render -> format every row like the feed does
+
+    python Benchmarks/post_batch_benchmark.py --posts 1000000
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Post import Post, PostBatch
+
+BASE_TS = 1_750_000_000 * 1_000_000_000
+
+
+class DictPost:
+    """Post as it was before __slots__."""
+
+    def __init__(self, title, content, username, created_at, ts=None):
+        self.title = title
+        self.content = content
+        self.username = username
+        self.created_at = created_at
+        self.ts = ts
+        self.valid = False
+
+
+def make_json(n, authors=10_000, seed=1):
+    rng = random.Random(seed)
+    return json.dumps([
+        {"title": f"title {i}", "content": f"content of post number {i} " + "x" * rng.randrange(40),
+         "username": f"user{rng.randrange(authors)}", "created_at": "(Mon Sep  1 10:00:00 2025)",
+         "id": i, "ts": BASE_TS + i * 1_000_000}
+        for i in range(n)
+    ])
+
+
+def objects(cls):
+    return lambda records: [cls(r["title"], r["content"], r["username"], r["created_at"], r["ts"]) for r in records]
+
+
+BUILDERS = {
+    "dicts": lambda records: records,
+    "Post(dict)": objects(DictPost),
+    "Post(slots)": objects(Post),
+    "PostBatch": PostBatch.from_records,
+}
+
+
+def held_memory(build, text):
+    """Bytes still allocated once the parsed dicts are gone and only `build`'s result is left."""
+    gc.collect()
+    tracemalloc.start()
+    built = build(json.loads(text))
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del built
+    return size
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    text = make_json(args.posts)
+    cutoff = BASE_TS + args.posts // 2 * 1_000_000
+
+    def scan(posts):
+        if isinstance(posts, PostBatch):
+            counts = Counter(a for a, ts in zip(posts.author_ids, posts.ts) if ts >= cutoff)
+            return {posts.names[a]: n for a, n in counts.items()}
+        if isinstance(posts[0], dict):
+            return dict(Counter(p["username"] for p in posts if p["ts"] >= cutoff))
+        return dict(Counter(p.username for p in posts if p.ts >= cutoff))
+
+    def render(posts):
+        if isinstance(posts, PostBatch):
+            rows = (posts.row(i) for i in range(len(posts)))
+            return [f"{username} | {created_at} | {title} - {content}" for username, title, content, created_at in rows]
+        if isinstance(posts[0], dict):
+            return [f"{p['username']} | {p['created_at']} | {p['title']} - {p['content']}" for p in posts]
+        return [f"{p.username} | {p.created_at} | {p.title} - {p.content}" for p in posts]
+
+    rows, expected = [], None
+    for label, build in BUILDERS.items():
+        size = held_memory(build, text)
+        records = json.loads(text)
+        build_s, built = timed(lambda: build(records))
+        del records
+        scan_s, counts = timed(lambda: scan(built))
+        render_s, _ = timed(lambda: render(built))
+        expected = expected or counts
+        assert counts == expected, label
+        rows.append((label, size, build_s, scan_s, render_s))
+        del built
+        gc.collect()
+
+    print(f"{args.posts:,} posts\n")
+    print("| representation | memory (MB) | bytes/post | build (s) | scan (s) | render (s) |")
+    print("|---|---|---|---|---|---|")
+    for label, size, build_s, scan_s, render_s in rows:
+        print(f"| {label} | {size / 2 ** 20:,.1f} | {size / args.posts:.0f} | {build_s:.2f} | {scan_s:.2f} | {render_s:.2f} |")
@@ -0,0 +1,49 @@
+"""
+recommendation_benchmark.py – friend-of-friend batch job on a big random graph
+
+Builds a follower graph with a power-law-ish degree distribution (a few users
+are followed by many) and times both implementations in Recommendation.py.
+
+    python Benchmarks/recommendation_benchmark.py --edges 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Recommendation as rec
+
+
+def make_graph(n_users, n_edges, seed=1):
+    rng = random.Random(seed)
+    graph = {f"user{i}": set() for i in range(n_users)}
+    users = list(graph)
+    for _ in range(n_edges):
+        follower = users[rng.randrange(n_users)]
+        # paretovariate -> small ids are "popular"
+        followee = users[min(n_users - 1, int(rng.paretovariate(1.2)) - 1 + rng.randrange(3))
+                         if rng.random() < 0.3 else rng.randrange(n_users)]
+        if followee != follower:
+            graph[follower].add(followee)
+    return {user: sorted(followees) for user, followees in graph.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    args = parser.parse_args()
+
+    graph = make_graph(args.users, args.edges)
+    print(f"{args.users:,} users, {sum(map(len, graph.values())):,} edges")
+
+    implementations = [("python", rec.compute_all_python)]
+    if rec.HAS_SCIPY:
+        implementations.append(("scipy", rec.compute_all_scipy))
+    for name, compute in implementations:
+        start = time.perf_counter()
+        result = compute(graph)
+        print(f"{name:>7}: {time.perf_counter() - start:6.2f}s for {len(result):,} users")
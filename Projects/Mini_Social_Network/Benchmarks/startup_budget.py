@@ -0,0 +1,98 @@
+"""
+startup_budget.py – cold start must stay fast, fails (exit 1) if it doesn't
+
+Runs each entry point in a fresh interpreter a few times and checks:
+    - none of the HEAVY modules got imported (jsonschema, SciPy, ... are loaded
+      on first use only)
+    - the total `python -X importtime` of its top-level imports (best of --runs)
+      is within its budget. It is measured inside the interpreter, so it hardly
+      depends on how busy the machine is.
+    - wall time (best of --runs) minus the wall time of a bare `python -c pass`
+      (same flags, best of --runs) is within its budget. Measuring against that
+      baseline takes out the interpreter start, which is what a busy machine
+      slows down the most.
+The first two fail the run. Wall time is the noisy one, it only warns (⚠)
+unless --strict. The slowest imports are printed either way, so a regression
+shows what caused it.
+
+    python Benchmarks/startup_budget.py
+    python Benchmarks/startup_budget.py --strict --runs 10 --scale 2    # wall time fails too, budgets 2x as big
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (label, python arguments, stdin, wall-clock budget over the baseline, import budget) in ms.
+# NOTE: -X importtime itself slows imports down a bit, the budgets include that.
+# On an idle machine the entries take ~10-20 ms over the baseline, the budgets
+# leave room for a loaded one.
+ENTRY_POINTS = [
+    ("main.py (menu, then Exit)", ["main.py"], "3\n", 75, 60),
+    ("import Util (scripted use)", ["-c", "import Util"], "", 75, 80),
+    ("import Repository", ["-c", "import Repository"], "", 50, 40),
+]
+BASELINE = ["-c", "pass"]
+HEAVY = ("jsonschema", "scipy", "numpy", "multiprocessing", "sqlite3", "asyncio")
+
+
+def run_once(args, stdin):
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-X", "importtime", *args], input=stdin, cwd=PROJECT_DIR,
+                         capture_output=True, text=True, check=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    imports = []  # (cumulative µs, module, top level?)
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        imports.append((int(cumulative_us), name.strip(), not name[1:].startswith(" ")))
+    return wall_ms, imports
+
+
+def baseline_ms(runs):
+    """Best wall time of an interpreter that imports nothing of ours."""
+    return min(run_once(BASELINE, "")[0] for _ in range(runs))
+
+
+def check(label, args, stdin, budget_ms, import_budget_ms, runs, scale, baseline, strict):
+    samples = [run_once(args, stdin) for _ in range(runs)]
+    wall_ms = min(wall for wall, _ in samples)
+    over_ms = wall_ms - baseline
+    # The run with the fastest imports: a slow one only says the machine was busy
+    import_ms, imports = min((sum(us for us, _, top in imports if top) / 1000, imports) for _, imports in samples)
+    loaded = {name for _, name, _ in imports}
+    heavy = sorted(module for module in HEAVY if module in loaded)
+
+    problems, warnings = [], []
+    if over_ms > budget_ms * scale:
+        warnings.append(f"wall +{over_ms:.0f} ms > +{budget_ms * scale:.0f} ms")
+    if import_ms > import_budget_ms * scale:
+        problems.append(f"imports {import_ms:.0f} ms > {import_budget_ms * scale:.0f} ms")
+    if heavy:
+        problems.append("imports " + ", ".join(heavy) + " at startup")
+    if strict:
+        problems, warnings = problems + warnings, []
+
+    mark = "✖" if problems else "⚠" if warnings else "✔"
+    print(f"{mark} {label}: {wall_ms:.0f} ms wall (+{over_ms:.0f} over bare python), {import_ms:.0f} ms imports"
+          + (f"  <- {'; '.join(problems + warnings)}" if problems or warnings else ""))
+    for us, name, _ in sorted(imports, reverse=True)[:5]:
+        print(f"      {us / 1000:6.1f} ms  {name}")
+    return not problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail if cold start got slower than its budget")
+    parser.add_argument("--runs", type=int, default=5, help="runs per entry point, the fastest counts")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every time budget (slow machines)")
+    parser.add_argument("--strict", action="store_true", help="the wall time budget fails the run too, not only imports")
+    args = parser.parse_args()
+
+    baseline = baseline_ms(args.runs)
+    print(f"bare python: {baseline:.0f} ms")
+    ok = all([check(*entry, args.runs, args.scale, baseline, args.strict) for entry in ENTRY_POINTS])
+    sys.exit(0 if ok else 1)
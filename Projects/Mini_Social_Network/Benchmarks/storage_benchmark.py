@@ -0,0 +1,146 @@
+"""
+storage_benchmark.py – JSON vs SQLite backend latency
+
+For every backend and dataset size a fresh Data/ directory is filled with
+`size` users, `size` posts and ~`size` follows, then we time
+    register  -> User.register()
+    post      -> Post.create_post()
+    feed      -> Social_Network.get_feed() (first page)
+Each (backend, size) runs in its own process, because Repository picks the
+backend once at import time and caches the data.
+
+    python Benchmarks/storage_benchmark.py                       # 10k, 100k, 1M
+    python Benchmarks/storage_benchmark.py --sizes 10000 --ops 50
+
+NOTE: the JSON backend rewrites users.json on every register, so with 1M rows
+that step alone takes seconds per call. That's the point of the comparison.
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKENDS = ("json", "sqlite")
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+BASE_TS = 1_750_000_000 * 1_000_000_000
+
+
+def make_rows(size, seed=1):
+    rng = random.Random(seed)
+    users = [
+        {"username": f"user{i}", "password": "x" * 64, "age": 18 + i % 50, "bio": "",
+         "created_at": "(bench)", "ts": BASE_TS + i}
+        for i in range(size)
+    ]
+    posts = [
+        {"title": f"title {i}", "content": f"content of post {i}", "username": f"user{rng.randrange(size)}",
+         "created_at": "(bench)", "id": i, "ts": BASE_TS + i * 1000}
+        for i in range(size)
+    ]
+    follows = {f"user{i}": [f"user{rng.randrange(size)}"] for i in range(size)}
+    return users, posts, follows
+
+
+def populate(backend, size):
+    users, posts, follows = make_rows(size)
+    # Empty timelines dir -> no full rebuild on the first post (not what we measure here)
+    os.makedirs("Data/timelines", exist_ok=True)
+    if backend == "json":
+        for name, data in (("users", users), ("posts", posts), ("followers", follows)):
+            with open(f"Data/{name}.json", "w") as file:
+                json.dump(data, file)
+        return
+
+    from Sqlite_Store import POST_COLUMNS, USER_COLUMNS, SqliteBackend
+
+    db = SqliteBackend()
+    with db.transaction() as conn:
+        conn.executemany("INSERT INTO users VALUES (?, ?, ?, ?, ?, ?)",
+                         (tuple(u[c] for c in USER_COLUMNS) for u in users))
+        conn.executemany("INSERT INTO posts VALUES (?, ?, ?, ?, ?, ?)",
+                         (tuple(p[c] for c in POST_COLUMNS) for p in posts))
+        conn.executemany("INSERT OR IGNORE INTO follows VALUES (?, ?)",
+                         ((a, b) for a, followees in follows.items() for b in followees))
+    db.close()
+
+
+def timed(fn, ops):
+    samples = []
+    for i in range(ops):
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 3),
+    }
+
+
+def worker(backend, size, ops):
+    """Runs inside the temp directory with MSN_BACKEND already set."""
+    sys.path.insert(0, PROJECT_DIR)
+    populate(backend, size)
+
+    start = time.perf_counter()
+    import Repository as repo
+    from Post import Post
+    from Social_Network import Social_Network as sn
+    from user import User
+
+    repo.users.count(), repo.posts.count(), repo.followers.users()  # warm the caches
+    load_s = time.perf_counter() - start
+
+    rng = random.Random(2)
+    result = {"backend": backend, "size": size, "ops": ops, "load_s": round(load_s, 3)}
+    result["register"] = timed(lambda i: User(f"new{i}", "x" * 64, 20, "", "(bench)", BASE_TS).register(), ops)
+    result["post"] = timed(lambda i: Post("t", "c", f"user{rng.randrange(size)}", "(bench)", BASE_TS).create_post(), ops)
+    result["feed"] = timed(lambda i: sn.get_feed(f"user{rng.randrange(size)}"), ops)
+    print(json.dumps(result))
+
+
+def run(backend, size, ops):
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "Data"))
+        env = dict(os.environ, MSN_BACKEND=backend)
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", backend, str(size), str(ops)],
+            cwd=tmp, env=env, capture_output=True, text=True, check=True,
+        )
+        return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def to_markdown(results):
+    lines = ["| backend | rows | load (s) | register p50/p99 (ms) | post p50/p99 (ms) | feed p50/p99 (ms) |",
+             "|---|---|---|---|---|---|"]
+    for r in results:
+        cells = [f"{r[op]['p50_ms']} / {r[op]['p99_ms']}" for op in ("register", "post", "feed")]
+        lines.append(f"| {r['backend']} | {r['size']:,} | {r['load_s']} | " + " | ".join(cells) + " |")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the JSON and SQLite storage backends")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--ops", type=int, default=20, help="timed calls per operation")
+    parser.add_argument("--worker", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker[0], int(args.worker[1]), int(args.worker[2]))
+    else:
+        results = []
+        for size in args.sizes:
+            for backend in args.backends:
+                print(f"⏱ {backend} with {size:,} rows...", flush=True)
+                results.append(run(backend, size, args.ops))
+        print(to_markdown(results))
@@ -0,0 +1,243 @@
+"""
+suite.py – every user-facing operation, timed across dataset sizes
+
+For each size a fresh Data/ directory is filled by workload.py (power-law
+follower graph, post stream, ...) and then each operation runs `--ops` times
+the way main.py / Util.py call it:
+    register      hash the password, User.register(), add to the follower graph
+    login         Util.login_verification()
+    post          Post.create_post() (store + timeline fan-out + search index)
+    feed          Social_Network.get_feed(), first page
+    profile       what Util.display_profile reads: latest 5 posts, counts, follow state
+    follow        Social_Network.update_followers(..., "Follow")
+    search_user   Username_Index search for a prefix / a name with a typo
+    search_posts  Post.search() for one or two words
+The first call of each operation is reported on its own ("first", lazy loading),
+the percentiles are over the remaining calls. Every (backend, size) runs in a
+separate process, so nothing is cached from the previous one.
+
+    python Benchmarks/suite.py --sizes 1000 10000 100000
+    python Benchmarks/suite.py --sizes 10000 --compare Benchmarks/reports/before.json
+
+The report goes to Benchmarks/reports/<name>.json and .md (name defaults to the
+git commit). With --compare, p50 changes against an older report are listed and
+the ones slower by more than --threshold percent are flagged.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCH_DIR)
+REPORT_DIR = os.path.join(BENCH_DIR, "reports")
+OPERATIONS = ("register", "login", "post", "feed", "profile", "follow", "search_user", "search_posts")
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+
+    def at(p):
+        return round(samples[min(len(samples) - 1, int(len(samples) * p / 100))], 3)
+
+    return {"mean_ms": round(sum(samples) / len(samples), 3), "p50_ms": at(50), "p90_ms": at(90),
+            "p99_ms": at(99), "max_ms": round(samples[-1], 3)}
+
+
+def operations(workload, rng):
+    """name -> fn(i), each call is one user action."""
+    import Credentials
+    import Repository as repo
+    import Timestamp
+    import Util as ut
+    from Post import Post
+    from Social_Network import Social_Network as sn
+    from user import User
+    from Username_Index import username_index
+    from workload import PASSWORD
+
+    names = workload.usernames
+
+    def someone():
+        return User.from_dict(repo.users.get(names[rng.randrange(len(names))]))
+
+    def register(i):
+        ts = Timestamp.now_ns()
+        user = User(f"newcomer{i}", Credentials.hash_password(PASSWORD), 30, "", Timestamp.display(ts), ts)
+        user.register()
+        sn.update_followers(user)
+
+    def login(i):
+        assert ut.login_verification(names[rng.randrange(len(names))], PASSWORD) is not None
+
+    def post(i):
+        ts = Timestamp.now_ns()
+        Post("benchmark", workload.text(12), names[rng.randrange(len(names))], Timestamp.display(ts), ts).create_post()
+
+    def feed(i):
+        sn.get_feed(someone())
+
+    def profile(i):
+        viewer, target = someone(), someone()
+        posts = Post.get_latest_by_username(target.username, 5)
+        [posts.row(j) for j in range(len(posts))]
+        Post.count_by_username(target.username), sn.follow_counts(target)
+        sn.is_following(viewer, target)
+
+    def follow(i):
+        follower = someone()
+        target = User.from_dict(repo.users.get(names[workload.popular()[0]]))
+        if follower.username != target.username:
+            sn.update_followers(follower, target, "Follow")
+
+    def search_user(i):
+        name = names[rng.randrange(len(names))]
+        if i % 2:
+            username_index.search(name[:4])
+        else:
+            position = rng.randrange(len(name))
+            username_index.search(name[:position] + "x" + name[position + 1:])
+
+    def search_posts(i):
+        Post.search(workload.text(1 + i % 2).lstrip("#"))
+
+    return {"register": register, "login": login, "post": post, "feed": feed, "profile": profile,
+            "follow": follow, "search_user": search_user, "search_posts": search_posts}
+
+
+def worker(backend, size, ops, posts_per_user, follows_per_user):
+    """Runs in the temp directory with MSN_BACKEND set, prints one JSON line."""
+    sys.path.insert(0, PROJECT_DIR)
+    sys.path.insert(0, BENCH_DIR)
+    from workload import Workload, generate
+
+    workload = Workload(size, posts_per_user, follows_per_user)
+    with contextlib.redirect_stdout(sys.stderr):
+        setup = generate(workload)
+    result = {"backend": backend, "size": size, "posts": workload.n_posts, "ops": ops, "setup_s": setup}
+
+    rng = random.Random(2)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):  # the app prints a lot
+        for name, fn in operations(workload, rng).items():
+            start = time.perf_counter()
+            fn(0)
+            first = (time.perf_counter() - start) * 1000
+            samples = []
+            for i in range(1, ops + 1):
+                start = time.perf_counter()
+                fn(i)
+                samples.append((time.perf_counter() - start) * 1000)
+            result[name] = dict(percentiles(samples), first_ms=round(first, 3))
+    print(json.dumps(result))
+
+
+def run(backend, size, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "Data"))
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", backend, str(size), str(args.ops),
+             str(args.posts_per_user), str(args.follows_per_user)],
+            cwd=tmp, env=dict(os.environ, MSN_BACKEND=backend), stdout=subprocess.PIPE, text=True, check=True,
+        )
+        return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _key(result):
+    return result["backend"], result["size"]
+
+
+def to_markdown(report, baseline=None, threshold=25.0):
+    meta = report["meta"]
+    lines = [f"# Benchmark {meta['commit']} ({meta['date']})", "",
+             f"Python {meta['python']} on {meta['platform']}, {meta['ops']} calls per operation.", ""]
+    before = {_key(r): r for r in baseline["results"]} if baseline else {}
+    header = "| operation | backend | users | first (ms) | mean | p50 | p90 | p99 | max |"
+    lines += [header + (" p50 vs base |" if baseline else ""), "|" + "---|" * (9 + bool(baseline))]
+    regressions = []
+    for op in OPERATIONS:
+        for r in report["results"]:
+            s = r[op]
+            row = (f"| {op} | {r['backend']} | {r['size']:,} | {s['first_ms']} | {s['mean_ms']} | {s['p50_ms']} "
+                   f"| {s['p90_ms']} | {s['p99_ms']} | {s['max_ms']} |")
+            old = before.get(_key(r), {}).get(op)
+            if baseline:
+                if old:
+                    change = (s["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100 if old["p50_ms"] else 0.0
+                    flag = " ⚠" if change > threshold else ""
+                    row += f" {change:+.0f}%{flag} |"
+                    if flag:
+                        regressions.append(f"{op} ({r['backend']}, {r['size']:,} users): "
+                                           f"p50 {old['p50_ms']} -> {s['p50_ms']} ms")
+                else:
+                    row += " – |"
+            lines.append(row)
+    phases = list(report["results"][0]["setup_s"])
+    lines += ["", "Setup (s):", "", "| backend | users | posts | " + " | ".join(phases) + " |",
+              "|" + "---|" * (3 + len(phases))]
+    for r in report["results"]:
+        lines.append(f"| {r['backend']} | {r['size']:,} | {r['posts']:,} | "
+                     + " | ".join(str(seconds) for seconds in r["setup_s"].values()) + " |")
+    if baseline:
+        lines += ["", f"Compared with {baseline['meta']['commit']}: "
+                  + (f"{len(regressions)} regression(s) over {threshold:g}%" if regressions else "no regressions")]
+        lines += [f"- {line}" for line in regressions]
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time every operation across dataset sizes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="numbers of users")
+    parser.add_argument("--backends", nargs="+", choices=("json", "sqlite"), default=["json"])
+    parser.add_argument("--ops", type=int, default=50, help="timed calls per operation")
+    parser.add_argument("--posts-per-user", type=int, default=10)
+    parser.add_argument("--follows-per-user", type=int, default=10)
+    parser.add_argument("--name", help="report file name (default: the git commit)")
+    parser.add_argument("--compare", help="an older report .json to compare with")
+    parser.add_argument("--threshold", type=float, default=25.0, help="%% slower (p50) that counts as a regression")
+    parser.add_argument("--worker", nargs=5, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        backend, *numbers = args.worker
+        worker(backend, *map(int, numbers))
+        sys.exit()
+
+    results = []
+    for size in args.sizes:
+        for backend in args.backends:
+            print(f"⏱ {backend} with {size:,} users...", file=sys.stderr, flush=True)
+            results.append(run(backend, size, args))
+    commit = git_commit()
+    report = {"meta": {"commit": commit, "date": time.strftime("%Y-%m-%d %H:%M"), "python": platform.python_version(),
+                       "platform": platform.platform(), "ops": args.ops, "posts_per_user": args.posts_per_user,
+                       "follows_per_user": args.follows_per_user},
+              "results": results}
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    path = os.path.join(REPORT_DIR, args.name or commit)
+    markdown = to_markdown(report, baseline, args.threshold)
+    with open(path + ".json", "w") as file:
+        json.dump(report, file, indent=2)
+    with open(path + ".md", "w") as file:
+        file.write(markdown)
+    print(markdown)
+    print(f"📄 Report: {path}.json / .md")
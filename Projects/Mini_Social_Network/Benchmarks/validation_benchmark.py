@@ -0,0 +1,79 @@
+"""
+validation_benchmark.py – validations per second, before and after Validation.py
+
+    before : jsonschema.validate(instance, schema) per record (what register / create_post did)
+    draft7 : the compiled Draft7Validator on its own (Validation.validator(kind))
+    cached : Validation.validate(record, kind), generated fast check + Draft7 fallback
+    batch  : Validation.validate_many(records, kind), the bulk-import path
+Same for users. 1% of the records are invalid so the error path is exercised.
+
+    python Benchmarks/validation_benchmark.py --records 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jsonschema
+
+import Validation
+
+
+def make_records(kind, n):
+    records = []
+    for i in range(n):
+        if kind == "user":
+            record = {"username": f"user{i}", "password": "x" * 64, "age": 20, "bio": "", "created_at": "(bench)",
+                      "ts": i}
+        else:
+            record = {"title": f"title {i}", "content": f"content {i}", "username": f"user{i}",
+                      "created_at": "(bench)", "id": i, "ts": i}
+        if i % 100 == 99:
+            record["ts"] = "not a number"
+            del record["username"]
+        records.append(record)
+    return records
+
+
+def rate(fn, records):
+    start = time.perf_counter()
+    fn(records)
+    return len(records) / (time.perf_counter() - start)
+
+
+def old_way(schema):
+    def run(records):
+        for record in records:
+            try:
+                jsonschema.validate(instance=record, schema=schema)
+            except jsonschema.ValidationError:
+                pass
+    return run
+
+
+def cached(kind):
+    def run(records):
+        for record in records:
+            try:
+                Validation.validate(record, kind)
+            except Validation.ValidationError:
+                pass
+    return run
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print("| schema | jsonschema.validate (/s) | Draft7 cached (/s) | fast + fallback (/s) | validate_many (/s) | speed-up |")
+    print("|---|---|---|---|---|---|")
+    for kind, schema in (("user", Validation.user_schema), ("post", Validation.post_schema)):
+        records = make_records(kind, args.records)
+        before = rate(old_way(schema), records)
+        draft7 = rate(lambda rs: [Validation.validator(kind).is_valid(r) for r in rs], records)
+        after = rate(cached(kind), records)
+        batch = rate(lambda rs: Validation.validate_many(rs, kind), records)
+        print(f"| {kind} | {before:,.0f} | {draft7:,.0f} | {after:,.0f} | {batch:,.0f} | {batch / before:.0f}x |")
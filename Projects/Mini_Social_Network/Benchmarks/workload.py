@@ -0,0 +1,198 @@
+"""
+workload.py – synthetic but realistic data for Mini Social Network
+
+Fills a fresh, empty Data/ directory (any backend) with:
+    users    names made of syllables (so prefix / typo search has real work to do),
+             all with the same stored hash of PASSWORD so logins can be benchmarked
+    follows  power law on the followee side: user popularity ~ 1 / rank^alpha,
+             so a few accounts are followed by a big part of the network;
+             the number of accounts a user follows is Pareto distributed
+    posts    a time-ordered stream: authors are picked by (another) power law,
+             words by a Zipf distribution over a vocabulary, with the odd #hashtag
+Everything is seeded, the same arguments give the same data.
+
+    python Benchmarks/workload.py --users 10000 --posts-per-user 10   # into a new temp directory
+    python Benchmarks/workload.py --dir /tmp/copy                       # into /tmp/copy/Data
+    python Benchmarks/suite.py      # uses generate() for every dataset size
+
+It never writes into a Data/ that already has files in it (like the project's
+own Data/): generate() raises FileExistsError instead.
+
+Data goes through the stores' bulk methods (see Bulk_Tool.py), then the
+timelines, the search index and the hashtag index are rebuilt so benchmarks
+measure steady state.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from itertools import accumulate
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+PASSWORD = "benchmark-password"
+BASE_TS = 1_750_000_000 * 1_000_000_000
+DAY_NS = 86_400 * 1_000_000_000
+CHUNK = 10_000
+
+SYLLABLES = ["ka", "ni", "ra", "to", "mi", "shi", "an", "el", "jo", "sa", "vi", "re", "lu", "da", "ha",
+             "no", "ar", "ya", "be", "ti", "ko", "ma", "ri", "us", "en", "pa", "li", "de", "om", "ze"]
+COMMON_WORDS = ("the a to and of i in is it for on my this with just today python learning new day code "
+                "love great time data first project working finally build fun week really now what best "
+                "about coffee weekend music study book team run home life work morning night game trip").split()
+HASHTAGS = ["python", "100daysofcode", "coding", "music", "travel", "food", "ai", "books", "gym", "devlife"]
+
+
+def _zipf_cum_weights(n, alpha):
+    return list(accumulate(1 / (rank + 1) ** alpha for rank in range(n)))
+
+
+class Workload:
+    def __init__(self, users, posts_per_user=10, follows_per_user=10, alpha=1.0, vocabulary=5000,
+                 days=30, seed=1):
+        self.n_users = users
+        self.n_posts = users * posts_per_user
+        self.follows_per_user = follows_per_user
+        self.alpha = alpha
+        self.days = days
+        self.rng = random.Random(seed)
+        self.usernames = [self._name(i) for i in range(users)]
+        # rank -> user: the most popular accounts are random users, not user 0, 1, 2...
+        self.by_popularity = self.rng.sample(range(users), users)
+        self.by_activity = self.rng.sample(range(users), users)
+        self._popularity = _zipf_cum_weights(users, alpha)
+        self._activity = _zipf_cum_weights(users, 0.8)
+        self.words = COMMON_WORDS + [self._word(i) for i in range(max(0, vocabulary - len(COMMON_WORDS)))]
+        self._word_weights = _zipf_cum_weights(len(self.words), 1.1)
+
+    def _name(self, i):
+        syllables = [SYLLABLES[self.rng.randrange(len(SYLLABLES))] for _ in range(2 + self.rng.randrange(3))]
+        return "".join(syllables) + str(i)  # NOTE: the index keeps names unique
+
+    def _word(self, i):
+        return "".join(SYLLABLES[(i // len(SYLLABLES) ** k) % len(SYLLABLES)] for k in range(3)) + "s"
+
+    def popular(self, k=1):
+        """k user indexes drawn by popularity (with repeats)."""
+        ranks = self.rng.choices(range(self.n_users), cum_weights=self._popularity, k=k)
+        return [self.by_popularity[rank] for rank in ranks]
+
+    def text(self, n_words):
+        words = self.rng.choices(self.words, cum_weights=self._word_weights, k=n_words)
+        if self.rng.random() < 0.2:
+            words.append("#" + self.rng.choice(HASHTAGS))
+        return " ".join(words)
+
+    # ---------- streams ----------
+    def users(self, password_hash):
+        for i, username in enumerate(self.usernames):
+            ts = BASE_TS - (self.n_users - i) * 1_000_000_000
+            yield {"username": username, "password": password_hash, "age": 16 + self.rng.randrange(50),
+                   "bio": self.text(5) if self.rng.random() < 0.5 else "", "created_at": "(synthetic)", "ts": ts}
+
+    def follows(self):
+        """(follower, followee) pairs, Pareto out-degree, power-law in-degree."""
+        scale = self.follows_per_user / 3  # paretovariate(1.5) has mean 3
+        for follower in range(self.n_users):
+            degree = min(self.n_users - 1, int(self.rng.paretovariate(1.5) * scale))
+            for followee in set(self.popular(degree)):
+                if followee != follower:
+                    yield self.usernames[follower], self.usernames[followee]
+
+    def posts(self):
+        span = self.days * DAY_NS
+        ts = BASE_TS
+        authors = self.rng.choices(range(self.n_users), cum_weights=self._activity, k=self.n_posts)
+        for rank in authors:
+            ts += int(self.rng.expovariate(self.n_posts / span)) + 1  # Poisson arrivals
+            yield {"title": self.text(1 + self.rng.randrange(4)), "content": self.text(5 + self.rng.randrange(30)),
+                   "username": self.usernames[self.by_activity[rank]], "created_at": "(synthetic)", "ts": ts}
+
+
+def _chunks(iterable, size=CHUNK):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def generate(workload, out=sys.stdout):
+    """Fill Data/ in the current directory, which must be empty or missing. Returns {phase: seconds}."""
+    os.makedirs("Data", exist_ok=True)
+    if os.listdir("Data"):
+        raise FileExistsError(f"{os.path.abspath('Data')} is not empty, refusing to add synthetic data to it")
+    import Credentials
+    import Repository as repo
+    from Bulk_Tool import exclusive
+    from Hashtags import tag_index
+    from Search import search_index
+    from Timeline import timelines
+
+    timings = {}
+
+    def phase(name, fn):
+        start = time.perf_counter()
+        count = fn()
+        timings[name] = round(time.perf_counter() - start, 3)
+        print(f"   {name:<9} {count:>10,}  {timings[name]:.1f}s", file=out, flush=True)
+
+    def users():
+        password_hash = Credentials.hash_password(PASSWORD)
+        with ExitStack() as stack:
+            stack.enter_context(exclusive(repo.users))
+            stack.enter_context(exclusive(repo.followers))
+            for chunk in _chunks(workload.users(password_hash)):
+                repo.users.add_many(chunk)
+                repo.followers.ensure_users([user["username"] for user in chunk])
+        return repo.users.count()
+
+    def store_chunks(store, add, stream):
+        with exclusive(store) as writer:
+            total = 0
+            for chunk in _chunks(stream):
+                result = add(chunk)
+                total += result if isinstance(result, int) else len(result)
+                if writer is not None:
+                    writer.checkpoint()
+        return total
+
+    phase("users", users)
+    phase("follows", lambda: store_chunks(repo.followers, repo.followers.follow_many, workload.follows()))
+    phase("posts", lambda: store_chunks(repo.posts, repo.posts.add_many, workload.posts()))
+    phase("compact", lambda: sum([repo.posts.compact(), repo.followers.compact()]))
+    timelines.invalidate()
+    phase("timelines", timelines.rebuild)
+    phase("search", search_index.rebuild)
+    phase("tags", tag_index.rebuild)
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic users, follows and posts into a fresh Data/")
+    parser.add_argument("--dir", help="fill DIR/Data, which must be empty or missing (default: a new temp directory)")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--posts-per-user", type=int, default=10)
+    parser.add_argument("--follows-per-user", type=int, default=10, help="mean out-degree")
+    parser.add_argument("--alpha", type=float, default=1.0, help="popularity power law exponent")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    # NOTE: before anything imports Storage, its DATA_DIR is relative to the cwd
+    target = os.path.abspath(args.dir) if args.dir else tempfile.mkdtemp(prefix="msn-workload-")
+    os.makedirs(target, exist_ok=True)
+    os.chdir(target)
+    print(f"🧪 Generating {args.users:,} users into {os.path.abspath('Data')}")
+    try:
+        generate(Workload(args.users, args.posts_per_user, args.follows_per_user, args.alpha, seed=args.seed))
+    except FileExistsError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"✔ Done. Use it with: cd {target} && python {os.path.join(PROJECT_DIR, 'main.py')}")
@@ -0,0 +1,145 @@
+"""
+write_stress.py – many threads in many processes writing at once, nothing may get lost
+
+8 processes x 50 threads each add posts (plus a few registrations and follows)
+to the SAME fresh Data/ directory, while every process also compacts its logs
+every few milliseconds. Posts go through Post.create_post, like the app's, so
+each one is also fanned out to timelines and indexed for search and hashtags.
+Afterwards a fresh process reloads everything and checks:
+    - every post written is there exactly once, ids are 0..N-1
+    - every registered user and every follow edge is there
+    - every post is in the #stress hashtag index and found by search
+    - every post is in its author's timeline (Data/timelines/)
+Exits with status 1 if anything was lost, prints the throughput otherwise.
+
+    python Benchmarks/write_stress.py
+    python Benchmarks/write_stress.py --processes 8 --threads 50 --posts 40 --backend sqlite
+"""
+import argparse
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+
+def writer_process(proc, processes, threads, posts_per_thread, barrier):
+    """Runs in its own process, cwd is the shared temp directory."""
+    import Repository as repo
+    from Hashtags import tag_index
+    from Post import Post
+
+    repo.posts.start_compactor(interval=0.005, min_bytes=0)
+    repo.followers.start_compactor(interval=0.005, min_bytes=0)
+    tag_index.start_compactor(interval=0.005, min_bytes=0)
+
+    def work(thread):
+        name = f"p{proc}t{thread}"
+        repo.users.add({"username": name, "password": "x", "age": 20, "bio": "", "created_at": "(stress)", "ts": 0})
+        repo.followers.follow(name, f"p{(proc + 1) % processes}t{thread}")
+        for i in range(posts_per_thread):
+            if Post("stress", f"{name}/{i} #stress", name, "(stress)", time.time_ns()).create_post() is None:
+                raise RuntimeError(f"post {name}/{i} didn't validate")
+
+    workers = [threading.Thread(target=work, args=(t,)) for t in range(threads)]
+    barrier.wait()  # all processes start hammering at the same moment
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def verify(processes, threads, posts_per_thread):
+    """Fresh process: load from disk only."""
+    import Repository as repo
+    from Hashtags import tag_index
+    from Search import search_index
+    from Timeline import timelines
+
+    problems = []
+    posts = repo.posts.data()
+    expected = processes * threads * posts_per_thread
+    if [post["id"] for post in posts] != list(range(len(posts))):
+        problems.append("post ids are not 0..N-1")
+    seen = Counter(post["content"].removesuffix(" #stress") for post in posts)
+    wanted = {f"p{p}t{t}/{i}" for p in range(processes) for t in range(threads) for i in range(posts_per_thread)}
+    missing, duplicated = wanted - seen.keys(), [c for c, n in seen.items() if n > 1]
+    if len(posts) != expected or missing or duplicated:
+        problems.append(f"posts: {len(posts)}/{expected}, {len(missing)} missing, {len(duplicated)} duplicated")
+    names = {f"p{p}t{t}" for p in range(processes) for t in range(threads)}
+    lost_users = names - set(repo.users.usernames())
+    if lost_users:
+        problems.append(f"{len(lost_users)} users lost")
+    edges = [(f"p{p}t{t}", f"p{(p + 1) % processes}t{t}") for p in range(processes) for t in range(threads)]
+    lost_edges = [edge for edge in edges if not repo.followers.is_following(*edge)]
+    if lost_edges:
+        problems.append(f"{len(lost_edges)} follows lost")
+    tagged = len(set(tag_index.posts_with("stress")))
+    if tagged != len(posts):
+        problems.append(f"#stress index: {tagged}/{len(posts)} posts")
+    found = len(search_index.search("stress", limit=len(posts) + 1))
+    if found != len(posts):
+        problems.append(f"search: {found}/{len(posts)} posts")
+    # A timeline has all of the user's own posts, and every post of the followee
+    # after the first one that made it in (the ones before the follow aren't in it)
+    by_author = {}
+    for post in posts:
+        by_author.setdefault(post["username"], []).append(post["id"])
+    lost_ids = {}
+    for follower, followee in edges:
+        timeline = set(timelines.feed_ids(follower, timelines.cap))
+        theirs = [post_id for post_id in by_author.get(followee, ()) if post_id in timeline]
+        wanted = set(by_author.get(follower, ())) | {i for i in by_author.get(followee, ()) if theirs and i > theirs[0]}
+        if wanted - timeline:
+            lost_ids[follower] = wanted - timeline
+    if lost_ids:
+        problems.append(f"timelines: {sum(map(len, lost_ids.values()))} ids lost across {len(lost_ids)} users")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent write stress test for the storage layer")
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=50)
+    parser.add_argument("--posts", type=int, default=20, help="posts per thread")
+    parser.add_argument("--backend", choices=("json", "sqlite"), default="json")
+    parser.add_argument("--verify", nargs=3, type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.verify:
+        problems = verify(*args.verify)
+        print("\n".join(problems) or "ok")
+        sys.exit(1 if problems else 0)
+
+    os.environ["MSN_BACKEND"] = args.backend
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.makedirs("Data/timelines")
+        ctx = multiprocessing.get_context("spawn")  # clean interpreters, like separate runs of main.py
+        barrier = ctx.Barrier(args.processes + 1)
+        procs = [ctx.Process(target=writer_process, args=(p, args.processes, args.threads, args.posts, barrier))
+                 for p in range(args.processes)]
+        for proc in procs:
+            proc.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for proc in procs:
+            proc.join()
+        elapsed = time.perf_counter() - start
+
+        total = args.processes * args.threads * args.posts
+        print(f"{args.processes} processes x {args.threads} threads, backend={args.backend}")
+        print(f"{total:,} posts + {args.processes * args.threads * 2:,} other writes in {elapsed:.2f}s "
+              f"-> {total / elapsed:,.0f} posts/s")
+        check = subprocess.run([sys.executable, os.path.abspath(__file__), "--verify",
+                                str(args.processes), str(args.threads), str(args.posts)])
+        if any(proc.exitcode for proc in procs) or check.returncode:
+            print("✖ lost or failed writes")
+            sys.exit(1)
+        print("✔ no lost writes")
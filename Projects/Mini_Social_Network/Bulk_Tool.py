@@ -0,0 +1,274 @@
+"""
+Bulk_Tool.py – import / export users, posts and follows in bulk
+
+    python -m Bulk_Tool import users   people.csv
+    python -m Bulk_Tool import follows follows.jsonl
+    python -m Bulk_Tool import posts   posts.jsonl --chunk 20000
+    python -m Bulk_Tool export posts   posts_backup.csv
+
+Files are JSON lines (one object per line) or CSV with a header row, picked by
+the extension. Fields:
+    users   : username, password, age, bio, created_at[, ts]   password = a stored hash
+                                                               (Credentials.py), never plain text
+    posts   : title, content, username, created_at[, ts]       ids are assigned on import
+    follows : follower, followee
+Import users first, then follows, then posts (posts / follows of unknown users are skipped).
+
+Post ids must grow with "ts" (feeds, timelines and cursors rely on it), and
+imported posts get ids after every stored one. So posts files are expected in
+time order (export writes them that way): each chunk is sorted by ts, and a
+post older than the newest one already stored is rejected, or with --restamp
+moved forward to that time (its created_at is updated to match).
+
+Import streams the file in chunks of --chunk records. For each chunk:
+    1. validate it in one go (Validation.validate_many), bad records are reported and skipped
+    2. drop duplicates: a set of every username already stored or seen earlier in the file
+    3. store the whole chunk with ONE call (add_many / follow_many)
+The import holds the store's write lock from start to end (WriteCoordinator.exclusive),
+so records don't go through the writer queue one by one. Posts and follows are
+committed (one write + fsync) after every chunk, users.json is written once at the end.
+Materialized timelines are dropped afterwards and rebuilt on first use.
+--compact folds the journal into the snapshot right away (otherwise the
+compactor does it), so the next start doesn't replay a million log lines.
+
+Export streams the store record by record, the tool's own memory doesn't grow
+with the file (the JSON backend keeps its store in memory anyway).
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter
+from contextlib import ExitStack, nullcontext
+from itertools import islice
+
+import Credentials
+import Repository as repo
+import Timestamp
+from Validation import validate_many
+
+CHUNK_SIZE = 10_000
+MAX_REPORTED = 20  # bad records printed, the rest are only counted
+
+FIELDS = {
+    "users": ["username", "password", "age", "bio", "created_at", "ts"],
+    "posts": ["id", "title", "content", "username", "created_at", "ts"],
+    "follows": ["follower", "followee"],
+}
+NUMBER_FIELDS = {"age", "ts", "id"}
+
+
+# ---------- reading ----------
+def _number(text):
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return float(text)
+        except ValueError:
+            return text  # let validation complain about it
+
+
+def read_records(path):
+    """Yield (line number, record). A line that isn't valid JSON gives (line, None)."""
+    with open(path, "r", newline="", encoding="utf-8") as file:
+        if path.endswith(".csv"):
+            # NOTE: CSV has no types, numbers come back as strings and missing values as ""
+            for line, row in enumerate(csv.DictReader(file), 2):
+                yield line, {key: _number(value) if key in NUMBER_FIELDS else value
+                             for key, value in row.items() if value != ""}
+        else:
+            for line, text in enumerate(file, 1):
+                if text.strip():
+                    try:
+                        yield line, json.loads(text)
+                    except json.JSONDecodeError:
+                        yield line, None
+
+
+def chunks(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ---------- import ----------
+class Importer:
+    def __init__(self, kind, out=sys.stdout, restamp=False):
+        self.kind = kind
+        self.out = out
+        self.restamp = restamp  # posts: move too-old posts forward instead of rejecting them
+        self.newest_ts = None   # posts: ts of the newest stored post, no import may go below it
+        self.stats = Counter()
+        self.usernames = set(repo.users.usernames())
+        self.followers_seen = set()  # follows: whose suggestions are stale now
+
+    def reject(self, line, reason):
+        self.stats["rejected"] += 1
+        if self.stats["rejected"] <= MAX_REPORTED:
+            print(f"✖ line {line}: {reason}", file=self.out)
+
+    def valid(self, rows, schema):
+        """The (line, record) pairs that pass the schema, reporting the others."""
+        problems = dict(validate_many([record for _, record in rows], schema))
+        for index, (line, record) in enumerate(rows):
+            if index in problems:
+                self.reject(line, "; ".join(problems[index]) if record is not None else "not valid JSON")
+            else:
+                yield line, record
+
+    def users(self, rows):
+        good = []
+        for line, record in self.valid(rows, "user"):
+            username = record["username"]
+            if username in self.usernames:
+                self.stats["duplicates"] += 1
+            elif not Credentials.is_hash(record["password"]):
+                self.reject(line, "password is not a stored hash")
+            else:
+                self.usernames.add(username)
+                Timestamp.ensure_ts(record)
+                good.append(record)
+        self.stats["imported"] += repo.users.add_many(good)
+        repo.followers.ensure_users([record["username"] for record in good])
+
+    def posts(self, rows):
+        good = []
+        for line, record in self.valid(rows, "post"):
+            if record["username"] not in self.usernames:
+                self.reject(line, f"unknown user {record['username']!r}")
+                continue
+            record.pop("id", None)
+            record.setdefault("title", "")
+            Timestamp.ensure_ts(record)
+            good.append((line, record))
+        if self.newest_ts is None:
+            count = repo.posts.count()  # NOTE: stable, run() holds the posts writer
+            self.newest_ts = repo.posts.get(count - 1)["ts"] if count else 0
+        in_order = []
+        for line, record in sorted(good, key=lambda item: item[1]["ts"]):
+            if record["ts"] < self.newest_ts:
+                if not self.restamp:
+                    self.reject(line, "older than the posts already stored (sort the file by ts, or --restamp)")
+                    continue
+                record["ts"] = self.newest_ts
+                record["created_at"] = Timestamp.display(self.newest_ts)
+                self.stats["restamped"] += 1
+            self.newest_ts = record["ts"]
+            in_order.append(record)
+        self.stats["imported"] += len(repo.posts.add_many(in_order))
+
+    def follows(self, rows):
+        edges = []
+        for line, record in rows:
+            if not isinstance(record, dict):  # NOTE: valid JSON can still be a list, a string, ...
+                self.reject(line, "not valid JSON" if record is None else "not a JSON object")
+                continue
+            follower, followee = record.get("follower"), record.get("followee")
+            if not isinstance(follower, str) or not isinstance(followee, str):
+                self.reject(line, "needs 'follower' and 'followee'")
+            elif follower == followee:
+                self.reject(line, "self-follow")
+            elif follower not in self.usernames or followee not in self.usernames:
+                self.reject(line, f"unknown user {follower if follower not in self.usernames else followee!r}")
+            else:
+                edges.append((follower, followee))
+                self.followers_seen.add(follower)
+        added = repo.followers.follow_many(edges)
+        self.stats["imported"] += added
+        self.stats["duplicates"] += len(edges) - added
+
+    def run(self, path, chunk_size=CHUNK_SIZE, compact=False):
+        handle = getattr(self, self.kind)
+        # (store, commit after every chunk?): users.json is rewritten whole, so only once at the end
+        stores = {"users": [(repo.users, False), (repo.followers, True)],
+                  "posts": [(repo.posts, True)],
+                  "follows": [(repo.followers, True)]}[self.kind]
+        with ExitStack() as stack:
+            writers = [(stack.enter_context(exclusive(store)), per_chunk) for store, per_chunk in stores]
+            for chunk in chunks(read_records(path), chunk_size):
+                handle(chunk)
+                self.stats["read"] += len(chunk)
+                for writer, per_chunk in writers:
+                    if writer is not None and per_chunk:
+                        writer.checkpoint()
+        self.after_import()
+        if compact:
+            for store, _ in stores:
+                store.compact()
+        return self.stats
+
+    def after_import(self):
+        if self.stats["imported"] == 0 or self.kind == "users":
+            return
+        from Timeline import timelines
+        timelines.invalidate()
+        if self.kind == "follows":
+            from Recommendation import recommender
+            stale = set(self.followers_seen)
+            for username in self.followers_seen:
+                stale |= repo.followers.followers_of(username)
+            recommender.store.invalidate(stale)
+
+
+def exclusive(store):
+    """The store's writer held by this thread (JSON backend); SQLite uses its own transactions."""
+    writer = getattr(store, "writer", None)
+    return writer.exclusive() if writer is not None else nullcontext()
+
+
+# ---------- export ----------
+def scan(kind):
+    if kind == "follows":
+        return ({"follower": follower, "followee": followee} for follower, followee in repo.followers.edges())
+    return repo.users.scan() if kind == "users" else repo.posts.scan()
+
+
+def export_file(kind, path):
+    """Write every record of `kind` to path (temp file + os.replace). Returns the count."""
+    count = 0
+    temp = path + ".tmp"
+    with open(temp, "w", newline="", encoding="utf-8") as file:
+        if path.endswith(".csv"):
+            writer = csv.DictWriter(file, FIELDS[kind], extrasaction="ignore")
+            writer.writeheader()
+            for record in scan(kind):
+                writer.writerow(record)
+                count += 1
+        else:
+            for record in scan(kind):
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                count += 1
+    os.replace(temp, path)
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import / export for Mini Social Network")
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("kind", choices=list(FIELDS))
+    parser.add_argument("path", help="a .jsonl or .csv file")
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="records validated and stored at once")
+    parser.add_argument("--compact", action="store_true", help="import: fold the journal into the snapshot at the end")
+    parser.add_argument("--restamp", action="store_true",
+                        help="import posts: move posts older than the stored ones forward instead of rejecting them")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.action == "import":
+        stats = Importer(args.kind, restamp=args.restamp).run(args.path, args.chunk, args.compact)
+        seconds = time.perf_counter() - start
+        print(f"✔ Imported {stats['imported']:,} of {stats['read']:,} {args.kind} in {seconds:.1f}s "
+              f"({stats['duplicates']:,} duplicates, {stats['rejected']:,} rejected"
+              + (f", {stats['restamped']:,} restamped)" if stats["restamped"] else ")"))
+        if args.kind == "posts" and stats["imported"]:
+            print("Search catches up on the next query, or run: python Search.py --rebuild")
+            print("Hashtags / mentions of imported posts: python Hashtags.py --rebuild")
+    else:
+        count = export_file(args.kind, args.path)
+        print(f"✔ Exported {count:,} {args.kind} to {args.path} in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,143 @@
+"""
+Credentials.py – password hashing
+
+Old accounts store sha256(password).hexdigest(): no salt, and fast enough to
+brute force billions of guesses per second. New hashes are salted and slow on
+purpose, and carry their own parameters so the cost can be raised later:
+    scrypt$16384$8$1$<salt b64>$<hash b64>
+    pbkdf2_sha256$600000$<salt b64>$<hash b64>
+A legacy SHA-256 hash still logs in, and is replaced by a new hash right after
+(see Util.login_verification). Same for hashes made with a lower cost.
+
+The KDF costs ~tens of ms of CPU per login. For many logins at once (a server),
+verify_async() runs it on a bounded process pool, so logins run in parallel
+instead of queueing on one core, and callers block once the pool is full.
+"""
+import base64
+import hashlib
+import hmac
+import os
+import threading
+
+ALGORITHM = "scrypt"          # or "pbkdf2_sha256"
+SCRYPT_N = 2 ** 14            # CPU/memory cost (power of 2), memory = 128 * N * r bytes
+SCRYPT_R = 8
+SCRYPT_P = 1
+PBKDF2_ITERATIONS = 600_000
+SALT_BYTES = 16
+
+POOL_WORKERS = os.cpu_count() or 2
+POOL_MAX_PENDING = POOL_WORKERS * 4  # logins queued before callers have to wait
+
+
+def _b64(raw):
+    return base64.b64encode(raw).decode()
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r * p, dklen=32)
+
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+
+
+def hash_password(password, algorithm=ALGORITHM, cost=None):
+    """`cost` is N for scrypt, iterations for PBKDF2 (default: the module settings)."""
+    salt = os.urandom(SALT_BYTES)
+    if algorithm == "scrypt":
+        n = cost or SCRYPT_N
+        digest = _scrypt(password, salt, n, SCRYPT_R, SCRYPT_P)
+        return f"scrypt${n}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+    if algorithm == "pbkdf2_sha256":
+        iterations = cost or PBKDF2_ITERATIONS
+        return f"pbkdf2_sha256${iterations}${_b64(salt)}${_b64(_pbkdf2(password, salt, iterations))}"
+    raise ValueError(f"Unknown algorithm: {algorithm}")
+
+
+def is_legacy(stored):
+    return "$" not in stored and len(stored) == 64
+
+
+def is_hash(stored):
+    """True if `stored` looks like a stored password (hash_password() or legacy), not plain text."""
+    return is_legacy(stored) or stored.split("$", 1)[0] in ("scrypt", "pbkdf2_sha256")
+
+
+def needs_rehash(stored, algorithm=ALGORITHM):
+    """True for legacy SHA-256 hashes and hashes weaker than the current settings."""
+    if is_legacy(stored):
+        return True
+    parts = stored.split("$")
+    if parts[0] != algorithm:
+        return True
+    if algorithm == "scrypt":
+        return int(parts[1]) < SCRYPT_N
+    return int(parts[1]) < PBKDF2_ITERATIONS
+
+
+def verify_password(password, stored):
+    """Returns (ok, needs_rehash)."""
+    if is_legacy(stored):
+        ok = hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored)
+        return ok, ok
+    parts = stored.split("$")
+    try:
+        if parts[0] == "scrypt":
+            n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+            salt, expected = base64.b64decode(parts[4]), base64.b64decode(parts[5])
+            digest = _scrypt(password, salt, n, r, p)
+        elif parts[0] == "pbkdf2_sha256":
+            iterations = int(parts[1])
+            salt, expected = base64.b64decode(parts[2]), base64.b64decode(parts[3])
+            digest = _pbkdf2(password, salt, iterations)
+        else:
+            return False, False
+    except (IndexError, ValueError):
+        return False, False
+    ok = hmac.compare_digest(digest, expected)
+    return ok, ok and needs_rehash(stored)
+
+
+# ---------- bounded process pool ----------
+_pool = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(POOL_MAX_PENDING)
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # NOTE: imported here, multiprocessing adds ~50 ms to every start otherwise
+            from concurrent.futures import ProcessPoolExecutor
+            _pool = ProcessPoolExecutor(max_workers=POOL_WORKERS)
+        return _pool
+
+
+def _submit(fn, *args):
+    _slots.acquire()  # back-pressure: wait while POOL_MAX_PENDING jobs are in flight
+    try:
+        future = _get_pool().submit(fn, *args)
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+
+def verify_async(password, stored):
+    """Future -> (ok, needs_rehash), computed in a worker process."""
+    return _submit(verify_password, password, stored)
+
+
+def hash_async(password, algorithm=ALGORITHM, cost=None):
+    return _submit(hash_password, password, algorithm, cost)
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
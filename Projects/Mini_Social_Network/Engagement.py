@@ -0,0 +1,339 @@
+"""
+Engagement.py – likes and views per post, counted in memory, flushed in batches
+
+A like or a view must not rewrite posts.json, or even append a log line each:
+one feed page alone is 20 views. So:
+    like / view -> goes into the SHARD of the calling thread (a Counter with its
+                   own lock). Only the flusher ever takes that lock too, so
+                   request threads never wait for each other. Same race as the
+                   shared counter in Day-32, solved with one counter per
+                   thread instead of one lock for all.
+    flusher     -> every FLUSH_INTERVAL_MS swaps each shard's Counter for an
+                   empty one, merges them and writes ONE journal record
+                   (Data/engagement.log) for the whole batch.
+Counts you read are the stored ones plus whatever is still in the shards, so
+your own like shows up right away.
+
+Likes are one per user and post (a set of likers per post), views are counts.
+Journal records carry a sequence number, so a record that is already in the
+snapshot (crash during compaction) is not counted twice.
+
+"Top posts in the last hour" comes from a ring buffer of RING_SLOTS buckets of
+BUCKET_SECONDS each (post id -> score). Each flushed record is added to the
+bucket of its time; a slot is reset when the ring comes round to it again, so
+memory depends on the window, not on how many posts there are.
+    score = LIKE_WEIGHT * likes + views      (an unlike takes the like back)
+The buckets still inside the window are saved in the snapshot too, so after a
+compaction every process still ranks the last hour the same way.
+"""
+import atexit
+import os
+import threading
+import time
+from collections import Counter
+from itertools import islice
+
+import Repository as repo
+import Timestamp
+from Storage import DATA_DIR
+
+ENGAGEMENT_PATH = os.path.join(DATA_DIR, "engagement.json")
+FLUSH_INTERVAL_MS = 500
+BUCKET_SECONDS = 60
+RING_SLOTS = 60          # 60 x 1 minute = the last hour
+LIKE_WEIGHT = 5          # one like counts as much as 5 views for "popular"
+
+
+class RecentRing:
+    """Ring of time buckets, each a Counter post id -> score."""
+
+    def __init__(self, slots=RING_SLOTS, bucket_seconds=BUCKET_SECONDS):
+        self.slots = slots
+        self.bucket_ns = bucket_seconds * 1_000_000_000
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._numbers = [None] * self.slots  # which bucket (ts // bucket_ns) each slot holds
+            self._buckets = [Counter() for _ in range(self.slots)]
+
+    def add(self, ts, scores):
+        number = ts // self.bucket_ns
+        if number <= Timestamp.now_ns() // self.bucket_ns - self.slots:
+            return  # older than the whole window
+        slot = number % self.slots
+        with self._lock:
+            if self._numbers[slot] != number:
+                if self._numbers[slot] is not None and self._numbers[slot] > number:
+                    return  # the slot already moved on to a newer bucket
+                self._numbers[slot] = number
+                self._buckets[slot] = Counter()
+            self._buckets[slot].update(scores)
+
+    def buckets(self):
+        """{bucket number: {post id: score}} of the buckets still inside the window."""
+        oldest = Timestamp.now_ns() // self.bucket_ns - self.slots
+        with self._lock:
+            return {number: {post_id: score for post_id, score in bucket.items() if score}
+                    for number, bucket in zip(self._numbers, self._buckets) if number is not None and number > oldest}
+
+    def load(self, buckets):
+        """Start over from what buckets() returned (keys may be strings, from JSON)."""
+        self.clear()
+        for number, scores in buckets.items():
+            self.add(int(number) * self.bucket_ns, {int(post_id): score for post_id, score in scores.items()})
+
+    def totals(self):
+        """Scores summed over the buckets still inside the window."""
+        oldest = Timestamp.now_ns() // self.bucket_ns - self.slots
+        totals = Counter()
+        with self._lock:
+            for number, bucket in zip(self._numbers, self._buckets):
+                if number is not None and number > oldest:
+                    totals.update(bucket)
+        return totals
+
+
+class EngagementStore(repo.JournaledStore):
+    """
+    engagement.json = {"seq": n, "views": {post id: n}, "likes": {post id: [usernames]},
+                       "ring": {bucket number: {post id: score}}}
+    engagement.log  = one record per flush:
+        {"seq", "ts", "views": {post id: +n}, "like": [[post id, user]], "unlike": [...]}
+    """
+
+    def __init__(self, path, ring):
+        super().__init__(path, dict)
+        self.ring = ring
+        self._seq = 0
+        self._views = {}
+        self._likers = {}
+
+    def _build_index(self):
+        self._seq = self._data.get("seq", 0)
+        self._views = {int(post_id): n for post_id, n in self._data.get("views", {}).items()}
+        self._likers = {int(post_id): set(users) for post_id, users in self._data.get("likes", {}).items()}
+        self.ring.load(self._data.get("ring", {}))
+        self._data = {}  # the dicts above (and the ring) hold everything
+
+    def _apply(self, records):
+        for record in records:
+            if record["seq"] <= self._seq:
+                continue  # already in the snapshot
+            self._seq = record["seq"]
+            scores = Counter()
+            for post_id, n in record.get("views", {}).items():
+                post_id = int(post_id)
+                self._views[post_id] = self._views.get(post_id, 0) + n
+                scores[post_id] += n
+            for post_id, username in record.get("like", ()):
+                self._likers.setdefault(post_id, set()).add(username)
+                scores[post_id] += LIKE_WEIGHT
+            for post_id, username in record.get("unlike", ()):
+                self._likers.get(post_id, set()).discard(username)
+                scores[post_id] -= LIKE_WEIGHT
+            self.ring.add(record["ts"], scores)
+
+    def save(self):
+        with self._lock:
+            self._data = {"seq": self._seq,
+                          "views": {str(post_id): n for post_id, n in self._views.items()},
+                          "likes": {str(post_id): sorted(users) for post_id, users in self._likers.items() if users},
+                          "ring": {str(number): {str(post_id): score for post_id, score in bucket.items()}
+                                   for number, bucket in self.ring.buckets().items()}}
+            super().save()
+            self._data = {}
+
+    def record(self, views, likes, unlikes):
+        """Store one flushed batch (a single journal line)."""
+        def write():
+            with self._lock:
+                self.data()
+                self._stage({"seq": self._seq + 1, "ts": Timestamp.now_ns(),
+                             "views": {str(post_id): n for post_id, n in views.items()},
+                             "like": likes, "unlike": unlikes})
+        self._write(write)
+
+    def recent(self):
+        """Scores of the last hour, including what other processes logged since we last looked."""
+        with self._lock:
+            self.data()
+            return self.ring.totals()
+
+    def counts(self, post_ids):
+        """[(set of likers, views), ...] as stored, one data() call for the whole page."""
+        with self._lock:
+            self.data()
+            return [(set(self._likers.get(post_id, ())), self._views.get(post_id, 0)) for post_id in post_ids]
+
+
+class _Shard:
+    """One thread's pending increments."""
+    __slots__ = ("lock", "thread", "views", "likes")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.thread = threading.current_thread()
+        self.views = Counter()  # post id -> views
+        self.likes = {}         # post id -> {username: +1 like / -1 unlike}, last one wins
+
+
+class Engagement:
+    def __init__(self, path=ENGAGEMENT_PATH, interval_ms=FLUSH_INTERVAL_MS):
+        self.ring = RecentRing()
+        self.store = EngagementStore(path, self.ring)
+        self.interval = interval_ms / 1000
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._in_flight = []  # shards' contents being written right now (still counted by readers)
+        self._flusher = None
+        # NOTE: registered here, once. Registering it when the flusher starts
+        # could happen during interpreter shutdown, too late for atexit
+        atexit.register(self._flush_at_exit)  # don't lose the last few ms worth of likes on exit
+
+    # ---------- write side (hot path) ----------
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+                self._start_flusher()
+        return shard
+
+    def view(self, post_ids):
+        """Count one view for each post id."""
+        shard = self._shard()
+        with shard.lock:
+            shard.views.update(post_ids)
+
+    def like(self, post_id, username):
+        """Returns False if username already liked it."""
+        if self.has_liked(post_id, username):
+            return False
+        self._set_like(post_id, username, 1)
+        return True
+
+    def unlike(self, post_id, username):
+        """Returns False if username hadn't liked it."""
+        if not self.has_liked(post_id, username):
+            return False
+        self._set_like(post_id, username, -1)
+        return True
+
+    def _set_like(self, post_id, username, op):
+        shard = self._shard()
+        with shard.lock:
+            shard.likes.setdefault(post_id, {})[username] = op
+
+    # ---------- read side ----------
+    def _merged(self, post_ids):
+        """[(set of likers, views), ...]: what is stored + what is still pending in the shards."""
+        stored = self.store.counts(post_ids)
+        # NOTE: under _shards_lock a flush can't move a shard's content to
+        # _in_flight while we add it up (it would be missed or counted twice)
+        merged = []
+        with self._shards_lock:
+            for post_id, (likers, views) in zip(post_ids, stored):
+                for shard in self._shards + self._in_flight:
+                    views += shard.views.get(post_id, 0)
+                    for username, op in list(shard.likes.get(post_id, {}).items()):
+                        (likers.add if op > 0 else likers.discard)(username)
+                merged.append((likers, views))
+        return merged
+
+    def counts(self, post_ids):
+        """[(likes, views), ...] for a page of posts."""
+        return [(len(likers), views) for likers, views in self._merged(post_ids)]
+
+    def likes(self, post_id):
+        return self.counts([post_id])[0][0]
+
+    def views(self, post_id):
+        return self.counts([post_id])[0][1]
+
+    def has_liked(self, post_id, username):
+        return username in self._merged([post_id])[0][0]
+
+    def top_posts(self, limit=10, keep=None):
+        """[(post id, score), ...] of the last hour, best first. keep(post_id) filters."""
+        # NOTE: a like taken back in a later bucket can leave a post at 0 (or below)
+        ranked = sorted(((post_id, score) for post_id, score in self.store.recent().items() if score > 0),
+                        key=lambda item: (-item[1], -item[0]))
+        if keep is not None:
+            ranked = (item for item in ranked if keep(item[0]))
+        return list(islice(ranked, limit))
+
+    # ---------- flushing ----------
+    def pending(self):
+        """True if some like / view isn't written yet."""
+        with self._shards_lock:
+            return any(shard.views or shard.likes for shard in self._shards)
+
+    def flush(self):
+        """Write everything pending as one journal record. Returns the number of changes."""
+        with self._flush_lock:
+            with self._shards_lock:
+                if not any(shard.views or shard.likes for shard in self._shards):
+                    return 0  # nothing to write, no journal line, no lock on the store
+                swapped = []
+                for shard in self._shards:
+                    taken = _Shard()
+                    taken.thread = None  # nobody adds to it, dropped once it's stored
+                    with shard.lock:
+                        taken.views, shard.views = shard.views, Counter()
+                        taken.likes, shard.likes = shard.likes, {}
+                    swapped.append(taken)
+                # Threads that are gone won't add anything any more
+                self._shards = [shard for shard in self._shards if shard.thread and shard.thread.is_alive()]
+                self._in_flight = swapped
+            try:
+                views, likes = Counter(), {}
+                for taken in swapped:
+                    views.update(taken.views)
+                    for post_id, users in taken.likes.items():
+                        likes.setdefault(post_id, {}).update(users)
+                like = [[post_id, user] for post_id, users in likes.items() for user, op in users.items() if op > 0]
+                unlike = [[post_id, user] for post_id, users in likes.items() for user, op in users.items() if op < 0]
+                if views or like or unlike:
+                    self.store.record(views, like, unlike)
+            except BaseException:
+                with self._shards_lock:
+                    self._shards += swapped  # not lost: the next flush tries them again
+                    self._in_flight = []
+                raise
+            with self._shards_lock:
+                self._in_flight = []
+            return sum(views.values()) + len(like) + len(unlike)
+
+    def _start_flusher(self):
+        if self._flusher is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(self.interval)
+                try:
+                    self.flush()
+                except Exception as e:  # keep counting, the batch is retried next round
+                    print(f"⚠️ engagement flush failed: {e}")
+
+        try:
+            self._flusher = threading.Thread(target=run, daemon=True)
+            self._flusher.start()
+            self.store.start_compactor()
+        except RuntimeError:  # interpreter shutting down: _flush_at_exit writes what's pending
+            self._flusher = None
+
+    def _flush_at_exit(self):
+        # NOTE: no new thread may start at exit (Python 3.12+), not even the
+        # store's writer, so the write runs right here, holding the store's lock
+        if self.pending():
+            with self.store.writer.exclusive():
+                self.flush()
+
+
+engagement = Engagement()
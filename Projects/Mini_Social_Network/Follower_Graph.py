@@ -0,0 +1,123 @@
+"""
+Follower_Graph.py – the follow graph as adjacency sets
+
+followers.json keeps   user -> [followees]   as a list, so `in` / remove() are
+O(degree) and "who follows me" needs a scan over every user. Here:
+    - every username is interned to a small int (one string per user)
+    - out[i] = set of ids that i follows      (forward adjacency)
+    - in_[i] = set of ids that follow i       (reverse adjacency)
+so follow / unfollow / is_following are O(1), counts are len() and mutual
+follows are a set intersection.
+
+This class is only the in-memory index. Persistence (followers.json snapshot +
+followers.log edge events) lives in Repository.FollowerStore.
+"""
+
+
+class FollowerGraph:
+    def __init__(self):
+        self._ids = {}       # username -> id
+        self._names = []     # id -> username
+        self._out = []       # id -> set of followee ids
+        self._in = []        # id -> set of follower ids
+        self._members = set()  # ids that have an entry in followers.json
+
+    def intern(self, username):
+        user_id = self._ids.get(username)
+        if user_id is None:
+            user_id = len(self._names)
+            self._ids[username] = user_id
+            self._names.append(username)
+            self._out.append(set())
+            self._in.append(set())
+        return user_id
+
+    def _names_of(self, ids):
+        return {self._names[i] for i in ids}
+
+    # ---------- updates ----------
+    def add_user(self, username):
+        """Returns False if the user was already there."""
+        user_id = self.intern(username)
+        if user_id in self._members:
+            return False
+        self._members.add(user_id)
+        return True
+
+    def follow(self, username, target):
+        """Returns False if the edge already existed."""
+        a, b = self.intern(username), self.intern(target)
+        self._members.add(a)
+        if b in self._out[a]:
+            return False
+        self._out[a].add(b)
+        self._in[b].add(a)
+        return True
+
+    def unfollow(self, username, target):
+        """Returns False if there was no such edge."""
+        a, b = self._ids.get(username), self._ids.get(target)
+        if a is None or b is None or b not in self._out[a]:
+            return False
+        self._out[a].discard(b)
+        self._in[b].discard(a)
+        return True
+
+    # ---------- queries ----------
+    def has_user(self, username):
+        return self._ids.get(username) in self._members
+
+    def is_following(self, username, target):
+        a, b = self._ids.get(username), self._ids.get(target)
+        return a is not None and b is not None and b in self._out[a]
+
+    def following(self, username):
+        user_id = self._ids.get(username)
+        return set() if user_id is None else self._names_of(self._out[user_id])
+
+    def followers_of(self, username):
+        user_id = self._ids.get(username)
+        return set() if user_id is None else self._names_of(self._in[user_id])
+
+    def following_count(self, username):
+        user_id = self._ids.get(username)
+        return 0 if user_id is None else len(self._out[user_id])
+
+    def followers_count(self, username):
+        user_id = self._ids.get(username)
+        return 0 if user_id is None else len(self._in[user_id])
+
+    def mutuals(self, username):
+        """Users that `username` follows AND that follow `username` back."""
+        user_id = self._ids.get(username)
+        if user_id is None:
+            return set()
+        return self._names_of(self._out[user_id] & self._in[user_id])
+
+    def is_mutual(self, username, target):
+        return self.is_following(username, target) and self.is_following(target, username)
+
+    def users(self):
+        return [self._names[i] for i in sorted(self._members)]
+
+    def edges(self):
+        """Yield (follower, followee) names, one user's followees at a time."""
+        for user_id in range(len(self._names)):
+            for followee in list(self._out[user_id]):  # NOTE: copy, a follow may happen between yields
+                yield self._names[user_id], self._names[followee]
+
+    def edge_count(self):
+        return sum(len(followees) for followees in self._out)
+
+    def to_dict(self):
+        """Same shape as followers.json: {user: [followees]}."""
+        return {self._names[i]: sorted(self._names_of(self._out[i])) for i in sorted(self._members)}
+
+    @classmethod
+    def from_dict(cls, data):
+        graph = cls()
+        for username, followees in data.items():
+            graph.add_user(username)
+            for followee in followees:
+                graph.follow(username, followee)
+        return graph
@@ -0,0 +1,305 @@
+"""
+Hashtags.py – #hashtags and @mentions pulled out of posts, and what's trending
+
+Post content is free text. When a post is created (Post.create_post) its title
+and content are scanned once:
+    #Python #100DaysOfCode   -> hashtag index: "python" -> [post ids]   (case-insensitive)
+    @Nihar                   -> mention index: "Nihar"  -> [post ids]   (existing users only)
+Both indexes are one JournaledStore (Data/tags.json + tags.log), a post adds
+one journal line {"seq", "id", "ts", "tags", "mentions"}. Ids are kept sorted,
+so "latest posts with #python" is a slice.
+
+Trending = the hashtags used most in the last WINDOW_MINUTES. Counting every
+tag exactly would need memory for every tag ever seen, so per time bucket:
+    count-min sketch  DEPTH rows x WIDTH counters; a tag adds 1 to one counter
+                      per row, its estimate is the smallest of those counters
+                      (never too low, a bit too high when tags collide)
+    top-k candidates  the CANDIDATES tags with the highest estimates in the
+                      bucket, evicted from a min-heap
+The window is a ring of BUCKETS of those; old buckets are reset when the ring
+comes round. Memory is BUCKETS x (DEPTH x WIDTH + CANDIDATES), however many posts
+come in. trending() sums the estimates of the candidates over the live buckets.
+
+The sketch lives in memory only: on first use it is filled from the posts of
+the last window (repo.posts.since, a bisect per author), after that from new
+journal records, including those written by other processes.
+
+Rebuild the indexes from every post (e.g. after a bulk import):
+    python Hashtags.py --rebuild
+"""
+import heapq
+import os
+import re
+import threading
+from array import array
+from bisect import bisect_left
+
+import Repository as repo
+import Timestamp
+from Storage import DATA_DIR
+
+TAGS_PATH = os.path.join(DATA_DIR, "tags.json")
+HASHTAG_RE = re.compile(r"(?<![\w#&])#(\w+)")  # not "C#" or "&#39;"
+MENTION_RE = re.compile(r"(?<![\w@])@(\w+)")   # not "me@mail.com"
+
+# Trending window: BUCKETS x BUCKET_MINUTES
+WINDOW_MINUTES = 60
+BUCKET_MINUTES = 5
+BUCKETS = WINDOW_MINUTES // BUCKET_MINUTES
+WIDTH = 2048      # counters per sketch row
+DEPTH = 4         # sketch rows (independent hashes)
+CANDIDATES = 64   # heavy hitters kept per bucket
+
+
+def extract(*texts):
+    """(hashtags, mentions) in the texts: lower-cased tags, mentions as written, no duplicates."""
+    tags, mentions = [], []
+    for text in texts:
+        for tag in HASHTAG_RE.findall(text or ""):
+            tag = tag.casefold()
+            if tag not in tags:
+                tags.append(tag)
+        for name in MENTION_RE.findall(text or ""):
+            if name not in mentions:
+                mentions.append(name)
+    return tags, mentions
+
+
+class CountMinSketch:
+    def __init__(self, width=WIDTH, depth=DEPTH):
+        self.width = width
+        self.depth = depth
+        self.counts = array("I", bytes(4 * width * depth))
+
+    def _slots(self, key):
+        # NOTE: two halves of one hash give DEPTH hashes (Kirsch–Mitzenmacher),
+        # hash() is randomized per process, fine for a sketch that's never saved
+        h = hash(key)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [row * self.width + (h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add(self, key, n=1):
+        """Count key n more times, returns its new estimate."""
+        counts = self.counts
+        estimate = None
+        for slot in self._slots(key):
+            counts[slot] += n
+            if estimate is None or counts[slot] < estimate:
+                estimate = counts[slot]
+        return estimate
+
+    def estimate(self, key):
+        return min(self.counts[slot] for slot in self._slots(key))
+
+
+class _Bucket:
+    """One time slice of the window: a sketch + its top candidates."""
+
+    def __init__(self, number):
+        self.number = number  # ts // bucket length
+        self.sketch = CountMinSketch()
+        self.top = {}    # tag -> estimate, at most CANDIDATES tags
+        self.heap = []   # (estimate, tag), may hold outdated entries
+
+    def add(self, tag):
+        estimate = self.sketch.add(tag)
+        if tag in self.top or len(self.top) < CANDIDATES:
+            self.top[tag] = estimate
+            heapq.heappush(self.heap, (estimate, tag))
+        else:
+            # Drop outdated heap entries until the real minimum is on top
+            while self.heap[0][0] != self.top.get(self.heap[0][1]):
+                heapq.heappop(self.heap)
+            if estimate > self.heap[0][0]:
+                _, evicted = heapq.heapreplace(self.heap, (estimate, tag))
+                del self.top[evicted]
+                self.top[tag] = estimate
+        if len(self.heap) > 4 * CANDIDATES:
+            self.heap = [(estimate, tag) for tag, estimate in self.top.items()]
+            heapq.heapify(self.heap)
+
+
+class TrendingWindow:
+    """Sliding window of BUCKETS count-min sketches with top-k candidates."""
+
+    def __init__(self, buckets=BUCKETS, bucket_minutes=BUCKET_MINUTES):
+        self.buckets = buckets
+        self.bucket_ns = bucket_minutes * 60 * 1_000_000_000
+        self._ring = [None] * buckets
+        self._lock = threading.Lock()
+
+    def _current(self):
+        return Timestamp.now_ns() // self.bucket_ns
+
+    def add(self, tags, ts):
+        number = ts // self.bucket_ns
+        if number <= self._current() - self.buckets:
+            return  # older than the window
+        slot = number % self.buckets
+        with self._lock:
+            bucket = self._ring[slot]
+            if bucket is None or bucket.number < number:
+                bucket = self._ring[slot] = _Bucket(number)
+            elif bucket.number > number:
+                return  # the slot already holds a newer bucket
+            for tag in tags:
+                bucket.add(tag)
+
+    def top(self, k=10):
+        """[(tag, estimated uses), ...] over the window, most used first."""
+        oldest = self._current() - self.buckets
+        with self._lock:
+            live = [bucket for bucket in self._ring if bucket is not None and bucket.number > oldest]
+            candidates = {tag for bucket in live for tag in bucket.top}
+            scored = ((sum(bucket.sketch.estimate(tag) for bucket in live), tag) for tag in candidates)
+            return [(tag, count) for count, tag in heapq.nlargest(k, scored)]
+
+
+class TagIndex(repo.JournaledStore):
+    """
+    tags.json = {"seq": n, "tags": {tag: [post ids]}, "mentions": {username: [post ids]}}
+    tags.log  = {"seq", "id", "ts", "tags": [...], "mentions": [...]} per post with any
+    """
+
+    def __init__(self, path=TAGS_PATH):
+        super().__init__(path, dict)
+        self.trending_window = TrendingWindow()
+        self._seq = 0
+        self._tags = {}
+        self._mentions = {}
+        self._seeded_until = None  # newest post id counted when the window was filled
+        self._fed_seq = 0          # newest journal record counted by the window
+
+    def _build_index(self):
+        self._seq = self._data.get("seq", 0)
+        self._tags = self._data.get("tags", {})
+        self._mentions = self._data.get("mentions", {})
+        self._data = {}  # the dicts above hold everything
+
+    def _apply(self, records):
+        for record in records:
+            if record["seq"] <= self._seq:
+                continue  # already in the snapshot
+            self._seq = record["seq"]
+            post_id = record["id"]
+            for index, keys in ((self._tags, record["tags"]), (self._mentions, record["mentions"])):
+                for key in keys:
+                    ids = index.setdefault(key, [])
+                    # NOTE: posts of other processes may be journaled slightly out of order
+                    if not ids or ids[-1] < post_id:
+                        ids.append(post_id)
+                    else:
+                        i = bisect_left(ids, post_id)
+                        if i == len(ids) or ids[i] != post_id:
+                            ids.insert(i, post_id)
+            if (self._seeded_until is not None and record["seq"] > self._fed_seq
+                    and post_id > self._seeded_until and record["tags"]):
+                self._fed_seq = record["seq"]
+                self.trending_window.add(record["tags"], record["ts"])
+
+    def save(self):
+        with self._lock:
+            self._data = {"seq": self._seq, "tags": self._tags, "mentions": self._mentions}
+            super().save()
+            self._data = {}
+
+    def add(self, post_id, username, ts, title, content):
+        """Index one new post. Returns (hashtags, mentioned usernames)."""
+        tags, mentions = extract(title, content)
+        mentions = [name for name in mentions if name != username and repo.users.get(name) is not None]
+        if not tags and not mentions:
+            return tags, mentions
+
+        def write():
+            with self._lock:
+                self.data()
+                self._stage({"seq": self._seq + 1, "id": post_id, "ts": ts, "tags": tags, "mentions": mentions})
+        self._write(write)
+        self.start_compactor()
+        return tags, mentions
+
+    def posts_with(self, tag, limit=None):
+        """Ids of posts with #tag, newest first."""
+        with self._lock:
+            self.data()
+            ids = self._tags.get(tag.lstrip("#").casefold(), [])
+            return ids[::-1] if limit is None else ids[:-limit - 1:-1]
+
+    def mentions_of(self, username, limit=None):
+        """Ids of posts that mention username, newest first."""
+        with self._lock:
+            self.data()
+            ids = self._mentions.get(username, [])
+            return ids[::-1] if limit is None else ids[:-limit - 1:-1]
+
+    def tag_counts(self, limit=10):
+        """[(tag, posts), ...] of all time, most used first."""
+        with self._lock:
+            self.data()
+            return heapq.nlargest(limit, ((tag, len(ids)) for tag, ids in self._tags.items()),
+                                  key=lambda item: item[1])
+
+    def _seed(self):
+        """Fill the trending window from the posts of the last window, once."""
+        with self._lock:
+            if self._seeded_until is not None:
+                return
+            self.data()
+            window = self.trending_window
+            start = (window._current() - window.buckets + 1) * window.bucket_ns
+            newest = -1
+            for post in repo.posts.since(start):
+                tags, _ = extract(post.get("title"), post["content"])
+                if tags:
+                    window.add(tags, post["ts"])
+                newest = max(newest, post["id"])
+            self._seeded_until = newest
+            self._fed_seq = self._seq
+
+    def trending(self, k=10):
+        """[(tag, estimated uses), ...] in the last WINDOW_MINUTES."""
+        self._seed()
+        with self._lock:
+            self.data()  # picks up new journal records -> window
+        return self.trending_window.top(k)
+
+    def rebuild(self):
+        """Index every stored post again (one snapshot write). Returns the number of tagged posts."""
+        def write():
+            with self._lock:
+                self.data()
+                usernames = set(repo.users.usernames())
+                self._tags, self._mentions = {}, {}
+                tagged = 0
+                for post in repo.posts.scan():
+                    tags, mentions = extract(post.get("title"), post["content"])
+                    mentions = [name for name in mentions if name != post["username"] and name in usernames]
+                    for index, keys in ((self._tags, tags), (self._mentions, mentions)):
+                        for key in keys:
+                            index.setdefault(key, []).append(post["id"])
+                    tagged += bool(tags or mentions)
+                self._seq += 1  # anything journaled before is in the rebuilt snapshot
+                self.save()
+                self.journal.truncate()
+                return tagged
+        return self._write(write)
+
+
+tag_index = TagIndex()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Hashtag / mention index")
+    parser.add_argument("--rebuild", action="store_true", help="index every post again")
+    parser.add_argument("--trending", type=int, metavar="K", help="print the K trending hashtags")
+    args = parser.parse_args()
+    if args.rebuild:
+        print(f"✔ Indexed {tag_index.rebuild():,} posts with hashtags or mentions")
+    if args.trending:
+        for tag, count in tag_index.trending(args.trending):
+            print(f"#{tag:<30} ~{count}")
+    if not args.rebuild and not args.trending:
+        for tag, count in tag_index.tag_counts():
+            print(f"#{tag:<30} {count} posts")
@@ -0,0 +1,350 @@
+"""
+Http_Api.py – JSON over HTTP for Mini Social Network (asyncio streams, no framework)
+
+    python Http_Api.py --port 8080
+
+Endpoints (request and response bodies are JSON, auth is "Authorization: Bearer <token>"):
+    POST /register      {"username", "password", "age", "bio"}            -> {"token"}
+    POST /login         {"username", "password"}                          -> {"token"}
+    POST /posts         {"title", "content"}                      (auth)  -> {"id"}
+    GET  /feed          ?limit=20&cursor=...&order=popular        (auth)  -> {"posts", "next_cursor"}
+    GET  /users/search  ?q=nih&limit=10                                   -> {"users"}
+    POST /follow        {"target", "action": "follow"|"unfollow"} (auth)  -> {"following"}
+    POST /like          {"post_id", "action": "like"|"unlike"}    (auth)  -> {"liked", "likes"}
+    GET  /trending      ?limit=10                                         -> {"hashtags": [{"tag", "uses"}]}
+    GET  /hashtag       ?tag=python&limit=20                              -> {"posts"}
+    GET  /mentions      ?limit=20                                 (auth)  -> {"posts"}
+    GET  /notifications ?limit=20                                 (auth)  -> {"unread", "notifications"}
+    POST /notifications/read                                      (auth)  -> {"marked"}
+
+The event loop only parses HTTP. Everything that reads or writes Data/ (and the
+password KDF) runs in a thread pool via run_in_executor, so one slow request
+doesn't hold up the others. Writes by the same user (register, post, follow)
+wait on that user's asyncio.Lock, so they are applied one at a time, in order
+(the locks live in a WeakValueDictionary: gone once nobody holds or waits on them).
+Connections are kept alive (HTTP/1.1) until the client closes them.
+Posts returned by /feed carry "likes" and "views", and count as viewed.
+"""
+import asyncio
+import functools
+import json
+import os
+import signal
+import threading
+import time
+import traceback
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import Credentials
+import Repository as repo
+import Timestamp
+import Util as ut
+from Engagement import engagement
+from Hashtags import tag_index
+from Notifications import notifications
+from Post import Post
+from Session import sessions
+from Social_Network import Social_Network as sn
+from user import User
+from Username_Index import username_index
+
+WORKERS = 16           # threads for blocking work
+MAX_BODY = 64 * 1024   # bytes
+MAX_LIMIT = 100        # posts / users per response
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+           405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _limit(query, default):
+    try:
+        return max(1, min(MAX_LIMIT, int(query.get("limit", default))))
+    except ValueError:
+        raise HttpError(400, "limit must be a number")
+
+
+def _text(body, field, required=True):
+    value = body.get(field, "")
+    if not isinstance(value, str) or (required and not value.strip()):
+        raise HttpError(400, f"'{field}' must be a non-empty string" if required else f"'{field}' must be a string")
+    return value.strip()
+
+
+class Api:
+    def __init__(self, workers=WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self._user_locks = weakref.WeakValueDictionary()  # username -> asyncio.Lock
+        self.routes = {
+            ("POST", "/register"): self.register,
+            ("POST", "/login"): self.login,
+            ("POST", "/posts"): self.create_post,
+            ("GET", "/feed"): self.feed,
+            ("GET", "/users/search"): self.search_user,
+            ("POST", "/follow"): self.follow,
+            ("POST", "/like"): self.like,
+            ("GET", "/trending"): self.trending,
+            ("GET", "/hashtag"): self.hashtag,
+            ("GET", "/mentions"): self.mentions,
+            ("GET", "/notifications"): self.notifications,
+            ("POST", "/notifications/read"): self.read_notifications,
+        }
+
+    async def run(self, fn, *args):
+        """Run blocking fn(*args) on the thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(fn, *args))
+
+    def _user_lock(self, username):
+        # NOTE: only the event loop thread gets here, so no race between get and set
+        lock = self._user_locks.get(username)
+        if lock is None:
+            lock = self._user_locks[username] = asyncio.Lock()
+        return lock
+
+    async def current_user(self, headers):
+        auth = headers.get("authorization", "")
+        token = auth[7:] if auth.startswith("Bearer ") else None
+        # A cached session is a dict lookup, done on the loop; a miss loads the
+        # user from the store, so resolve() goes to the thread pool
+        user = sessions.cached(token) if token else None
+        if user is None and token:
+            user = await self.run(sessions.resolve, token)
+        if user is None:
+            raise HttpError(401, "login required")
+        return user
+
+    # ---------- endpoints ----------
+    async def register(self, headers, query, body):
+        username = _text(body, "username")
+        password = _text(body, "password")
+        age = body.get("age")
+        if not isinstance(age, int) or age <= 0:
+            raise HttpError(400, "age must be a number greater than 0")
+        async with self._user_lock(username):
+            if await self.run(ut.check_username, username):
+                raise HttpError(409, "username already exists")
+            hashed_password = await self.run(lambda: Credentials.hash_async(password).result())
+            ts = Timestamp.now_ns()
+            user = User(username, hashed_password, age, _text(body, "bio", required=False), Timestamp.display(ts), ts)
+            try:
+                await self.run(self._register, user)
+            except ValueError:  # lost the race with another process registering the same name
+                raise HttpError(409, "username already exists")
+        if not user.valid:
+            raise HttpError(400, "invalid user")
+        return 201, {"username": username, "token": sessions.issue(user)}
+
+    @staticmethod
+    def _register(user):
+        user.register()
+        if user.valid:
+            sn.update_followers(user)
+
+    async def login(self, headers, query, body):
+        record = await self.run(ut.login_verification, _text(body, "username"), _text(body, "password"), True)
+        if record is None:
+            raise HttpError(401, "wrong username or password")
+        return 200, {"username": record["username"], "token": sessions.issue(User.from_dict(record))}
+
+    async def create_post(self, headers, query, body):
+        user = await self.current_user(headers)
+        title, content = _text(body, "title", required=False), _text(body, "content")
+        ts = Timestamp.now_ns()
+        post = Post(title, content, user.username, Timestamp.display(ts), ts)
+        async with self._user_lock(user.username):
+            post_id = await self.run(post.create_post)
+        if post_id is None:
+            raise HttpError(400, "invalid post")
+        return 201, {"id": post_id}
+
+    async def feed(self, headers, query, body):
+        user = await self.current_user(headers)
+        order = query.get("order", "recent")
+        if order not in ("recent", "popular"):
+            raise HttpError(400, "order must be 'recent' or 'popular'")
+        try:
+            posts, next_cursor = await self.run(sn.get_feed, user, _limit(query, 20), query.get("cursor"), order)
+        except ValueError:  # base64 / JSON errors from a tampered cursor
+            raise HttpError(400, "bad cursor")
+        # NOTE: view() only adds to this thread's shard, cheap enough for the loop
+        engagement.view(posts.ids)
+        counts = await self.run(engagement.counts, list(posts.ids))
+        return 200, {"posts": [dict(posts.to_dict(i), likes=likes, views=views)
+                               for i, (likes, views) in enumerate(counts)], "next_cursor": next_cursor}
+
+    async def search_user(self, headers, query, body):
+        text = query.get("q", "").strip()
+        if not text:
+            raise HttpError(400, "'q' is required")
+        return 200, {"users": await self.run(username_index.search, text, _limit(query, 10))}
+
+    async def follow(self, headers, query, body):
+        user = await self.current_user(headers)
+        action = _text(body, "action").lower()
+        if action not in ("follow", "unfollow"):
+            raise HttpError(400, "action must be 'follow' or 'unfollow'")
+        record = await self.run(repo.users.get, _text(body, "target"))
+        if record is None:
+            raise HttpError(404, "no such user")
+        target = User.from_dict(record)
+        if target.username == user.username:
+            raise HttpError(400, "you can't follow yourself")
+        async with self._user_lock(user.username):
+            await self.run(sn.update_followers, user, target, action.capitalize())
+        return 200, {"following": await self.run(sn.is_following, user, target)}
+
+    async def like(self, headers, query, body):
+        user = await self.current_user(headers)
+        post_id, action = body.get("post_id"), _text(body, "action").lower()
+        if not isinstance(post_id, int) or isinstance(post_id, bool):
+            raise HttpError(400, "'post_id' must be a number")
+        if action not in ("like", "unlike"):
+            raise HttpError(400, "action must be 'like' or 'unlike'")
+        try:
+            if post_id < 0:
+                raise IndexError(post_id)
+            await self.run(repo.posts.get, post_id)
+        except IndexError:
+            raise HttpError(404, "no such post")
+        await self.run(engagement.like if action == "like" else engagement.unlike, post_id, user.username)
+        likes = await self.run(engagement.counts, [post_id])
+        return 200, {"liked": action == "like", "likes": likes[0][0]}
+
+    async def trending(self, headers, query, body):
+        hashtags = await self.run(tag_index.trending, _limit(query, 10))
+        return 200, {"hashtags": [{"tag": tag, "uses": uses} for tag, uses in hashtags]}
+
+    async def hashtag(self, headers, query, body):
+        tag = query.get("tag", "").strip()
+        if not tag:
+            raise HttpError(400, "'tag' is required")
+        posts = await self.run(Post.get_by_hashtag, tag, _limit(query, 20))
+        return 200, {"posts": [posts.to_dict(i) for i in range(len(posts))]}
+
+    async def mentions(self, headers, query, body):
+        user = await self.current_user(headers)
+        posts = await self.run(Post.get_mentions, user.username, _limit(query, 20))
+        return 200, {"posts": [posts.to_dict(i) for i in range(len(posts))]}
+
+    async def notifications(self, headers, query, body):
+        user = await self.current_user(headers)
+        latest = await self.run(notifications.latest, user.username, _limit(query, 20))
+        return 200, {"unread": await self.run(notifications.unread, user.username), "notifications": latest}
+
+    async def read_notifications(self, headers, query, body):
+        user = await self.current_user(headers)
+        return 200, {"marked": await self.run(notifications.mark_all_read, user.username)}
+
+    # ---------- HTTP ----------
+    async def dispatch(self, method, target, headers, raw_body):
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        try:
+            if handler is None:
+                if any(path == url.path for _, path in self.routes):
+                    raise HttpError(405, f"{method} not allowed here")
+                raise HttpError(404, "not found")
+            try:
+                body = json.loads(raw_body) if raw_body else {}
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                raise HttpError(400, "body must be JSON")
+            if not isinstance(body, dict):
+                raise HttpError(400, "body must be a JSON object")
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            return await handler(headers, query, body)
+        except HttpError as e:
+            return e.status, {"error": str(e)}
+        except Exception:
+            traceback.print_exc()
+            return 500, {"error": "internal error"}
+
+    async def handle(self, reader, writer):
+        """One client connection, any number of requests on it."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length") or 0)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                if length > MAX_BODY:
+                    status, payload, keep_alive = 413, {"error": "body too large"}, False
+                else:
+                    raw_body = await reader.readexactly(length) if length else b""
+                    status, payload = await self.dispatch(method, target, headers, raw_body)
+
+                body = json.dumps(payload, ensure_ascii=False).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def exit_with_parent(pid, interval=1.0):
+    """Exit once process `pid` is gone, so a server started by a benchmark can't outlive it."""
+    def watch():
+        while os.getppid() == pid:  # re-parented (to init) when the parent dies
+            time.sleep(interval)
+        os.kill(os.getpid(), signal.SIGTERM)  # the clean shutdown below
+
+    threading.Thread(target=watch, daemon=True).start()
+
+
+async def serve(host="127.0.0.1", port=8080, workers=WORKERS):
+    api = Api(workers)
+    server = await asyncio.start_server(api.handle, host, port)
+    print(f"🌐 Mini Social Network API on http://{host}:{port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="HTTP API for Mini Social Network")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=WORKERS, help="threads for blocking work")
+    parser.add_argument("--parent-pid", type=int, help="exit when this process (the one that started us) exits")
+    args = parser.parse_args()
+
+    # NOTE: SIGTERM shuts down like Ctrl-C. Killed by the default handler, the
+    # server would leave its scrypt worker processes (Credentials.py) running
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    if args.parent_pid:
+        exit_with_parent(args.parent_pid)
+
+    repo.posts.start_compactor()
+    repo.followers.start_compactor()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        print("👋 Bye")
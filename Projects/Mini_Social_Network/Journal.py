@@ -0,0 +1,123 @@
+"""
+Journal.py – append-only JSON-lines log
+
+Rewriting a whole JSON file to add ONE record means writing N records every
+time (O(N²) bytes for N records). A journal only ever appends one line:
+    {"title": "...", "content": "...", ...}\\n
+
+Readers remember the byte offset they have already consumed, so picking up new
+records is also proportional to the new data only (a "tail" read).
+
+For group commit, writers stage() records and flush() once: all staged lines go
+out in one write() and one fsync().
+
+Compaction (truncate()) doesn't empty the log in place, it puts a NEW empty file
+there (temp file + os.replace). A reader in another process may still hold an
+offset into the old log; it notices the inode changed and read_new() returns
+None = "start over from the snapshot", instead of seeking into the middle of
+somebody else's line in the new one.
+"""
+import json
+import os
+
+
+class Journal:
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0  # bytes of the log already read by this process
+        self.inode = None  # which file the offset is into (None = not read yet)
+        self._pending = bytearray()  # staged, not written yet
+
+    def stage(self, record):
+        """Queue one record for the next flush()."""
+        self._pending += (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+    def flush(self):
+        """Write every staged record with one write() and one fsync()."""
+        if not self._pending:
+            return
+        with open(self.path, "ab") as file:
+            start = file.tell()
+            file.write(self._pending)
+            file.flush()
+            os.fsync(file.fileno())
+            end = file.tell()
+            inode = os.fstat(file.fileno()).st_ino
+        self._pending = bytearray()
+        # If nobody else appended in between, we don't need to read our own lines back
+        if start == self.offset and self.inode in (None, inode):
+            self.offset = end
+            self.inode = inode
+
+    def append(self, record):
+        """Append one record and fsync it. Cost doesn't depend on the log size."""
+        self.stage(record)
+        self.flush()
+
+    def read_new(self):
+        """
+        Return records appended since the last call (by anyone), or None if the
+        log was replaced (compacted) since then: the caller must reload its
+        snapshot and call restart(). Records may repeat ones in the snapshot,
+        callers de-duplicate.
+        """
+        try:
+            file = open(self.path, "rb")
+        except FileNotFoundError:
+            if self.inode is not None:
+                return None
+            self.offset = 0
+            return []
+
+        records = []
+        with file:
+            st = os.fstat(file.fileno())
+            if (self.inode is not None and st.st_ino != self.inode) or st.st_size < self.offset:
+                return None  # a new log, or one truncated in place
+            self.inode = st.st_ino
+            if st.st_size == self.offset:
+                return []
+            file.seek(self.offset)
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break  # half-written last line, pick it up next time
+                self.offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # NOTE: a torn / garbled line (crash mid-write); skipping to the
+                    # next newline resyncs, one bad line doesn't stop the store loading
+                    print(f"⚠️ skipped an unreadable line in {self.path}")
+        return records
+
+    def restart(self):
+        """Read the log from the start again (after the snapshot was reloaded)."""
+        self.offset = 0
+        self.inode = None
+
+    def read_all(self):
+        self.restart()
+        return self.read_new()
+
+    def size(self):
+        """Bytes in the log, including staged ones."""
+        try:
+            return os.path.getsize(self.path) + len(self._pending)
+        except FileNotFoundError:
+            return len(self._pending)
+
+    def discard(self):
+        """Drop staged records (they are in a snapshot now, or their batch failed)."""
+        self._pending = bytearray()
+
+    def truncate(self):
+        """Start an empty log (a new file: readers elsewhere see the inode change)."""
+        temp = self.path + ".tmp"
+        with open(temp, "wb") as file:
+            os.fsync(file.fileno())
+            self.inode = os.fstat(file.fileno()).st_ino
+        os.replace(temp, self.path)
+        self._pending = bytearray()
+        self.offset = 0
@@ -0,0 +1,26 @@
+"""
+Lazy_Import.py – import a module now, run it the first time it is used
+
+    ut = lazy_import("Util")      # ~0 ms: finds the file, runs nothing
+    ut.display_feed(user)         # Util (and everything it imports) runs HERE
+
+Entry points like main.py use this so the first menu shows up without paying
+for modules the user may never reach. It's importlib.util.LazyLoader, the
+module object is the real one once it has been touched.
+"""
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
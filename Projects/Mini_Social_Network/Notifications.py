@@ -0,0 +1,235 @@
+"""
+Notifications.py – "someone followed you", "someone mentioned you"
+
+Each user has an inbox: a deque(maxlen=INBOX_SIZE), i.e. a ring buffer, the
+oldest notification falls out when a new one comes in. Next to it two counters:
+    total  notifications ever delivered to the user (the newest one's number)
+    read   number of the last one the user has seen
+so the unread count is min(total - read, len(inbox)), no scan of the inbox.
+"Mark all read" is ONE journal record ({"read": user, "upto": total}) however
+many notifications it covers.
+
+Everything is one JournaledStore (Data/notifications.json + .log, append-only,
+compacted like posts.log), so several running copies of the app see each
+other's notifications.
+
+Posting must not wait for notifications, so delivery goes through a
+producer/consumer queue, the Condition example from Day-32/MultiThreading3.py:
+    producer  notify() appends to `pending` and condition.notify(), returns at once
+    consumer  the Dispatcher thread waits on the condition, takes EVERYTHING
+              pending and delivers it as one journal record (one fsync)
+drain() waits until the queue is empty. At exit whatever is still queued is
+delivered by the exiting thread itself (no new thread can start then).
+"""
+import atexit
+import os
+import threading
+from collections import deque
+
+import Repository as repo
+import Timestamp
+from Storage import DATA_DIR
+
+NOTIFICATIONS_PATH = os.path.join(DATA_DIR, "notifications.json")
+INBOX_SIZE = 100  # notifications kept per user
+
+FOLLOW, MENTION = "follow", "mention"
+
+
+class Inbox:
+    __slots__ = ("items", "total", "read")
+
+    def __init__(self, items=(), total=0, read=0):
+        self.items = deque(items, maxlen=INBOX_SIZE)  # [n, ts, kind, from, post id], oldest first
+        self.total = total
+        self.read = read
+
+    def unread(self):
+        return min(self.total - self.read, len(self.items))
+
+
+class NotificationStore(repo.JournaledStore):
+    """
+    notifications.json = {"seq": n, "inboxes": {user: {"total", "read", "items": [[n, ts, kind, from, post id]]}}}
+    notifications.log  = {"seq", "ts", "deliver": [[to, kind, from, post id], ...]}
+                         {"seq", "read": user, "upto": n}
+    """
+
+    def __init__(self, path):
+        super().__init__(path, dict)
+        self._seq = 0
+        self._inboxes = {}
+
+    def _build_index(self):
+        self._seq = self._data.get("seq", 0)
+        self._inboxes = {user: Inbox(map(tuple, inbox["items"]), inbox["total"], inbox["read"])
+                         for user, inbox in self._data.get("inboxes", {}).items()}
+        self._data = {}  # the inboxes hold everything
+
+    def _inbox(self, username):
+        inbox = self._inboxes.get(username)
+        if inbox is None:
+            inbox = self._inboxes[username] = Inbox()
+        return inbox
+
+    def _apply(self, records):
+        for record in records:
+            if record["seq"] <= self._seq:
+                continue  # already in the snapshot
+            self._seq = record["seq"]
+            if "read" in record:
+                inbox = self._inbox(record["read"])
+                inbox.read = max(inbox.read, record["upto"])
+                continue
+            for to, kind, sender, post_id in record["deliver"]:
+                inbox = self._inbox(to)
+                inbox.total += 1
+                inbox.items.append((inbox.total, record["ts"], kind, sender, post_id))
+
+    def save(self):
+        with self._lock:
+            self._data = {"seq": self._seq,
+                          "inboxes": {user: {"total": inbox.total, "read": inbox.read, "items": list(inbox.items)}
+                                      for user, inbox in self._inboxes.items()}}
+            super().save()
+            self._data = {}
+
+    def deliver(self, batch):
+        """batch = [(to, kind, from, post id), ...] -> one journal record."""
+        def write():
+            with self._lock:
+                self.data()
+                self._stage({"seq": self._seq + 1, "ts": Timestamp.now_ns(), "deliver": batch})
+        self._write(write)
+
+    def mark_all_read(self, username):
+        """Returns how many were unread."""
+        def write():
+            with self._lock:
+                self.data()
+                inbox = self._inboxes.get(username)
+                if inbox is None or inbox.unread() == 0:
+                    return 0
+                unread = inbox.unread()
+                self._stage({"seq": self._seq + 1, "read": username, "upto": inbox.total})
+                return unread
+        return self._write(write)
+
+    def unread(self, username):
+        with self._lock:
+            self.data()
+            inbox = self._inboxes.get(username)
+            return inbox.unread() if inbox else 0
+
+    def latest(self, username, limit=INBOX_SIZE):
+        """[{"kind", "from", "post_id", "ts", "unread"}, ...] newest first."""
+        with self._lock:
+            self.data()
+            inbox = self._inboxes.get(username)
+            if inbox is None:
+                return []
+            items = list(inbox.items)[:-limit - 1:-1]
+            return [{"kind": kind, "from": sender, "post_id": post_id, "ts": ts, "unread": n > inbox.read}
+                    for n, ts, kind, sender, post_id in items]
+
+
+class Dispatcher(threading.Thread):
+    """The consumer: waits for notifications and writes them in batches."""
+
+    def __init__(self, store):
+        super().__init__(daemon=True)
+        self.store = store
+        self.condition = threading.Condition()
+        self.pending = []
+        self.busy = False  # a batch is being written
+
+    def put(self, notification):
+        """Producer side: never waits for the disk."""
+        with self.condition:
+            self.pending.append(notification)
+            self.condition.notify_all()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()  # until put() notifies
+                batch, self.pending = self.pending, []
+                self.busy = True
+            try:
+                self.store.deliver(batch)
+            except Exception as e:
+                print(f"⚠️ {len(batch)} notification(s) not delivered: {e}")
+            finally:
+                with self.condition:
+                    self.busy = False
+                    self.condition.notify_all()  # wakes drain()
+
+    def drain(self, timeout=None):
+        """Wait until everything put() so far is delivered. False on timeout."""
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.pending and not self.busy, timeout)
+
+    def deliver_pending(self, timeout=None):
+        """Deliver what is queued in the calling thread. A batch the thread is
+        already writing is left to it (waited for, up to timeout)."""
+        with self.condition:
+            self.condition.wait_for(lambda: not self.busy, timeout)
+            batch, self.pending = self.pending, []
+        if not batch:
+            return
+        try:
+            # NOTE: inline under the store's lock, the store's writer thread may not exist (or start) yet
+            with self.store.writer.exclusive():
+                self.store.deliver(batch)
+        except Exception as e:
+            print(f"⚠️ {len(batch)} notification(s) not delivered: {e}")
+
+
+class Notifications:
+    def __init__(self, path=NOTIFICATIONS_PATH):
+        self.store = NotificationStore(path)
+        self._dispatcher = None
+        self._start_lock = threading.Lock()
+        # NOTE: registered here, once, the dispatcher may first start during interpreter shutdown
+        atexit.register(self._drain_at_exit)  # deliver what is still queued
+
+    def _queue(self):
+        with self._start_lock:
+            if self._dispatcher is None:
+                self._dispatcher = Dispatcher(self.store)
+                try:
+                    self._dispatcher.start()
+                    self.store.start_compactor()
+                except RuntimeError:  # interpreter shutting down: _drain_at_exit delivers the queue
+                    pass
+        return self._dispatcher
+
+    def notify(self, to, kind, sender, post_id=None):
+        if to != sender:
+            self._queue().put((to, kind, sender, post_id))
+
+    def drain(self, timeout=None):
+        dispatcher = self._dispatcher
+        if dispatcher is None:
+            return True
+        if not dispatcher.is_alive():  # it couldn't start, nothing else will deliver the queue
+            dispatcher.deliver_pending(timeout)
+            return True
+        return dispatcher.drain(timeout)
+
+    def _drain_at_exit(self):
+        if self._dispatcher is not None:
+            self._dispatcher.deliver_pending(5)
+
+    def unread(self, username):
+        return self.store.unread(username)
+
+    def latest(self, username, limit=20):
+        return self.store.latest(username, limit)
+
+    def mark_all_read(self, username):
+        return self.store.mark_all_read(username)
+
+
+notifications = Notifications()
@@ -1,27 +1,24 @@
-import json
-from jsonschema import validate
-from jsonschema.exceptions import ValidationError
+from array import array
 
-import Util as ut
-
-post_schema = {
-    "type": "object",
-    "properties": {
-        "title": {"type": "string"},
-        "content": {"type": "string"},
-        "username": {"type": "string"},
-        "created_at": {"type": "string"},
-    },
-    "required": ['content', 'username', 'created_at']
-}
+import Repository as repo
+import Timestamp
+from Hashtags import tag_index
+from Notifications import MENTION, notifications
+from Search import search_index
+from Timeline import timelines
+from Validation import ValidationError, post_schema, validate_post  # post_schema: kept importable from here
 
 
 class Post:
-    def __init__(self, title, content, username, created_at):
+    # NOTE: no per-object __dict__, a Post is ~half the size
+    __slots__ = ("title", "content", "username", "created_at", "ts", "valid")
+
+    def __init__(self, title, content, username, created_at, ts=None):
         self.title = title
         self.content = content
         self.username = username
         self.created_at = created_at
+        self.ts = ts if ts is not None else Timestamp.parse_legacy(created_at)
         self.valid = False
 
     def get_title(self):
@@ -36,6 +33,9 @@ class Post:
     def get_created_at(self):
         return self.created_at
 
+    def get_ts(self):
+        return self.ts
+
     @classmethod
     def from_dict(cls, data):
         """Build Post object from dict loaded from JSON"""
@@ -43,33 +43,185 @@ class Post:
             title=data['title'],
             content=data['content'],
             username=data['username'],
-            created_at=data['created_at']
+            created_at=data['created_at'],
+            ts=data.get('ts')
         )
 
+    def to_dict(self):
+        return {
+            "title": self.title,
+            "content": self.content,
+            "username": self.username,
+            "created_at": self.created_at,
+            "ts": self.ts,
+        }
+
     def create_post(self):
-        posts = ut.load_posts()
+        """Stores the post, returns its id (None if it didn't validate)."""
         new_post = {
             "title": self.get_title(),
             "content": self.get_content(),
             "username": self.get_username(),
             "created_at": self.get_created_at(),
+            "ts": self.get_ts() or 0,
         }
         try:
-            validate(instance=new_post, schema=post_schema)
+            validate_post(new_post)
             self.valid = True
         except ValidationError as e:
             print(f"❌ Invalid Format: {e.message}")
 
         if self.valid:
-            posts.append(new_post)
-            with open("Data/posts.json", "w") as file:
-                json.dump(posts, file, indent=4, ensure_ascii=False)
+            post_id = repo.posts.add(new_post)
+            timelines.fan_out(post_id, self.get_username())
+            search_index.add(post_id, self.get_title(), self.get_content())
+            _, mentioned = tag_index.add(post_id, self.get_username(), new_post["ts"], self.get_title(), self.get_content())
+            for username in mentioned:  # queued, the post doesn't wait for delivery
+                notifications.notify(username, MENTION, self.get_username(), post_id)
+            return post_id
         else:
             print("There is some problem in formating, please try again.")
 
     @classmethod
     def get_post_by_username(cls, username):
-        posts = [Post.from_dict(post) for post in ut.load_posts()]
-        needed_post = [post for post in posts if post.username == username]
-        return needed_post
+        """All posts of one author as a PostBatch, oldest first."""
+        return PostBatch.from_records(repo.posts.by_author(username))
+
+    @classmethod
+    def get_latest_by_username(cls, username, limit=5):
+        """The newest `limit` posts of one author, oldest first. Only those are read."""
+        return PostBatch.from_records(repo.posts.latest_by_author(username, limit))
+
+    @staticmethod
+    def count_by_username(username):
+        return repo.posts.count_by_author(username)
+
+    @classmethod
+    def search(cls, query, limit=10):
+        """Full-text search (see Search.py): (PostBatch best first, [scores])."""
+        results = search_index.search(query, limit)
+        posts = PostBatch.from_records(repo.posts.get_many([post_id for post_id, _ in results]))
+        return posts, [score for _, score in results]
+
+    @classmethod
+    def get_by_hashtag(cls, tag, limit=20):
+        """Latest posts with #tag (Hashtags.py), newest first."""
+        return PostBatch.from_records(repo.posts.get_many(tag_index.posts_with(tag, limit)))
+
+    @classmethod
+    def get_mentions(cls, username, limit=20):
+        """Latest posts that @mention username, newest first."""
+        return PostBatch.from_records(repo.posts.get_many(tag_index.mentions_of(username, limit)))
+
+    @classmethod
+    def get_posts_since(cls, since, username=None):
+        """Posts from `since` (epoch ns) until now, newest first. Uses bisect, not a full scan."""
+        authors = None if username is None else [username]
+        return PostBatch.from_records(repo.posts.since(since, authors))
+
+
+class PostBatch:
+    """
+    Many posts in a few flat arrays instead of one Post object each (columnar):
+        ids        array('q')   post id
+        author_ids array('I')   index into names (each author string kept once)
+        ts         array('q')   epoch ns
+        text       bytearray    UTF-8 title, content, created_at of every post
+        offsets    array('Q')   where each of those strings starts (3 per post + end)
+    Columns are read by index (batch.title(i), batch.ts[i], ...), so feed,
+    profile and search loop over a page without building a Post per row.
+    batch[i] / iterating still gives Post objects for code that wants them.
+    """
+    __slots__ = ("ids", "author_ids", "names", "_name_ids", "ts", "text", "offsets")
+    FIELDS = 3  # title, content, created_at
+
+    def __init__(self):
+        self.ids = array("q")
+        self.author_ids = array("I")
+        self.names = []
+        self._name_ids = {}
+        self.ts = array("q")
+        self.text = bytearray()
+        self.offsets = array("Q", [0])
+
+    @classmethod
+    def from_records(cls, records):
+        batch = cls()
+        batch.extend(records)
+        return batch
+
+    def extend(self, records):
+        # NOTE: hot loop for big batches -> locals, one join for the text at the end
+        ids, author_ids, stamps, offsets = self.ids, self.author_ids, self.ts, self.offsets
+        names, name_ids = self.names, self._name_ids
+        chunks, end = [], offsets[-1]
+        for record in records:
+            username = record["username"]
+            name_id = name_ids.get(username)
+            if name_id is None:
+                name_id = name_ids[username] = len(names)
+                names.append(username)
+            ids.append(record.get("id", -1))
+            author_ids.append(name_id)
+            stamps.append(record.get("ts") or Timestamp.parse_legacy(record["created_at"]))
+            for field in (record.get("title") or "", record["content"], record["created_at"]):
+                raw = field.encode("utf-8")
+                chunks.append(raw)
+                end += len(raw)
+                offsets.append(end)
+        self.text += b"".join(chunks)
+
+    def append(self, record):
+        self.extend((record,))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _field(self, i, field):
+        k = i * self.FIELDS + field
+        return self.text[self.offsets[k]:self.offsets[k + 1]].decode("utf-8")
+
+    def row(self, i):
+        """(username, title, content, created_at) of post i with ONE decode."""
+        k = i * self.FIELDS
+        start, title_end, content_end, end = self.offsets[k:k + 4]
+        span = self.text[start:end].decode("utf-8")
+        if len(span) != end - start:  # non-ASCII: char and byte offsets differ
+            return self.author(i), self._field(i, 0), self._field(i, 1), self._field(i, 2)
+        title_end -= start
+        content_end -= start
+        return self.names[self.author_ids[i]], span[:title_end], span[title_end:content_end], span[content_end:]
+
+    def author(self, i):
+        return self.names[self.author_ids[i]]
+
+    def title(self, i):
+        return self._field(i, 0)
+
+    def content(self, i):
+        return self._field(i, 1)
+
+    def created_at(self, i):
+        return self._field(i, 2)
+
+    def to_dict(self, i):
+        username, title, content, created_at = self.row(i)
+        return {"id": self.ids[i], "title": title, "content": content, "username": username,
+                "created_at": created_at, "ts": self.ts[i]}
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("PostBatch index out of range")
+        username, title, content, created_at = self.row(i)
+        return Post(title, content, username, created_at, self.ts[i])
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def nbytes(self):
+        """Memory of the columns (not counting the shared author name strings)."""
+        return sum(column.itemsize * len(column) for column in (self.ids, self.author_ids, self.ts, self.offsets)) \
+            + len(self.text)
 
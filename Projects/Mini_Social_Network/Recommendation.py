@@ -0,0 +1,186 @@
+"""
+Recommendation.py – "Suggested users" (friend of friend)
+
+Candidates for you are the people followed by the people you follow, ranked by
+how many of your followees follow them ("3 people you follow follow X").
+Users you already follow, and yourself, are never suggested.
+
+    batch job  : python Recommendation.py --rebuild
+                 Uses a sparse matrix product A @ A (SciPy CSR) when SciPy is
+                 installed, plain Python sets + Counter otherwise.
+    incremental: when A follows / unfollows B, only A's list and the lists of
+                 A's followers can change -> A's is recomputed right away,
+                 the followers' lists are marked stale and recomputed on read.
+
+Results are stored in Data/suggestions.json (+ suggestions.log for the
+incremental updates, compacted like posts.log).
+"""
+import heapq
+import importlib.util
+import os
+from collections import Counter
+
+import Repository as repo
+from Storage import DATA_DIR
+
+# NOTE: only look for SciPy here, importing it (+ NumPy) costs ~150 ms and only the batch job needs it
+HAS_SCIPY = importlib.util.find_spec("scipy") is not None
+
+SUGGESTIONS_PATH = os.path.join(DATA_DIR, "suggestions.json")
+TOP_K = 10          # suggestions kept per user
+BLOCK_ROWS = 20_000  # rows of A @ A computed at once (bounds memory)
+
+
+class SuggestionStore(repo.JournaledStore):
+    """
+    {user: [[candidate, score], ...]}. Journal records either replace one
+    user's list or mark several lists stale (they are recomputed on read).
+    """
+
+    def __init__(self, path):
+        super().__init__(path, dict)
+
+    def _apply(self, records):
+        for record in records:
+            if "stale" in record:
+                for username in record["stale"]:
+                    self._data.pop(username, None)
+            else:
+                self._data[record["user"]] = record["items"]
+
+    def invalidate(self, usernames):
+        def write():
+            with self._lock:
+                stale = [username for username in usernames if username in self.data()]
+                if stale:
+                    self._stage({"stale": stale})
+        self._write(write)
+
+    def put(self, username, items):
+        def write():
+            with self._lock:
+                self.data()
+                self._stage({"user": username, "items": items})
+        self._write(write)
+
+    def replace_all(self, suggestions):
+        def write():
+            with self._lock:
+                self.data()
+                self._data = suggestions
+                self.save()
+                self.journal.truncate()
+        self._write(write)
+
+
+def _top(counts, k):
+    # Highest score first, ties by name so results are stable
+    return [[name, score] for name, score in heapq.nsmallest(k, counts.items(), key=lambda kv: (-kv[1], kv[0]))]
+
+
+def suggest_for(username, following, k=TOP_K):
+    """Pure Python 2-hop count for one user. `following(user)` returns a set."""
+    followees = following(username)
+    counts = Counter()
+    for followee in followees:
+        counts.update(following(followee))
+    counts.pop(username, None)
+    for followee in followees:
+        counts.pop(followee, None)
+    return _top(counts, k)
+
+
+def compute_all_python(graph, k=TOP_K):
+    following = {user: set(followees) for user, followees in graph.items()}
+    empty = set()
+    return {user: suggest_for(user, lambda u: following.get(u, empty), k) for user in following}
+
+
+def compute_all_scipy(graph, k=TOP_K):
+    """Row u of A @ A = for every candidate, the number of u's followees that follow it."""
+    import numpy as np
+    from scipy.sparse import csr_matrix, identity
+
+    names = list(graph)
+    index = {name: i for i, name in enumerate(names)}
+    rows, cols = [], []
+    for user, followees in graph.items():
+        for followee in followees:
+            if followee not in index:
+                index[followee] = len(names)
+                names.append(followee)
+            rows.append(index[user])
+            cols.append(index[followee])
+    n = len(names)
+    A = csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(n, n))
+
+    A_bool = A.astype(bool)
+    # Position of each name in sorted order -> ties broken by name, like _top()
+    name_rank = np.empty(n, dtype=np.int64)
+    name_rank[sorted(range(n), key=names.__getitem__)] = np.arange(n)
+    result = {}
+    for start in range(0, n, BLOCK_ROWS):
+        stop = min(n, start + BLOCK_ROWS)
+        block = (A[start:stop] @ A).tocsr()
+        # Drop yourself and users you already follow (whole block at once)
+        own = identity(n, dtype=bool, format="csr")[start:stop]
+        block = block - block.multiply(A_bool[start:stop] + own)
+        block.eliminate_zeros()
+        block = block.tocsr()
+        for offset in range(stop - start):
+            u = start + offset
+            if names[u] not in graph:
+                continue
+            lo, hi = block.indptr[offset], block.indptr[offset + 1]
+            candidates, scores = block.indices[lo:hi], block.data[lo:hi]
+            best = np.lexsort((name_rank[candidates], -scores))[:k]
+            result[names[u]] = [[names[c], int(s)] for c, s in zip(candidates[best], scores[best])]
+    return result
+
+
+class Recommender:
+    def __init__(self, path=SUGGESTIONS_PATH, k=TOP_K):
+        self.store = SuggestionStore(path)
+        self.k = k
+
+    def rebuild(self, use_scipy=HAS_SCIPY):
+        """Batch job: recompute every user's suggestions from one read of the graph."""
+        graph = repo.followers.data()
+        suggestions = compute_all_scipy(graph, self.k) if use_scipy else compute_all_python(graph, self.k)
+        self.store.replace_all(suggestions)
+        return len(suggestions)
+
+    def on_edge_change(self, username):
+        """username followed / unfollowed someone: refresh the lists that can change."""
+        self.store.put(username, suggest_for(username, repo.followers.following, self.k))
+        self.store.invalidate(repo.followers.followers_of(username))
+
+    def suggestions(self, username, limit=5):
+        """[(username, mutual count), ...] best first."""
+        items = self.store.data().get(username)
+        if items is None:
+            # New user or stale list -> compute on the fly and keep it
+            items = suggest_for(username, repo.followers.following, self.k)
+            self.store.put(username, items)
+        # Drop anybody followed since the list was computed
+        followed = repo.followers.following(username)
+        return [(name, score) for name, score in items if name not in followed][:limit]
+
+
+recommender = Recommender()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Friend-of-friend suggestions for Mini Social Network")
+    parser.add_argument("--rebuild", action="store_true", help="recompute Data/suggestions.json")
+    parser.add_argument("--no-scipy", action="store_true", help="force the pure Python implementation")
+    args = parser.parse_args()
+    if args.rebuild:
+        start = time.perf_counter()
+        count = recommender.rebuild(use_scipy=HAS_SCIPY and not args.no_scipy)
+        print(f"✔ Suggestions for {count} users in {time.perf_counter() - start:.2f}s")
+    else:
+        parser.print_help()
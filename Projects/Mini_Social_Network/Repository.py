@@ -0,0 +1,517 @@
+"""
+Repository.py – in-memory, indexed view of the JSON files in Data/
+
+Every load_* helper used to reopen and re-parse its JSON file, and every lookup
+was a linear scan over the result. Here each store is parsed ONCE and kept in
+memory together with hash indexes:
+    - users      : username -> user record
+    - posts      : username -> list of post ids (post id = position in the store)
+    - followers  : follower -> followees and user -> followers (Follower_Graph.py)
+
+If the file is changed by someone else (another run of main.py, a manual edit)
+the (mtime, size, inode) signature changes and the store is reloaded on the next
+call. Writes go through a WriteCoordinator (Write_Coordinator.py), so writers in
+different threads or processes never overwrite each other's changes.
+
+These are the "json" implementations of the interfaces in Storage.py. The
+module-level users / posts / followers below are whatever backend is selected.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+import Timestamp
+from Follower_Graph import FollowerGraph
+from Journal import Journal
+from Storage import BACKEND, DATA_DIR, FollowerStoreBase, PostStoreBase, UserStoreBase
+from Write_Coordinator import WriteCoordinator
+
+# Journal compaction: check every COMPACT_INTERVAL seconds, fold the log into
+# the snapshot (posts.json, followers.json) once it has grown past COMPACT_MIN_BYTES.
+COMPACT_INTERVAL = 30
+COMPACT_MIN_BYTES = 256 * 1024
+
+
+class JsonStore:
+    """One JSON file, parsed once and cached until its signature on disk changes."""
+
+    def __init__(self, path, default):
+        self.path = path
+        self.default = default  # factory for an empty store (list / dict)
+        self._data = None
+        self._signature = None
+        self._lock = threading.RLock()
+        self._dirty = False  # changed in memory by a write, saved by the next commit
+        self.writer = WriteCoordinator(path + ".lock", commit=self._commit)
+
+    def _stat(self):
+        # NOTE: (mtime_ns, size) is cheap to read and changes on every real write,
+        # the inode changes on every os.replace (even a same-size one in the same tick).
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _read(self):
+        try:
+            with open(self.path, "r") as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return self.default()
+
+    def data(self):
+        """Return the cached content, reloading it only if the file changed."""
+        with self._lock:
+            signature = self._stat()
+            if self._data is None or signature != self._signature:
+                self._data = self._read()
+                self._signature = signature
+                self._migrate()
+                self._build_index()
+            return self._data
+
+    def save(self):
+        """Write the in-memory copy back (temp file + os.replace, like Expense_Tracker)."""
+        with self._lock:
+            temp = self.path + ".tmp"
+            with open(temp, "w") as file:
+                json.dump(self._data, file, indent=4, ensure_ascii=False)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp, self.path)
+            # Remember our own write so it doesn't trigger a pointless reload
+            self._signature = self._stat()
+
+    def _write(self, fn):
+        """
+        Run fn (a read-modify-write) on the writer thread, under the cross-process
+        file lock. fn must call data() first, to start from what's on disk now.
+        NOTE: don't call this while holding self._lock, the writer thread needs it.
+        """
+        return self.writer.run(fn)
+
+    def _commit(self):
+        """Called by the writer once per batch of writes (group commit)."""
+        with self._lock:
+            if self._dirty:
+                self._dirty = False
+                try:
+                    self.save()
+                except BaseException:
+                    self._data = None  # memory is ahead of the disk -> reload
+                    raise
+
+    def _migrate(self):
+        """Upgrade records written by older versions, then save once."""
+        pass
+
+    def _build_index(self):
+        pass
+
+
+class UserStore(JsonStore, UserStoreBase):
+    def __init__(self, path):
+        super().__init__(path, list)
+        self._by_username = {}
+
+    def _migrate(self):
+        changed = [Timestamp.ensure_ts(user) for user in self._data]
+        if any(changed):
+            self.save()
+
+    def _build_index(self):
+        self._by_username = {user["username"]: user for user in self._data}
+
+    def get(self, username):
+        with self._lock:
+            self.data()
+            return self._by_username.get(username)
+
+    def add(self, record):
+        def write():
+            with self._lock:
+                users = self.data()
+                if record["username"] in self._by_username:
+                    raise ValueError(f"username {record['username']!r} already exists")
+                users.append(record)
+                self._by_username[record["username"]] = record
+                self._dirty = True  # one users.json rewrite per batch, not per user
+        self._write(write)
+
+    def add_many(self, records):
+        def write():
+            with self._lock:
+                users = self.data()
+                added = 0
+                for record in records:
+                    if record["username"] not in self._by_username:
+                        users.append(record)
+                        self._by_username[record["username"]] = record
+                        added += 1
+                self._dirty = self._dirty or added > 0
+                return added
+        return self._write(write)
+
+    def update(self, username, fields):
+        def write():
+            with self._lock:
+                self.get(username).update(fields)
+                self._dirty = True
+        self._write(write)
+
+    def usernames(self):
+        with self._lock:
+            self.data()
+            return list(self._by_username)
+
+    def count(self):
+        return len(self.data())
+
+
+class JournaledStore(JsonStore):
+    """
+    A JSON snapshot plus an append-only journal (<name>.log, see Journal.py).
+    Writes only append to the journal, readers see snapshot + log tail, and the
+    compactor periodically folds the log back into the snapshot.
+    Subclasses say how to apply journal records in _apply().
+    """
+
+    def __init__(self, path, default):
+        super().__init__(path, default)
+        self.journal = Journal(os.path.splitext(path)[0] + ".log")
+        self._compactor = None
+
+    def data(self):
+        with self._lock:
+            while True:
+                signature = self._stat()
+                if self._data is None or signature != self._signature:
+                    self._data = self._read()
+                    self._signature = signature
+                    self._migrate()
+                    self._build_index()
+                    self.journal.restart()
+                records = self.journal.read_new()
+                if records is not None:
+                    break
+                # Compacted by another process since we loaded: the records
+                # that were in the old log are in the new snapshot now
+                self._data = None
+            self._apply(records)
+            return self._data
+
+    def _apply(self, records):
+        raise NotImplementedError
+
+    def _stage(self, record):
+        """Inside a write: journal the record (written at commit) and apply it now."""
+        self.journal.stage(record)
+        self._apply([record])
+
+    def _commit(self):
+        with self._lock:
+            super()._commit()
+            try:
+                self.journal.flush()
+            except BaseException:
+                self.journal.discard()
+                self._data = None
+                raise
+
+    def compact(self):
+        """Fold the log into the snapshot. Returns False if there was nothing to do."""
+        def write():
+            with self._lock:
+                self.data()
+                if self.journal.size() == 0:
+                    return False
+                self.save()
+                self.journal.truncate()
+                return True
+        return self._write(write)
+
+    def start_compactor(self, interval=COMPACT_INTERVAL, min_bytes=COMPACT_MIN_BYTES):
+        """Background (daemon) thread that compacts once the log is big enough."""
+        def run():
+            while True:
+                time.sleep(interval)
+                if self.journal.size() >= min_bytes:
+                    self.compact()
+
+        if self._compactor is None:
+            self._compactor = threading.Thread(target=run, daemon=True)
+            self._compactor.start()
+
+
+class PostStore(JournaledStore, PostStoreBase):
+    """
+    posts.json is the snapshot, new posts are appended to posts.log.
+    Every post carries an "id" (its position), so log records already present
+    in the snapshot are skipped after a crash mid-compaction.
+    """
+
+    def __init__(self, path):
+        super().__init__(path, list)
+        self._by_author = {}
+
+    def _migrate(self):
+        # Old posts.json files have no ids / ts -> add them once and save
+        changed = False
+        if any("id" not in post for post in self._data):
+            for post_id, post in enumerate(self._data):
+                post["id"] = post_id
+            changed = True
+        for post in self._data:
+            changed = Timestamp.ensure_ts(post) or changed
+        if changed:
+            self.save()
+
+    def _index(self, post):
+        username, ts = post["username"], post["ts"]
+        self._by_author.setdefault(username, []).append(post["id"])
+        stamps = self._ts_by_author.setdefault(username, [])
+        # NOTE: ts nearly always grows with the id, but a clock can step back
+        # (or another process's clock lag) -> insert in ts order, append is the usual case
+        i = bisect_right(stamps, ts)
+        stamps.insert(i, ts)
+        self._ids_by_ts.setdefault(username, []).insert(i, post["id"])
+
+    def _build_index(self):
+        self._by_author = {}
+        self._ts_by_author = {}  # username -> sorted ts, bisect for time ranges
+        self._ids_by_ts = {}     # parallel to _ts_by_author: the post id of each ts
+        for post in self._data:
+            self._index(post)
+
+    def _apply(self, records):
+        for record in records:
+            if record["id"] < len(self._data):
+                continue  # already in the snapshot
+            Timestamp.ensure_ts(record)
+            self._data.append(record)
+            self._index(record)
+
+    def get(self, post_id):
+        return self.data()[post_id]
+
+    def get_many(self, post_ids):
+        posts = self.data()
+        return [posts[post_id] for post_id in post_ids]
+
+    def count(self):
+        return len(self.data())
+
+    def authors(self):
+        with self._lock:
+            self.data()
+            return list(self._by_author)
+
+    def ids_by_author(self, username):
+        """Post ids of one author, oldest first. Ids grow with creation time."""
+        with self._lock:
+            self.data()
+            return list(self._by_author.get(username, ()))  # a copy, callers may keep / change it
+
+    def latest_by_author(self, username, limit):
+        with self._lock:
+            posts = self.data()
+            return [posts[i] for i in self._by_author.get(username, [])[-limit:]]
+
+    def count_by_author(self, username):
+        with self._lock:
+            self.data()
+            return len(self._by_author.get(username, ()))
+
+    def ids_between(self, username, start=None, end=None):
+        """Ids of username's posts with start <= ts < end (epoch ns), found by bisect."""
+        with self._lock:
+            self.data()
+            ids = self._ids_by_ts.get(username, [])
+            stamps = self._ts_by_author.get(username, [])
+            lo = 0 if start is None else bisect_left(stamps, start)
+            hi = len(stamps) if end is None else bisect_left(stamps, end)
+            return ids[lo:hi]
+
+    def since(self, start, authors=None, end=None):
+        """Posts created in [start, end) by `authors` (default: everyone), newest first."""
+        with self._lock:
+            posts = self.data()
+            authors = self.authors() if authors is None else authors
+            ids = [i for author in authors for i in self.ids_between(author, start, end)]
+            return sorted((posts[i] for i in ids), key=lambda post: post["ts"], reverse=True)
+
+    def by_author(self, username):
+        """Posts of one author, oldest first (same order as posts.json)."""
+        with self._lock:
+            posts = self.data()
+            return [posts[i] for i in self._by_author.get(username, [])]
+
+    def newest(self, before=None):
+        posts = self.data()
+        start = len(posts) if before is None else min(before, len(posts))
+        for post_id in range(start - 1, -1, -1):
+            yield post_id, posts[post_id]["username"]
+
+    def add(self, record):
+        """Constant time: one appended line, no matter how many posts exist."""
+        def write():
+            with self._lock:
+                record["id"] = len(self.data())
+                self._stage(record)
+                return record["id"]
+        return self._write(write)
+
+    def add_many(self, records):
+        """One write for the whole list: still one journal line per post, one fsync at commit."""
+        def write():
+            with self._lock:
+                next_id = len(self.data())
+                for post_id, record in enumerate(records, next_id):
+                    record["id"] = post_id
+                    self._stage(record)
+                return list(range(next_id, next_id + len(records)))
+        return self._write(write)
+
+    def scan(self):
+        yield from self.data()[:]  # NOTE: a copy of the list only (references), not of the posts
+
+class FollowerStore(JournaledStore, FollowerStoreBase):
+    """
+    followers.json (user -> [followees]) is the snapshot, every follow / unfollow
+    is appended to followers.log as an edge event instead of dumping the whole
+    dict. Events are idempotent, so replaying them over a snapshot that already
+    contains them (crash mid-compaction) gives the same graph.
+    The index is a FollowerGraph (forward + reverse adjacency sets).
+    """
+
+    def __init__(self, path):
+        super().__init__(path, dict)
+        self.graph = FollowerGraph()
+
+    def _build_index(self):
+        self.graph = FollowerGraph.from_dict(self._data)
+        self._data = {}  # the graph holds everything, don't keep two copies
+
+    def _apply(self, events):
+        for event in events:
+            if event["op"] == "user":
+                self.graph.add_user(event["user"])
+            elif event["op"] == "follow":
+                self.graph.follow(event["user"], event["target"])
+            elif event["op"] == "unfollow":
+                self.graph.unfollow(event["user"], event["target"])
+
+    def _record(self, event):
+        self._stage(event)
+
+    def _graph(self):
+        with self._lock:
+            super().data()
+            return self.graph
+
+    def data(self):
+        """{user: [followees]} like followers.json (built from the graph)."""
+        with self._lock:
+            return self._graph().to_dict()
+
+    def save(self):
+        with self._lock:
+            self._data = self.graph.to_dict()
+            super().save()
+            self._data = {}
+
+    def users(self):
+        with self._lock:
+            return self._graph().users()
+
+    def following(self, username):
+        with self._lock:
+            return self._graph().following(username)
+
+    def followers_of(self, username):
+        with self._lock:
+            return self._graph().followers_of(username)
+
+    def is_following(self, username, target):
+        with self._lock:
+            return self._graph().is_following(username, target)
+
+    def following_count(self, username):
+        with self._lock:
+            return self._graph().following_count(username)
+
+    def followers_count(self, username):
+        with self._lock:
+            return self._graph().followers_count(username)
+
+    def mutuals(self, username):
+        with self._lock:
+            return self._graph().mutuals(username)
+
+    def ensure_user(self, username):
+        def write():
+            with self._lock:
+                if not self._graph().has_user(username):
+                    self._record({"op": "user", "user": username})
+        self._write(write)
+
+    def ensure_users(self, usernames):
+        def write():
+            with self._lock:
+                graph = self._graph()
+                for username in usernames:
+                    if not graph.has_user(username):
+                        self._record({"op": "user", "user": username})
+        self._write(write)
+
+    def follow(self, username, target):
+        """Returns False if the edge already existed."""
+        def write():
+            with self._lock:
+                self.ensure_user(username)
+                if self.graph.is_following(username, target):
+                    return False
+                self._record({"op": "follow", "user": username, "target": target})
+                return True
+        return self._write(write)
+
+    def follow_many(self, edges):
+        def write():
+            with self._lock:
+                graph = self._graph()
+                added = 0
+                for username, target in edges:
+                    if not graph.has_user(username):
+                        self._record({"op": "user", "user": username})
+                    if not graph.is_following(username, target):
+                        self._record({"op": "follow", "user": username, "target": target})
+                        added += 1
+                return added
+        return self._write(write)
+
+    def edges(self):
+        yield from self._graph().edges()
+
+    def unfollow(self, username, target):
+        """Returns False if there was no such edge."""
+        def write():
+            with self._lock:
+                if not self._graph().is_following(username, target):
+                    return False
+                self._record({"op": "unfollow", "user": username, "target": target})
+                return True
+        return self._write(write)
+
+
+if BACKEND == "sqlite":
+    from Sqlite_Store import SqliteBackend
+
+    _db = SqliteBackend()
+    users, posts, followers = _db.users, _db.posts, _db.followers
+else:
+    users = UserStore(os.path.join(DATA_DIR, "users.json"))
+    posts = PostStore(os.path.join(DATA_DIR, "posts.json"))
+    followers = FollowerStore(os.path.join(DATA_DIR, "followers.json"))
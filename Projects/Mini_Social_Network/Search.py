@@ -0,0 +1,345 @@
+"""
+Search.py – full-text search over post titles and contents
+
+Inverted index: term -> posting list [(post id, [positions]), ...]
+    - tokenizer: lower-cased words (\\w+), title and content are one field
+    - queries  : python "data structure"      -> AND of a word and a phrase
+                 python OR java               -> either clause
+    - ranking  : BM25
+
+On disk (Data/), so startup doesn't re-tokenize every post:
+    search.seg   postings, varint encoded: doc id delta, tf, position deltas
+                 (memory-mapped, a term is decoded only when a query needs it)
+    search.lens  token count of every post (array of uint32, index = post id)
+    search.dict  JSON: term -> [offset, length, df, last doc] + totals, and the
+                 ids below "docs" that aren't indexed yet ("missing")
+New posts go into a small in-memory index (Post.create_post) that is written
+out as a new segment every FLUSH_EVERY posts. A new segment copies the old
+posting bytes as they are and appends the new postings behind them.
+
+Rebuild from Data/posts.json:
+    python Search.py --rebuild
+"""
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import threading
+from array import array
+
+import Repository as repo
+from Storage import DATA_DIR
+from Write_Coordinator import FileLock
+
+SEGMENT_PATH = os.path.join(DATA_DIR, "search.seg")
+LENGTHS_PATH = os.path.join(DATA_DIR, "search.lens")
+DICT_PATH = os.path.join(DATA_DIR, "search.dict")
+FLUSH_EVERY = 1000  # in-memory posts before a new segment is written
+
+# BM25 parameters (the usual defaults)
+K1 = 1.2
+B = 0.75
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return [token.casefold() for token in TOKEN_RE.findall(text or "")]
+
+
+def doc_terms(title, content):
+    """term -> positions for one post, and its length in tokens."""
+    positions = {}
+    pos = 0
+    for token in tokenize(title):
+        positions.setdefault(token, []).append(pos)
+        pos += 1
+    length = pos
+    pos += 1  # gap, so a phrase can't start in the title and end in the content
+    for token in tokenize(content):
+        positions.setdefault(token, []).append(pos)
+        pos += 1
+        length += 1
+    return positions, length
+
+
+# ---------- varint encoding ----------
+def write_varint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def read_varint(buf, pos):
+    result = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def encode_postings(postings, last_doc=-1):
+    """postings: [(doc, positions)] sorted by doc; deltas continue from last_doc."""
+    out = bytearray()
+    for doc, positions in postings:
+        write_varint(out, doc - last_doc)
+        last_doc = doc
+        write_varint(out, len(positions))
+        last_pos = 0
+        for p in positions:
+            write_varint(out, p - last_pos)
+            last_pos = p
+    return out
+
+
+def decode_postings(buf, offset, length, df):
+    postings = {}
+    pos, end, doc = offset, offset + length, -1
+    for _ in range(df):
+        delta, pos = read_varint(buf, pos)
+        doc += delta
+        tf, pos = read_varint(buf, pos)
+        positions, p = [], 0
+        for _ in range(tf):
+            step, pos = read_varint(buf, pos)
+            p += step
+            positions.append(p)
+        postings[doc] = positions
+    assert pos == end, "corrupt search segment"
+    return postings
+
+
+# ---------- query parsing ----------
+def parse_query(query):
+    """'python "data structure" OR java' -> [[["python"], ["data", "structure"]], [["java"]]]"""
+    clauses = [[]]
+    for match in re.finditer(r'"([^"]*)"|(\S+)', query):
+        phrase, word = match.groups()
+        if word == "OR":
+            clauses.append([])
+            continue
+        if word == "AND":
+            continue
+        tokens = tokenize(phrase if phrase is not None else word)
+        if tokens:
+            clauses[-1].append(tokens)
+    return [clause for clause in clauses if clause]
+
+
+def _phrase_docs(tokens, postings_of):
+    lists = [postings_of(token) for token in tokens]
+    docs = set.intersection(*(set(p) for p in lists))
+    found = set()
+    for doc in docs:
+        later = [set(p[doc]) for p in lists[1:]]
+        if any(all(start + i + 1 in positions for i, positions in enumerate(later)) for start in lists[0][doc]):
+            found.add(doc)
+    return found
+
+
+class SearchIndex:
+    def __init__(self, segment_path=SEGMENT_PATH, lengths_path=LENGTHS_PATH, dict_path=DICT_PATH,
+                 flush_every=FLUSH_EVERY):
+        self.segment_path = segment_path
+        self.lengths_path = lengths_path
+        self.dict_path = dict_path
+        self.flush_every = flush_every
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(dict_path + ".lock")  # other processes write segments too
+        self._loaded = False
+
+    # ---------- loading ----------
+    def _reset(self):
+        self._terms = {}        # segment dictionary: term -> [offset, length, df, last doc]
+        self._segment = b""     # mmap of search.seg
+        self._memory = {}       # term -> {doc: positions} for posts not in the segment yet
+        self._memory_docs = 0
+        self._lengths = array("I")
+        self._missing = set()   # ids < len(_lengths) that aren't indexed (added out of order)
+        self._total_length = 0
+
+    def _open_segment(self):
+        """Returns False if there is no usable segment on disk."""
+        try:
+            with open(self.dict_path, "r") as file:
+                header = json.load(file)
+            with open(self.lengths_path, "rb") as file:
+                self._lengths.frombytes(file.read())
+            size = os.path.getsize(self.segment_path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+        if size != header["segment_size"] or len(self._lengths) != header["docs"]:
+            return False  # half-written segment
+        if size:
+            with open(self.segment_path, "rb") as file:
+                self._segment = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._terms = header["terms"]
+        self._total_length = header["total_length"]
+        self._missing = set(header.get("missing", ()))
+        return True
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._reset()
+        post_count = repo.posts.count()
+        if not self._open_segment() or len(self._lengths) > post_count:
+            self.rebuild()
+        else:
+            # Posts written since the segment (e.g. by another run) -> index only those
+            new = sorted(post_id for post_id in self._missing if post_id < post_count)
+            new += range(len(self._lengths), post_count)
+            for post in repo.posts.get_many(new):
+                self._add_to_memory(post["id"], post.get("title"), post["content"])
+        self._loaded = True
+
+    # ---------- indexing ----------
+    def _add_to_memory(self, post_id, title, content):
+        positions, length = doc_terms(title, content)
+        if post_id < len(self._lengths):
+            self._missing.discard(post_id)  # fills a gap left by a newer post
+            self._lengths[post_id] = length
+        else:
+            # NOTE: the ids in between are remembered as missing, not as indexed
+            self._missing.update(range(len(self._lengths), post_id))
+            self._lengths.extend([0] * (post_id - len(self._lengths)))
+            self._lengths.append(length)
+        self._total_length += length
+        for term, term_positions in positions.items():
+            self._memory.setdefault(term, {})[post_id] = term_positions
+        self._memory_docs += 1
+
+    def add(self, post_id, title, content):
+        """Called by Post.create_post right after the post is stored."""
+        with self._lock:
+            self._ensure_loaded()
+            if post_id < len(self._lengths) and post_id not in self._missing:
+                return  # already indexed
+            self._add_to_memory(post_id, title, content)
+            if self._memory_docs >= self.flush_every:
+                self.write_segment()
+
+    def write_segment(self):
+        """Old posting bytes are copied as they are, new postings appended behind them."""
+        with self._lock, self._file_lock:
+            out = bytearray()
+            terms = {}
+            for term in self._terms.keys() | self._memory.keys():
+                offset = len(out)
+                df, last_doc = 0, -1
+                if term in self._terms:
+                    old_offset, old_length, df, last_doc = self._terms[term]
+                    out += self._segment[old_offset:old_offset + old_length]
+                new = sorted(self._memory.get(term, {}).items())
+                if new and new[0][0] <= last_doc:
+                    # A gap filled below the segment's last doc: deltas can't go
+                    # backwards, so this term's list is decoded and written again
+                    old = decode_postings(self._segment, *self._terms[term][:3])
+                    del out[offset:]
+                    new = sorted({**old, **dict(new)}.items())
+                    df, last_doc = 0, -1
+                if new:
+                    out += encode_postings(new, last_doc)
+                    df += len(new)
+                    last_doc = new[-1][0]
+                terms[term] = [offset, len(out) - offset, df, last_doc]
+
+            header = {"docs": len(self._lengths), "total_length": self._total_length,
+                      "segment_size": len(out), "terms": terms, "missing": sorted(self._missing)}
+            for path, payload in ((self.segment_path, bytes(out)), (self.lengths_path, self._lengths.tobytes())):
+                with open(path + ".tmp", "wb") as file:
+                    file.write(payload)
+            with open(self.dict_path + ".tmp", "w") as file:
+                json.dump(header, file, ensure_ascii=False)
+            if isinstance(self._segment, mmap.mmap):
+                self._segment.close()
+            os.replace(self.segment_path + ".tmp", self.segment_path)
+            os.replace(self.lengths_path + ".tmp", self.lengths_path)
+            os.replace(self.dict_path + ".tmp", self.dict_path)  # last: the "commit"
+
+            self._reset()
+            self._open_segment()
+
+    def rebuild(self):
+        with self._lock:
+            if getattr(self, "_segment", None) and isinstance(self._segment, mmap.mmap):
+                self._segment.close()
+            self._reset()
+            for post in repo.posts.data():
+                self._add_to_memory(post["id"], post.get("title"), post["content"])
+            self.write_segment()
+            self._loaded = True
+            return len(self._lengths)
+
+    # ---------- searching ----------
+    def postings(self, term):
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._terms.get(term)
+            postings = decode_postings(self._segment, entry[0], entry[1], entry[2]) if entry else {}
+            postings.update(self._memory.get(term, {}))
+            return postings
+
+    def search(self, query, limit=10):
+        """[(post id, BM25 score), ...] best first."""
+        clauses = parse_query(query)
+        if not clauses:
+            return []
+        with self._lock:
+            self._ensure_loaded()
+            cache = {}
+
+            def postings_of(term):
+                if term not in cache:
+                    cache[term] = self.postings(term)
+                return cache[term]
+
+            matches = set()
+            for clause in clauses:
+                docs = None
+                # Rarest part first, so the intersection shrinks quickly
+                for tokens in sorted(clause, key=lambda t: len(postings_of(t[0]))):
+                    found = set(postings_of(tokens[0])) if len(tokens) == 1 else _phrase_docs(tokens, postings_of)
+                    docs = found if docs is None else docs & found
+                    if not docs:
+                        break
+                matches |= docs or set()
+
+            n_docs = max(1, len(self._lengths))
+            avg_length = self._total_length / n_docs or 1
+            terms = {token for clause in clauses for tokens in clause for token in tokens}
+            scores = dict.fromkeys(matches, 0.0)
+            for term in terms:
+                postings = postings_of(term)
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc in matches & postings.keys():
+                    tf = len(postings[doc])
+                    norm = K1 * (1 - B + B * self._lengths[doc] / avg_length)
+                    scores[doc] += idf * tf * (K1 + 1) / (tf + norm)
+            return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], item[0]))
+
+
+search_index = SearchIndex()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Full-text search over Mini Social Network posts")
+    parser.add_argument("--rebuild", action="store_true", help="re-index every post into Data/search.*")
+    parser.add_argument("query", nargs="?", help="run one query and print the results")
+    args = parser.parse_args()
+    if args.rebuild:
+        print(f"✔ Indexed {search_index.rebuild()} posts")
+    if args.query:
+        for post_id, score in search_index.search(args.query):
+            post = repo.posts.get(post_id)
+            print(f"{score:6.2f}  {post['username']}: {post['title']} - {post['content']}")
+    if not (args.rebuild or args.query):
+        parser.print_help()
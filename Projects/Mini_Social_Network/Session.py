@@ -0,0 +1,161 @@
+"""
+Session.py – signed session tokens and an in-memory session cache
+
+Login is slow on purpose (scrypt, see Credentials.py), so it should happen once
+per session, not once per request. After a login:
+    token = sessions.issue(user)          # "<payload>.<HMAC-SHA256 signature>"
+    user  = sessions.resolve(token)       # User or None, no password check
+The payload is username + expiry + a random nonce. A token that was changed or
+made with another secret fails the signature check before anything is looked up.
+
+Resolved users are kept in a bounded LRU cache (OrderedDict, oldest dropped
+first) with a TTL, so a hit costs one HMAC and one dict lookup, no disk. A valid
+token that isn't cached (evicted, or issued by another process with the same
+secret) is a miss: the user is loaded once from the user store and cached again.
+
+The secret comes from $MSN_SESSION_SECRET, else Data/session.key (created on
+first use). Deleting the key logs everybody out.
+"""
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+import Repository as repo
+from Storage import DATA_DIR
+from user import User
+
+KEY_PATH = os.path.join(DATA_DIR, "session.key")
+SESSION_TTL = 60 * 60 * 12  # seconds a token stays valid
+MAX_SESSIONS = 10_000       # users kept in the cache
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _load_secret(path=KEY_PATH):
+    secret = os.environ.get("MSN_SESSION_SECRET")
+    if secret:
+        return secret.encode()
+    try:
+        with open(path, "rb") as file:
+            return file.read()
+    except FileNotFoundError:
+        key = secrets.token_bytes(32)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as file:
+            file.write(key)
+        return key
+
+
+class SessionManager:
+    def __init__(self, secret=None, ttl=SESSION_TTL, max_sessions=MAX_SESSIONS, clock=time.time):
+        self._secret = secret
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()  # token -> (User, expires)
+        self._revoked = {}           # token -> expires, until the token would expire anyway
+        self.hits = self.misses = self.evictions = 0
+
+    @property
+    def secret(self):
+        if self._secret is None:
+            self._secret = _load_secret()
+        return self._secret
+
+    def _sign(self, payload):
+        return _b64encode(hmac.new(self.secret, payload.encode(), hashlib.sha256).digest())
+
+    def _check(self, token):
+        """(username, expires) if the signature is good and the token not expired, else None."""
+        try:
+            payload, signature = token.rsplit(".", 1)
+            if not hmac.compare_digest(self._sign(payload), signature):
+                return None
+            username, expires, _nonce = _b64decode(payload).decode().rsplit("\n", 2)
+            expires = int(expires)
+        except (ValueError, UnicodeDecodeError):
+            return None
+        return (username, expires) if expires > self.clock() else None
+
+    def _remember(self, token, user, expires):
+        self._cache[token] = (user, expires)
+        self._cache.move_to_end(token)
+        while len(self._cache) > self.max_sessions:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+
+    # ---------- API ----------
+    def issue(self, user):
+        """Call after a successful login; returns the token for `user` (a User)."""
+        expires = int(self.clock()) + self.ttl
+        payload = _b64encode(f"{user.username}\n{expires}\n{secrets.token_hex(8)}".encode())
+        token = f"{payload}.{self._sign(payload)}"
+        with self._lock:
+            self._remember(token, user, expires)
+        return token
+
+    def cached(self, token):
+        """The User for `token` if it is in the cache, else None. Never touches the disk."""
+        checked = self._check(token)
+        if checked is None:
+            return None
+        with self._lock:
+            entry = self._cache.get(token)
+            if entry is None or token in self._revoked:
+                return None
+            self.hits += 1
+            self._cache.move_to_end(token)
+            return entry[0]
+
+    def resolve(self, token):
+        """The logged-in User for `token`, or None (bad signature, expired, revoked)."""
+        checked = self._check(token)
+        if checked is None:
+            return None
+        username, expires = checked
+        with self._lock:
+            if token in self._revoked:
+                return None
+            entry = self._cache.get(token)
+            if entry is not None:
+                self.hits += 1
+                self._cache.move_to_end(token)
+                return entry[0]
+            self.misses += 1
+        record = repo.users.get(username)
+        if record is None:
+            return None
+        user = User.from_dict(record)
+        with self._lock:
+            self._remember(token, user, expires)
+        return user
+
+    def revoke(self, token):
+        """Logout: the token stops working even though its signature is still valid."""
+        checked = self._check(token)
+        with self._lock:
+            self._cache.pop(token, None)
+            now = self.clock()
+            self._revoked = {t: e for t, e in self._revoked.items() if e > now}
+            if checked is not None:
+                self._revoked[token] = checked[1]
+
+    def stats(self):
+        with self._lock:
+            return {"sessions": len(self._cache), "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions}
+
+
+sessions = SessionManager()
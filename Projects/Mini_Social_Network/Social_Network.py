@@ -1,51 +1,150 @@
+import base64
+import heapq
 import json
-import os
+from bisect import bisect_left
+from itertools import islice
 
-import Util as ut
-from Post import Post
+import Repository as repo
+from Engagement import engagement
+from Notifications import FOLLOW, notifications
+from Post import PostBatch
+from Recommendation import recommender
+from Timeline import timelines
+
+FEED_SIZE = 20  # posts shown per page of "View Feed"
+
+# Feed phases: first the people you follow (and yourself), then everybody else
+FOLLOWED, OTHERS = 0, 1
+
+
+def _encode_cursor(phase, before):
+    raw = json.dumps([phase, before]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor):
+    if cursor is None:
+        return FOLLOWED, None
+    try:
+        phase, before = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except TypeError:  # valid JSON, but not a pair
+        raise ValueError("bad cursor") from None
+    # NOTE: the cursor comes back from the client, so check what's inside too
+    if phase not in (FOLLOWED, OTHERS) or type(phase) is not int or type(before) is not int:
+        raise ValueError("bad cursor")
+    return phase, before
+
+
+def _newest_first(authors, before=None):
+    """
+    Lazy k-way merge of the authors' post id lists (each already sorted by time).
+    Only the heap (one entry per author) is kept, posts are produced one at a time.
+    """
+    lists = [repo.posts.ids_by_author(author) for author in authors]
+    heap = []
+    for k, ids in enumerate(lists):
+        end = len(ids) if before is None else bisect_left(ids, before)
+        if end:
+            heap.append((-ids[end - 1], k, end - 1))
+    heapq.heapify(heap)
+    while heap:
+        neg_id, k, pos = heap[0]
+        yield -neg_id
+        if pos:
+            heapq.heapreplace(heap, (-lists[k][pos - 1], k, pos - 1))
+        else:
+            heapq.heappop(heap)
+
+
+def _popular(username, followed, limit):
+    """
+    The most liked / viewed posts of the last hour (Engagement.py), followed
+    users (and yourself) first, then everyone else. One page only.
+    """
+    mine, others = [], []
+    for post_id, _score in engagement.top_posts(limit=None):
+        post = repo.posts.get(post_id)
+        (mine if post["username"] in followed else others).append(post)
+        if len(mine) == limit:
+            break
+    return PostBatch.from_records((mine + others)[:limit])
 
 
 class Social_Network:
     @staticmethod
-    def get_feed(current_user):
-        posts = [Post.from_dict(p) for p in ut.load_posts()]
-        followers_list = ut.load_followers().get(current_user, [])
+    def get_feed(current_user, limit=FEED_SIZE, cursor=None, order="recent"):
+        """
+        One page of the feed: followed users (and your own posts) first, newest
+        first, then everyone else. Returns (posts, next_cursor), posts is a
+        PostBatch, next_cursor is None once there is nothing more to show. Pass
+        it back to get the next page.
+        order="popular" ranks the posts of the last hour by likes and views
+        instead (a single page, next_cursor is always None).
+        """
+        username = getattr(current_user, "username", current_user)
+        if order == "popular":
+            return _popular(username, repo.followers.following(username) | {username}, limit), None
+        if order != "recent":
+            raise ValueError(f"unknown feed order {order!r}")
+        phase, before = _decode_cursor(cursor)
+        followed = repo.followers.following(username) | {username}
+        page = []
 
-        followed_posts = [p for p in posts if p.username in followers_list or p.username == current_user]
-        other_posts = [p for p in posts if p.username not in followers_list and p.username != current_user]
+        if phase == FOLLOWED:
+            # Fast path: the materialized timeline, heap merge only past its end
+            page = timelines.feed_ids(username, limit, before)
+            if len(page) < limit and not timelines.is_complete(username):
+                last = page[-1] if page else before
+                page += islice(_newest_first(followed, last), limit - len(page))
+            if len(page) == limit:
+                return PostBatch.from_records(repo.posts.get_many(page)), _encode_cursor(FOLLOWED, page[-1])
+            phase, before = OTHERS, None
 
-        final_feed = followed_posts + other_posts
-        return sorted(final_feed, key=lambda x: x.created_at, reverse=True)
+        # Everyone else: post ids are already in time order, so walking them
+        # newest first IS the merged stream, no heap over every author needed
+        others = (post_id for post_id, author in repo.posts.newest(before) if author not in followed)
+        start = len(page)
+        page += islice(others, limit - len(page))
+        next_cursor = None
+        if len(page) == limit and len(page) > start:
+            next_cursor = _encode_cursor(OTHERS, page[-1])
+        return PostBatch.from_records(repo.posts.get_many(page)), next_cursor
 
     @classmethod
     def update_followers(cls, current_user, target=None, action=None):
-        followers = ut.load_followers()
-
         if target is None:
-            if current_user.username not in followers:
-                followers[current_user.username] = []
-        else:
-            if target and target.username != current_user.username:
-                if action == "Follow":
-                    if target.username.strip() not in followers[current_user.username]:
-                        followers[current_user.username].append(target.username.strip())
-                    else:
-                        print("✔ Already following this user.")
-                elif action == "Unfollow":
-                    if target.username.strip() in followers[current_user.username]:
-                        followers[current_user.username].remove(target.username.strip())
-                    else:
-                        print("You are not following this user.")
+            repo.followers.ensure_user(current_user.username)
+            return
+
+        if target and target.username != current_user.username:
+            was_celebrity = timelines.is_celebrity(target.username.strip())
+            if action == "Follow":
+                if not repo.followers.follow(current_user.username, target.username.strip()):
+                    print("✔ Already following this user.")
                 else:
-                    print("✖ You are not following this user.")
+                    notifications.notify(target.username.strip(), FOLLOW, current_user.username)
+            elif action == "Unfollow":
+                if not repo.followers.unfollow(current_user.username, target.username.strip()):
+                    print("You are not following this user.")
             else:
-                print("You can't follow Yourself.")
-                return
-
-        with open("Data/followers.json", "w") as file:
-            json.dump(followers, file, indent=4)
+                print("✖ You are not following this user.")
+            timelines.refresh(current_user.username)
+            if timelines.is_celebrity(target.username.strip()) != was_celebrity:
+                timelines.refresh_followers(target.username.strip())
+            recommender.on_edge_change(current_user.username)
+        else:
+            print("You can't follow Yourself.")
 
     @classmethod
     def is_following(cls, current_user, target):
-        followers = ut.load_followers()
-        return current_user.username in followers and target.username in followers[current_user.username]
+        return repo.followers.is_following(current_user.username, target.username)
+
+    @staticmethod
+    def follow_counts(user):
+        """(followers, following) from the stores' counters, no follower set is built."""
+        return repo.followers.followers_count(user.username), repo.followers.following_count(user.username)
+
+    @staticmethod
+    def suggested_users(current_user, limit=5):
+        """[(username, number of people you follow who follow them), ...]"""
+        return recommender.suggestions(current_user.username, limit)
@@ -0,0 +1,441 @@
+"""
+Sqlite_Store.py – the "sqlite" storage backend (stdlib sqlite3)
+
+Same interface as the JSON stores in Repository.py (see Storage.py), but a
+register / post / follow is ONE indexed row write instead of rewriting a file.
+    - WAL mode      -> readers don't block the writer, safe across processes
+    - indexes       -> username, (author, ts), (follower, followee) and the reverse
+    - user_stats    -> posts / followers / following per user, kept up to date by
+                       triggers, so profile counts are one primary-key lookup
+
+Migrate the JSON files in Data/ into Data/social.db (one transaction):
+    python Sqlite_Store.py --migrate
+then run the app with MSN_BACKEND=sqlite.
+
+NOTE: only users, posts and follows live in the database. The derived /
+side stores keep their own files in Data/ with either backend: likes and
+views (engagement.json/.log), hashtags (tags.json/.log), notifications,
+suggestions.json, the search index (search.*) and timelines/.
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from Storage import DATA_DIR, FollowerStoreBase, PostStoreBase, UserStoreBase
+
+DB_PATH = os.path.join(DATA_DIR, "social.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username   TEXT PRIMARY KEY,
+    password   TEXT NOT NULL,
+    age        INTEGER,
+    bio        TEXT,
+    created_at TEXT,
+    ts         INTEGER
+);
+CREATE TABLE IF NOT EXISTS posts (
+    id         INTEGER PRIMARY KEY,
+    title      TEXT,
+    content    TEXT NOT NULL,
+    username   TEXT NOT NULL,
+    created_at TEXT,
+    ts         INTEGER
+);
+CREATE INDEX IF NOT EXISTS posts_author_ts ON posts (username, ts);
+CREATE INDEX IF NOT EXISTS posts_ts ON posts (ts);
+CREATE TABLE IF NOT EXISTS follows (
+    follower TEXT NOT NULL,
+    followee TEXT NOT NULL,
+    PRIMARY KEY (follower, followee)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS follows_reverse ON follows (followee, follower);
+CREATE TABLE IF NOT EXISTS graph_users (
+    username TEXT PRIMARY KEY
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS user_stats (
+    username  TEXT PRIMARY KEY,
+    posts     INTEGER NOT NULL DEFAULT 0,
+    followers INTEGER NOT NULL DEFAULT 0,
+    following INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS count_post AFTER INSERT ON posts BEGIN
+    INSERT INTO user_stats (username, posts) VALUES (NEW.username, 1)
+        ON CONFLICT (username) DO UPDATE SET posts = posts + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS count_follow AFTER INSERT ON follows BEGIN
+    INSERT INTO user_stats (username, following) VALUES (NEW.follower, 1)
+        ON CONFLICT (username) DO UPDATE SET following = following + 1;
+    INSERT INTO user_stats (username, followers) VALUES (NEW.followee, 1)
+        ON CONFLICT (username) DO UPDATE SET followers = followers + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS count_unfollow AFTER DELETE ON follows BEGIN
+    UPDATE user_stats SET following = following - 1 WHERE username = OLD.follower;
+    UPDATE user_stats SET followers = followers - 1 WHERE username = OLD.followee;
+END;
+"""
+
+# Recount user_stats from scratch (databases from before the triggers, re-run migrations)
+RECOUNT = """
+DELETE FROM user_stats;
+INSERT INTO user_stats (username, posts, followers, following)
+SELECT username, SUM(posts), SUM(followers), SUM(following) FROM (
+    SELECT username, COUNT(*) AS posts, 0 AS followers, 0 AS following FROM posts GROUP BY username
+    UNION ALL SELECT followee, 0, COUNT(*), 0 FROM follows GROUP BY followee
+    UNION ALL SELECT follower, 0, 0, COUNT(*) FROM follows GROUP BY follower
+) GROUP BY username;
+"""
+
+USER_COLUMNS = ("username", "password", "age", "bio", "created_at", "ts")
+POST_COLUMNS = ("id", "title", "content", "username", "created_at", "ts")
+
+# SQLite limits the number of "?" in one statement
+MAX_PARAMS = 900
+SCAN_BATCH = 1000  # rows per query when streaming a whole table (exports)
+
+
+class SqliteBackend:
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        # NOTE: autocommit mode (isolation_level=None), transaction() opens explicit ones
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.lock = threading.RLock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        with self.transaction() as conn:
+            if not conn.execute("SELECT 1 FROM user_stats LIMIT 1").fetchone() and (
+                    conn.execute("SELECT 1 FROM posts LIMIT 1").fetchone()
+                    or conn.execute("SELECT 1 FROM follows LIMIT 1").fetchone()):
+                self.recount(conn)
+        self.users = SqliteUserStore(self)
+        self.posts = SqlitePostStore(self)
+        self.followers = SqliteFollowerStore(self)
+
+    def query(self, sql, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def execute(self, sql, params=()):
+        """Run one write statement, returns the number of changed rows."""
+        with self.lock:
+            return self.conn.execute(sql, params).rowcount
+
+    @contextmanager
+    def transaction(self):
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    @staticmethod
+    def recount(conn):
+        """Inside a transaction: rebuild user_stats from posts and follows."""
+        for statement in RECOUNT.split(";"):
+            if statement.strip():
+                conn.execute(statement)
+
+    def stat(self, username, column):
+        rows = self.query(f"SELECT {column} FROM user_stats WHERE username = ?", (username,))
+        return rows[0][0] if rows else 0
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class SqliteUserStore(UserStoreBase):
+    def __init__(self, db):
+        self.db = db
+
+    def data(self):
+        return [dict(zip(USER_COLUMNS, row)) for row in self.db.query("SELECT * FROM users")]
+
+    def get(self, username):
+        rows = self.db.query("SELECT * FROM users WHERE username = ?", (username,))
+        return dict(zip(USER_COLUMNS, rows[0])) if rows else None
+
+    def add(self, record):
+        try:
+            self.db.execute(
+                "INSERT INTO users VALUES (?, ?, ?, ?, ?, ?)",
+                tuple(record.get(column) for column in USER_COLUMNS),
+            )
+        except sqlite3.IntegrityError as e:
+            if "UNIQUE" not in str(e):
+                raise  # e.g. a missing password
+            # Same error as the JSON UserStore, callers only know that one
+            raise ValueError(f"username {record['username']!r} already exists") from None
+
+    def add_many(self, records):
+        with self.db.transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO users VALUES (?, ?, ?, ?, ?, ?)",
+                (tuple(record.get(column) for column in USER_COLUMNS) for record in records),
+            )
+            return conn.total_changes - before
+
+    def update(self, username, fields):
+        columns = [column for column in fields if column in USER_COLUMNS and column != "username"]
+        if not columns:
+            return  # nothing we store ("UPDATE users SET  WHERE" isn't SQL)
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        self.db.execute(
+            f"UPDATE users SET {assignments} WHERE username = ?",
+            tuple(fields[column] for column in columns) + (username,),
+        )
+
+    def usernames(self):
+        return [row[0] for row in self.db.query("SELECT username FROM users")]
+
+    def count(self):
+        return self.db.query("SELECT COUNT(*) FROM users")[0][0]
+
+    def scan(self, batch=SCAN_BATCH):
+        last = ""
+        while True:
+            rows = self.db.query("SELECT * FROM users WHERE username > ? ORDER BY username LIMIT ?", (last, batch))
+            for row in rows:
+                yield dict(zip(USER_COLUMNS, row))
+            if len(rows) < batch:
+                return
+            last = rows[-1][0]
+
+
+class SqlitePostStore(PostStoreBase):
+    def __init__(self, db):
+        self.db = db
+
+    def data(self):
+        return [dict(zip(POST_COLUMNS, row)) for row in self.db.query("SELECT * FROM posts ORDER BY id")]
+
+    def add(self, record):
+        with self.db.transaction() as conn:
+            # Ids stay 0, 1, 2, ... like the JSON store (rowids would start at 1)
+            record["id"] = conn.execute("SELECT COALESCE(MAX(id), -1) + 1 FROM posts").fetchone()[0]
+            conn.execute(
+                "INSERT INTO posts VALUES (?, ?, ?, ?, ?, ?)",
+                tuple(record.get(column) for column in POST_COLUMNS),
+            )
+        return record["id"]
+
+    def add_many(self, records):
+        with self.db.transaction() as conn:
+            next_id = conn.execute("SELECT COALESCE(MAX(id), -1) + 1 FROM posts").fetchone()[0]
+            for post_id, record in enumerate(records, next_id):
+                record["id"] = post_id
+            conn.executemany(
+                "INSERT INTO posts VALUES (?, ?, ?, ?, ?, ?)",
+                (tuple(record.get(column) for column in POST_COLUMNS) for record in records),
+            )
+        return list(range(next_id, next_id + len(records)))
+
+    def get(self, post_id):
+        rows = self.db.query("SELECT * FROM posts WHERE id = ?", (post_id,))
+        if not rows:
+            raise IndexError(post_id)
+        return dict(zip(POST_COLUMNS, rows[0]))
+
+    def get_many(self, post_ids):
+        post_ids = list(post_ids)
+        found = {}
+        for i in range(0, len(post_ids), MAX_PARAMS):
+            chunk = post_ids[i:i + MAX_PARAMS]
+            marks = ",".join("?" * len(chunk))
+            for row in self.db.query(f"SELECT * FROM posts WHERE id IN ({marks})", chunk):
+                found[row[0]] = dict(zip(POST_COLUMNS, row))
+        return [found[post_id] for post_id in post_ids]
+
+    def count(self):
+        return self.db.query("SELECT COUNT(*) FROM posts")[0][0]
+
+    def authors(self):
+        return [row[0] for row in self.db.query("SELECT DISTINCT username FROM posts")]
+
+    def ids_by_author(self, username):
+        return [row[0] for row in self.db.query("SELECT id FROM posts WHERE username = ? ORDER BY id", (username,))]
+
+    def latest_by_author(self, username, limit):
+        # NOTE: by id like ids_by_author and the JSON store, not by ts
+        rows = self.db.query("SELECT * FROM posts WHERE username = ? ORDER BY id DESC LIMIT ?", (username, limit))
+        return [dict(zip(POST_COLUMNS, row)) for row in reversed(rows)]
+
+    def count_by_author(self, username):
+        return self.db.stat(username, "posts")
+
+    def ids_between(self, username, start=None, end=None):
+        rows = self.db.query(
+            "SELECT id FROM posts WHERE username = ? AND ts >= ? AND ts < ? ORDER BY ts",
+            (username, _low(start), _high(end)),
+        )
+        return [row[0] for row in rows]
+
+    def since(self, start, authors=None, end=None):
+        if authors is None:
+            rows = self.db.query(
+                "SELECT * FROM posts WHERE ts >= ? AND ts < ? ORDER BY ts DESC",
+                (_low(start), _high(end)),
+            )
+            return [dict(zip(POST_COLUMNS, row)) for row in rows]
+        ids = [i for author in authors for i in self.ids_between(author, start, end)]
+        return sorted(self.get_many(ids), key=lambda post: post["ts"], reverse=True)
+
+    def newest(self, before=None, batch=500):
+        before = _high(before)
+        while True:
+            rows = self.db.query(
+                "SELECT id, username FROM posts WHERE id < ? ORDER BY id DESC LIMIT ?", (before, batch)
+            )
+            yield from rows
+            if len(rows) < batch:
+                return
+            before = rows[-1][0]
+
+    def scan(self, batch=SCAN_BATCH):
+        last = -1
+        while True:
+            rows = self.db.query("SELECT * FROM posts WHERE id > ? ORDER BY id LIMIT ?", (last, batch))
+            for row in rows:
+                yield dict(zip(POST_COLUMNS, row))
+            if len(rows) < batch:
+                return
+            last = rows[-1][0]
+
+    def compact(self):
+        # WAL equivalent of folding the journal into the snapshot
+        self.db.query("PRAGMA wal_checkpoint(TRUNCATE)")
+        return True
+
+
+class SqliteFollowerStore(FollowerStoreBase):
+    def __init__(self, db):
+        self.db = db
+
+    def data(self):
+        graph = {username: [] for username in self.users()}
+        for follower, followee in self.db.query("SELECT follower, followee FROM follows"):
+            graph.setdefault(follower, []).append(followee)
+        return graph
+
+    def users(self):
+        return [row[0] for row in self.db.query(
+            "SELECT username FROM graph_users UNION SELECT follower FROM follows"
+        )]
+
+    def following(self, username):
+        return {row[0] for row in self.db.query("SELECT followee FROM follows WHERE follower = ?", (username,))}
+
+    def followers_of(self, username):
+        return {row[0] for row in self.db.query("SELECT follower FROM follows WHERE followee = ?", (username,))}
+
+    def is_following(self, username, target):
+        return bool(self.db.query(
+            "SELECT 1 FROM follows WHERE follower = ? AND followee = ?", (username, target)
+        ))
+
+    def following_count(self, username):
+        return self.db.stat(username, "following")
+
+    def followers_count(self, username):
+        return self.db.stat(username, "followers")
+
+    def mutuals(self, username):
+        rows = self.db.query(
+            "SELECT a.followee FROM follows a JOIN follows b "
+            "ON b.follower = a.followee AND b.followee = a.follower WHERE a.follower = ?",
+            (username,),
+        )
+        return {row[0] for row in rows}
+
+    def ensure_user(self, username):
+        self.db.execute("INSERT OR IGNORE INTO graph_users VALUES (?)", (username,))
+
+    def ensure_users(self, usernames):
+        with self.db.transaction() as conn:
+            conn.executemany("INSERT OR IGNORE INTO graph_users VALUES (?)", ((username,) for username in usernames))
+
+    def follow(self, username, target):
+        self.ensure_user(username)
+        return self.db.execute("INSERT OR IGNORE INTO follows VALUES (?, ?)", (username, target)) == 1
+
+    def follow_many(self, edges):
+        edges = list(edges)
+        with self.db.transaction() as conn:
+            conn.executemany("INSERT OR IGNORE INTO graph_users VALUES (?)", ((username,) for username, _ in edges))
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO follows VALUES (?, ?)", edges)
+            return conn.total_changes - before
+
+    def edges(self, batch=SCAN_BATCH):
+        last = ("", "")
+        while True:
+            rows = self.db.query(
+                "SELECT follower, followee FROM follows WHERE (follower, followee) > (?, ?) "
+                "ORDER BY follower, followee LIMIT ?",
+                last + (batch,),
+            )
+            yield from rows
+            if len(rows) < batch:
+                return
+            last = rows[-1]
+
+    def unfollow(self, username, target):
+        return self.db.execute(
+            "DELETE FROM follows WHERE follower = ? AND followee = ?", (username, target)
+        ) == 1
+
+
+def _low(start):
+    return -(2 ** 63) if start is None else start
+
+
+def _high(end):
+    return 2 ** 63 - 1 if end is None else end
+
+
+def migrate(db, data_dir=DATA_DIR):
+    """Bulk-import users.json, posts.json (+ posts.log) and followers.json in ONE transaction."""
+    # The JSON stores already know how to read + upgrade old files (ids, ts, journal)
+    from Repository import FollowerStore, PostStore, UserStore
+
+    users = UserStore(os.path.join(data_dir, "users.json")).data()
+    posts = PostStore(os.path.join(data_dir, "posts.json")).data()
+    graph = FollowerStore(os.path.join(data_dir, "followers.json")).data()
+
+    with db.transaction() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?, ?, ?)",
+            (tuple(user.get(column) for column in USER_COLUMNS) for user in users),
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO posts VALUES (?, ?, ?, ?, ?, ?)",
+            (tuple(post.get(column) for column in POST_COLUMNS) for post in posts),
+        )
+        conn.executemany("INSERT OR IGNORE INTO graph_users VALUES (?)", ((user,) for user in graph))
+        conn.executemany(
+            "INSERT OR IGNORE INTO follows VALUES (?, ?)",
+            ((follower, followee) for follower, followees in graph.items() for followee in followees),
+        )
+        db.recount(conn)  # INSERT OR REPLACE of existing posts counted them twice
+    return len(users), len(posts), sum(len(followees) for followees in graph.values())
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="SQLite backend for Mini Social Network")
+    parser.add_argument("--migrate", action="store_true", help="import the JSON files in Data/ into the database")
+    parser.add_argument("--db", default=DB_PATH, help=f"database file (default {DB_PATH})")
+    args = parser.parse_args()
+    if args.migrate:
+        n_users, n_posts, n_edges = migrate(SqliteBackend(args.db))
+        print(f"✔ Imported {n_users} users, {n_posts} posts and {n_edges} follows into {args.db}")
+        print("Run the app with MSN_BACKEND=sqlite to use it.")
+    else:
+        parser.print_help()
@@ -0,0 +1,184 @@
+"""
+Storage.py – the store interface that User, Post and Social_Network talk to
+
+There are two implementations:
+    - "json"   : Repository.py, the files in Data/ (default)
+    - "sqlite" : Sqlite_Store.py, one Data/social.db in WAL mode
+
+Pick one with the MSN_BACKEND environment variable:
+    MSN_BACKEND=sqlite python main.py
+
+Move existing JSON data into SQLite (one transaction):
+    python Sqlite_Store.py --migrate
+"""
+import os
+
+DATA_DIR = "Data"
+BACKEND = os.environ.get("MSN_BACKEND", "json")
+
+
+class UserStoreBase:
+    def data(self):
+        """Every user record as a list (loads everything, avoid in hot paths)."""
+        raise NotImplementedError
+
+    def get(self, username):
+        """User record (dict) or None."""
+        raise NotImplementedError
+
+    def exists(self, username):
+        return self.get(username) is not None
+
+    def add(self, record):
+        raise NotImplementedError
+
+    def add_many(self, records):
+        """Bulk add, skipping usernames that already exist. Returns the number added."""
+        added = 0
+        for record in records:
+            if not self.exists(record["username"]):
+                self.add(record)
+                added += 1
+        return added
+
+    def update(self, username, fields):
+        """Change some fields of an existing user (e.g. a re-hashed password)."""
+        raise NotImplementedError
+
+    def usernames(self):
+        raise NotImplementedError
+
+    def count(self):
+        raise NotImplementedError
+
+    def scan(self):
+        """Yield every user record, for exports (backends may page through them)."""
+        yield from self.data()
+
+
+class PostStoreBase:
+    """Posts have an integer "id" that grows with creation time (0, 1, 2, ...)."""
+
+    def data(self):
+        """Every post as a list, list index == post id (loads everything)."""
+        raise NotImplementedError
+
+    def add(self, record):
+        """Store one post, sets record["id"] and returns it."""
+        raise NotImplementedError
+
+    def add_many(self, records):
+        """Bulk add (ids are assigned in order), returns the ids."""
+        return [self.add(record) for record in records]
+
+    def get(self, post_id):
+        raise NotImplementedError
+
+    def get_many(self, post_ids):
+        """Posts for the given ids, in the same order."""
+        return [self.get(post_id) for post_id in post_ids]
+
+    def count(self):
+        raise NotImplementedError
+
+    def authors(self):
+        raise NotImplementedError
+
+    def ids_by_author(self, username):
+        """Post ids of one author, oldest first."""
+        raise NotImplementedError
+
+    def ids_between(self, username, start=None, end=None):
+        """Ids of username's posts with start <= ts < end."""
+        raise NotImplementedError
+
+    def since(self, start, authors=None, end=None):
+        """Posts with start <= ts < end by `authors` (default everyone), newest first."""
+        raise NotImplementedError
+
+    def by_author(self, username):
+        return self.get_many(self.ids_by_author(username))
+
+    def latest_by_author(self, username, limit):
+        """The newest `limit` posts of one author, oldest first (reads only those)."""
+        return self.get_many(self.ids_by_author(username)[-limit:])
+
+    def count_by_author(self, username):
+        return len(self.ids_by_author(username))
+
+    def newest(self, before=None):
+        """Yield (post id, author) newest first, only ids < before if given."""
+        raise NotImplementedError
+
+    def scan(self):
+        """Yield every post, oldest first, for exports."""
+        yield from self.data()
+
+    def compact(self):
+        """Housekeeping hook (fold logs, checkpoint...). Returns True if it did work."""
+        return False
+
+    def start_compactor(self, *args, **kwargs):
+        pass
+
+
+class FollowerStoreBase:
+    def data(self):
+        """{user: [followees]} like followers.json (loads everything)."""
+        raise NotImplementedError
+
+    def users(self):
+        """Every user that appears in the follower graph."""
+        raise NotImplementedError
+
+    def following(self, username):
+        """Set of users `username` follows."""
+        raise NotImplementedError
+
+    def followers_of(self, username):
+        """Set of users following `username`."""
+        raise NotImplementedError
+
+    def is_following(self, username, target):
+        return target in self.following(username)
+
+    def following_count(self, username):
+        return len(self.following(username))
+
+    def followers_count(self, username):
+        return len(self.followers_of(username))
+
+    def mutuals(self, username):
+        """Users that `username` follows AND that follow `username` back."""
+        return self.following(username) & self.followers_of(username)
+
+    def ensure_user(self, username):
+        raise NotImplementedError
+
+    def ensure_users(self, usernames):
+        for username in usernames:
+            self.ensure_user(username)
+
+    def follow(self, username, target):
+        """Returns False if the edge already existed."""
+        raise NotImplementedError
+
+    def follow_many(self, edges):
+        """Bulk follow for (username, target) pairs, returns the number of new edges."""
+        return sum(self.follow(username, target) for username, target in edges)
+
+    def edges(self):
+        """Yield every (follower, followee), for exports."""
+        for username, followees in self.data().items():
+            for followee in followees:
+                yield username, followee
+
+    def unfollow(self, username, target):
+        """Returns False if there was no such edge."""
+        raise NotImplementedError
+
+    def compact(self):
+        return False
+
+    def start_compactor(self, *args, **kwargs):
+        pass
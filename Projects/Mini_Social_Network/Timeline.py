@@ -0,0 +1,201 @@
+"""
+Timeline.py – materialized per-user timelines (fan-out on write)
+
+Instead of building the feed from ALL posts on every "View Feed", each user has
+a small file Data/timelines/<username>.txt with the ids of the latest posts of
+the people they follow (and their own), one id per line, oldest first.
+
+    create post  -> push its id into the timeline of the author + every follower
+    view feed    -> read the last `limit` ids of ONE file
+
+Celebrity accounts (more than CELEBRITY_THRESHOLD followers) are NOT fanned out,
+pushing one post into a million files is too slow. Their posts are merged in
+when the feed is read (fan-out on read). When a follow / unfollow moves an
+author across the threshold, their followers' timelines are rebuilt.
+
+Every process of the app writes these files, so writes hold Data/timelines.lock.
+
+Rebuild all timelines from existing data:
+    python Timeline.py --rebuild
+"""
+import heapq
+import os
+import shutil
+import tempfile
+from bisect import bisect_left
+import threading
+from urllib.parse import quote
+
+import Repository as repo
+from Write_Coordinator import FileLock
+
+TIMELINE_DIR = os.path.join(repo.DATA_DIR, "timelines")
+TIMELINE_CAP = 800           # ids kept per user
+CELEBRITY_THRESHOLD = 1000   # followers above which an author is read-time merged
+
+
+class TimelineCache:
+    def __init__(self, directory=TIMELINE_DIR, cap=TIMELINE_CAP, celebrity_threshold=CELEBRITY_THRESHOLD):
+        self.directory = directory
+        self.cap = cap
+        self.celebrity_threshold = celebrity_threshold
+        self._lengths = {}  # username -> number of lines in their file
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(directory + ".lock")  # other processes push into the same files
+
+    def _path(self, username):
+        # NOTE: quote() so a username like "../x" can't escape the directory
+        return os.path.join(self.directory, quote(username, safe="") + ".txt")
+
+    def _ensure_built(self):
+        """Rebuild from Data/ the first time. Returns True if it did."""
+        if os.path.isdir(self.directory):
+            return False
+        with self._file_lock:
+            if os.path.isdir(self.directory):
+                return False  # another process built it while we waited
+            self.rebuild()
+        return True
+
+    def is_celebrity(self, username):
+        return repo.followers.followers_count(username) > self.celebrity_threshold
+
+    # ---------- write side ----------
+    def _push(self, username, post_id):
+        path = self._path(username)
+        with open(path, "a+b") as file:
+            # The last id in the file: enough to know if post_id goes at the end
+            file.seek(max(0, file.seek(0, os.SEEK_END) - 24))
+            tail = file.read().split()
+            in_order = not tail or int(tail[-1]) < post_id
+            if in_order:
+                file.write(f"{post_id}\n".encode())
+        if not in_order:
+            # NOTE: another thread/process fanned out a newer post first; insert
+            # in place so the file stays sorted (feed_ids bisects and merges it)
+            ids = self._read_ids(username)
+            i = bisect_left(ids, post_id)
+            if i == len(ids) or ids[i] != post_id:
+                ids.insert(i, post_id)
+                self._write_ids(username, ids)
+            return
+        length = self._lengths.get(username)
+        if length is None:
+            length = len(self._read_ids(username))
+        else:
+            length += 1
+        self._lengths[username] = length
+        # Keep the file bounded: trim back to `cap` once it doubles
+        if length > 2 * self.cap:
+            self._write_ids(username, self._read_ids(username)[-self.cap:])
+
+    def fan_out(self, post_id, author):
+        """Called right after a post is stored."""
+        with self._lock, self._file_lock:
+            if self._ensure_built():
+                return  # the rebuild already picked this post up
+            self._push(author, post_id)
+            if self.is_celebrity(author):
+                return
+            for follower in repo.followers.followers_of(author):
+                self._push(follower, post_id)
+
+    # ---------- read side ----------
+    def _read_ids(self, username):
+        try:
+            with open(self._path(username), "r") as file:
+                # NOTE: a line without its newline is an append still being written
+                ids = [int(line) for line in file if line.endswith("\n")]
+        except FileNotFoundError:
+            return []
+        # NOTE: _push keeps the file sorted (under the file lock), sort() is only
+        # a safety net for files written before that and is O(n) on sorted input
+        ids.sort()
+        return ids
+
+    def _write_ids(self, username, ids):
+        fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        with os.fdopen(fd, "w") as file:
+            file.writelines(f"{post_id}\n" for post_id in ids)
+        os.replace(tmp, self._path(username))
+        self._lengths[username] = len(ids)
+
+    def feed_ids(self, username, limit, before=None):
+        """Newest `limit` post ids (older than `before`) of username's followed feed, newest first."""
+        with self._lock:
+            self._ensure_built()
+            sources = [reversed(_older_than(self._read_ids(username), before)[-limit:])]
+        # Fan-out on read for celebrities this user follows
+        for followee in repo.followers.following(username):
+            if self.is_celebrity(followee):
+                sources.append(reversed(_older_than(repo.posts.ids_by_author(followee), before)[-limit:]))
+        # Post ids grow with time, so merging by id == merging by creation time.
+        # An id can come twice (pushed before its author became a celebrity)
+        page = []
+        for post_id in heapq.merge(*sources, reverse=True):
+            if not page or page[-1] != post_id:
+                page.append(post_id)
+                if len(page) == limit:
+                    break
+        return page
+
+    def is_complete(self, username):
+        """False if the timeline may have been trimmed (older posts are not in it)."""
+        with self._lock:
+            # NOTE: counted from the file, another process may have trimmed it
+            length = self._lengths[username] = len(self._read_ids(username))
+            return length < self.cap
+
+    # ---------- rebuild ----------
+    def refresh(self, username):
+        """Re-materialize one timeline, e.g. after a follow/unfollow."""
+        with self._lock, self._file_lock:
+            self._ensure_built()
+            self.rebuild_user(username)
+
+    def refresh_followers(self, author):
+        """Re-materialize the timeline of everyone following author, e.g. after they
+        crossed CELEBRITY_THRESHOLD (their posts move between fan-out on write and on read)."""
+        with self._lock, self._file_lock:
+            if self._ensure_built():
+                return
+            for follower in repo.followers.followers_of(author):
+                self.rebuild_user(follower)
+
+    def rebuild_user(self, username):
+        authors = {username} | {f for f in repo.followers.following(username) if not self.is_celebrity(f)}
+        ids = heapq.merge(*(repo.posts.ids_by_author(a)[-self.cap:] for a in authors))
+        self._write_ids(username, list(ids)[-self.cap:])
+
+    def invalidate(self):
+        """Drop every timeline (e.g. after a bulk import), they are rebuilt on first use."""
+        with self._lock, self._file_lock:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self._lengths.clear()
+
+    def rebuild(self):
+        with self._file_lock:
+            os.makedirs(self.directory, exist_ok=True)
+            usernames = set(repo.users.usernames()) | set(repo.followers.users())
+            for username in usernames:
+                self.rebuild_user(username)
+            return len(usernames)
+
+
+def _older_than(ids, before):
+    return ids if before is None else ids[:bisect_left(ids, before)]
+
+
+timelines = TimelineCache()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Materialized timelines for Mini Social Network")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild every timeline from Data/")
+    args = parser.parse_args()
+    if args.rebuild:
+        print(f"✔ Rebuilt {timelines.rebuild()} timelines in {timelines.directory}")
+    else:
+        parser.print_help()
@@ -0,0 +1,61 @@
+"""
+Timestamp.py – machine timestamps for users and posts
+
+created_at used to be only strftime("(%c)"), e.g. "(Wed Sep  3 19:24:28 2025)".
+Sorting that string is wrong ("Fri" < "Wed") and you can't binary-search it.
+Now every record also stores
+    "ts": epoch nanoseconds (int, UTC based, sortable)
+and created_at stays as the display string.
+"""
+import time
+from datetime import datetime, timezone
+
+DISPLAY_FORMAT = "(%c)"
+LEGACY_FORMATS = ("%a %b %d %H:%M:%S %Y", "%c")
+
+
+def now_ns():
+    return time.time_ns()
+
+
+def display(ts):
+    """Same look as the old created_at strings."""
+    return time.strftime(DISPLAY_FORMAT, time.localtime(ts / 1e9))
+
+
+def to_iso(ts):
+    return datetime.fromtimestamp(ts / 1e9, tz=timezone.utc).isoformat()
+
+
+def parse_legacy(text):
+    """'(Wed Sep  3 19:24:28 2025)' (local time) -> epoch ns, None if it can't be parsed."""
+    text = text.strip().strip("()").strip()
+    for fmt in LEGACY_FORMATS:
+        try:
+            parsed = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        return int(time.mktime(parsed.timetuple())) * 1_000_000_000
+    return None
+
+
+def parse_user_input(text):
+    """
+    For "posts since X" style queries: accepts ISO dates ('2025-09-03',
+    '2025-09-03T19:24') in local time, or the legacy created_at format.
+    """
+    try:
+        parsed = datetime.fromisoformat(text.strip())
+    except ValueError:
+        return parse_legacy(text)
+    if parsed.tzinfo is None:
+        parsed = parsed.astimezone()  # treat naive input as local time
+    return int(parsed.timestamp() * 1_000_000_000)
+
+
+def ensure_ts(record):
+    """Migration helper: add "ts" to an old record, parsing created_at once."""
+    if "ts" not in record:
+        record["ts"] = parse_legacy(record.get("created_at", "")) or 0
+        return True
+    return False
@@ -0,0 +1,139 @@
+"""
+Username_Index.py – prefix and typo-tolerant username lookup for "Search User"
+
+Two in-memory indexes over the (case-folded) usernames:
+    1. sorted array + bisect      -> prefix autocompletion ("dh" -> Dharmil, Dhruvi)
+    2. deletion neighbourhood     -> one-typo matches ("Nihra" -> Nihar)
+       Every username is stored under itself and every string you get by
+       deleting ONE character. A query looks up itself and its own one-char
+       deletes, so a missing, extra, wrong or swapped letter still meets the
+       username in the middle. That's ~len(query) dict lookups, no scan.
+       (A BK-tree was tried first: in pure Python it visits too many nodes.)
+Candidates are then ranked by real Levenshtein distance.
+
+Both are built lazily from the user store and kept up to date by User.register.
+"""
+import threading
+from bisect import bisect_left, bisect_right
+
+import Repository as repo
+
+MAX_DISTANCE = 2  # edit distance still shown as "did you mean"
+
+
+def levenshtein(a, b, limit=MAX_DISTANCE):
+    """Edit distance, or limit + 1 as soon as it's clear it will be bigger."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _variants(key):
+    """The key itself plus every one-character delete of it."""
+    return {key} | {key[:i] + key[i + 1:] for i in range(len(key))}
+
+
+class UsernameIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = None    # sorted case-folded usernames
+        self._names = None   # original usernames, same order as _keys
+        self._ids = None     # username -> id
+        self._all = None     # id -> username
+        self._deletes = None  # hash(variant) -> id or [ids]
+
+    # ---------- building ----------
+    def _ensure_prefix(self):
+        if self._keys is None:
+            pairs = sorted((name.casefold(), name) for name in repo.users.usernames())
+            self._keys = [key for key, _ in pairs]
+            self._names = [name for _, name in pairs]
+
+    def _add_deletes(self, user_id, name):
+        # NOTE: hash() keys instead of the strings themselves, ~9 variants per
+        # user would otherwise mean millions of small strings in memory.
+        # A (very rare) collision only adds a candidate, Levenshtein removes it.
+        for variant in _variants(name.casefold()):
+            key = hash(variant)
+            bucket = self._deletes.get(key)
+            if bucket is None:
+                self._deletes[key] = user_id
+            elif isinstance(bucket, int):
+                self._deletes[key] = [bucket, user_id]
+            else:
+                bucket.append(user_id)
+
+    def _ensure_fuzzy(self):
+        if self._deletes is None:
+            self._all = list(repo.users.usernames())
+            self._ids = {name: i for i, name in enumerate(self._all)}
+            self._deletes = {}
+            for user_id, name in enumerate(self._all):
+                self._add_deletes(user_id, name)
+
+    def add(self, username):
+        """Called by User.register, only touches indexes that are already built."""
+        with self._lock:
+            if self._keys is not None:
+                key = username.casefold()
+                position = bisect_right(self._keys, key)
+                self._keys.insert(position, key)
+                self._names.insert(position, username)
+            if self._deletes is not None and username not in self._ids:
+                self._ids[username] = len(self._all)
+                self._all.append(username)
+                self._add_deletes(self._ids[username], username)
+
+    # ---------- queries ----------
+    def prefix(self, text, limit=10):
+        """Usernames starting with `text` (case-insensitive), alphabetical."""
+        key = text.casefold()
+        with self._lock:
+            self._ensure_prefix()
+            start = bisect_left(self._keys, key)
+            found = []
+            for i in range(start, len(self._keys)):
+                if len(found) == limit or not self._keys[i].startswith(key):
+                    break
+                found.append(self._names[i])
+            return found
+
+    def fuzzy(self, text, limit=10, max_distance=MAX_DISTANCE):
+        """[(username, distance), ...] closest first, for roughly one typo."""
+        key = text.casefold()
+        with self._lock:
+            self._ensure_fuzzy()
+            candidates = set()
+            for variant in _variants(key):
+                bucket = self._deletes.get(hash(variant))
+                if bucket is None:
+                    continue
+                if isinstance(bucket, int):
+                    candidates.add(bucket)
+                else:
+                    candidates.update(bucket)
+            names = [self._all[i] for i in candidates]
+        ranked = ((name, levenshtein(key, name.casefold(), max_distance)) for name in names)
+        return sorted((pair for pair in ranked if pair[1] <= max_distance), key=lambda p: (p[1], p[0]))[:limit]
+
+    def search(self, text, limit=10):
+        """Exact match first, then prefix completions, then typo matches."""
+        text = text.strip()
+        if not text:
+            return []
+        results = [text] if repo.users.exists(text) else []
+        for name in self.prefix(text, limit) + [name for name, _ in self.fuzzy(text, limit)]:
+            if name not in results:
+                results.append(name)
+        return results[:limit]
+
+
+username_index = UsernameIndex()
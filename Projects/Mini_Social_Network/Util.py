@@ -1,67 +1,184 @@
-import json
-import hashlib
 from colorama import Fore, Style
 from Post import Post
 from Social_Network import Social_Network as sn
+import Credentials
+import Repository as repo
+from Engagement import engagement
+from Hashtags import tag_index
+from Notifications import FOLLOW, MENTION, notifications
+import Timestamp
+from Username_Index import username_index
 
 def check_username(username):
-    data = load_users()
-    return any(user['username'] == username for user in data)
+    return repo.users.exists(username)
 
-def login_verification(username, password):
-    data = load_users()
-    hashed_password = hashlib.sha256(password.encode()).hexdigest()
-    user = next((u for u in data if u['username'] == username and u['password'] == hashed_password), None)
+def login_verification(username, password, use_pool=False):
+    """use_pool=True runs the KDF on Credentials' process pool (for servers)."""
+    user = repo.users.get(username)
+    if user is None:
+        return None
+    if use_pool:
+        ok, needs_rehash = Credentials.verify_async(password, user['password']).result()
+    else:
+        ok, needs_rehash = Credentials.verify_password(password, user['password'])
+    if not ok:
+        return None
+    if needs_rehash:
+        # Legacy SHA-256 (or weaker) hash -> upgrade it now that we know the password
+        repo.users.update(username, {"password": Credentials.hash_password(password)})
+        user = repo.users.get(username)
     return user
 
+# NOTE: load_* return the cached data from Repository, treat it as read-only.
 @staticmethod
 def load_users():
-    try:
-        with open("Data/users.json", "r") as file:
-            data = json.load(file)
-    except (FileNotFoundError,json.JSONDecodeError):
-        data = []
-    return data
+    return repo.users.data()
 
 @staticmethod
 def load_posts():
-    try:
-        with open("Data/posts.json", "r") as file:
-            data = json.load(file)
-    except (FileNotFoundError,json.JSONDecodeError):
-        data = []
-    return data
+    return repo.posts.data()
 
 @staticmethod
 def load_followers():
-    try:
-        with open("Data/followers.json", "r") as file:
-            data = json.load(file)
-    except (FileNotFoundError,json.JSONDecodeError):
-        data = []
-    return data
+    return repo.followers.data()
 
 @staticmethod
 def search_user(username):
-    data = load_users()
-    for user in data:
-        if user['username'] == username:
-            return user
+    return repo.users.get(username)
+
+def search_users(text):
+    """Ranked usernames for "Search User": exact match, prefix completions, one-typo matches."""
+    return username_index.search(text)
 
-def display_feed(feed):
+def pick_user(text):
+    """Exact match right away, otherwise let the user pick from the candidates."""
+    matches = search_users(text)
+    if not matches:
+        return None
+    if matches[0] == text:
+        return search_user(text)
+    print("🤔 Did you mean:")
+    for idx, name in enumerate(matches, 1):
+        print(f"   {idx}. {name}")
+    choice = input("Pick a number (press Enter to cancel): ").strip()
+    if choice.isdigit() and 1 <= int(choice) <= len(matches):
+        return search_user(matches[int(choice) - 1])
+    return None
+
+def display_feed(current_user, order="recent"):
+    """Stream the feed one page at a time instead of printing every post."""
     print("=" * 100)
-    print("{:^100}".format(f"{Fore.LIGHTWHITE_EX}📢 SOCIAL FEED"))
+    print("{:^100}".format(f"{Fore.LIGHTWHITE_EX}{'🔥 POPULAR IN THE LAST HOUR' if order == 'popular' else '📢 SOCIAL FEED'}"))
     print("=" * 100)
 
+    feed, cursor = sn.get_feed(current_user, order=order)
     if not feed:
         print("{:^100}".format("😕 No posts to show yet..."))
         print("=" * 100)
         return
 
-    for idx, post in enumerate(feed, start=1):
-        print(f"   {Fore.GREEN}{Style.BRIGHT}👤 {post.username}{Style.RESET_ALL}   |   {Fore.MAGENTA}{post.created_at}{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}{idx}. {Style.RESET_ALL}{Fore.LIGHTWHITE_EX}🏷 {post.title} - {Fore.LIGHTWHITE_EX}{Style.BRIGHT}{post.content}{Style.RESET_ALL}")
+    idx = 1
+    shown = []  # post ids by number on screen, for liking
+    while True:
+        counts = engagement.counts(list(feed.ids))
+        for i in range(len(feed)):  # feed is a PostBatch, no Post object per row
+            username, title, content, created_at = feed.row(i)
+            likes, views = counts[i]
+            print(f"   {Fore.GREEN}{Style.BRIGHT}👤 {username}{Style.RESET_ALL}   |   {Fore.MAGENTA}{created_at}{Style.RESET_ALL}"
+                  f"   |   ❤ {likes}  👁 {views}")
+            print(f"{Fore.CYAN}{idx}. {Style.RESET_ALL}{Fore.LIGHTWHITE_EX}🏷 {title} - {Fore.LIGHTWHITE_EX}{Style.BRIGHT}{content}{Style.RESET_ALL}")
+            print("-" * 100)
+            idx += 1
+        engagement.view(feed.ids)
+        shown += feed.ids
+        if cursor is None:
+            print("{:^100}".format("✔ You're all caught up!"))
+        while True:
+            choice = input("Post number to like / unlike" + (", Enter for more posts" if cursor else "")
+                           + " (0 to go back): ").strip()
+            if not choice.isdigit() or not 1 <= int(choice) <= len(shown):
+                break
+            toggle_like(current_user, shown[int(choice) - 1])
+        if choice == "0" or cursor is None:
+            break
+        feed, cursor = sn.get_feed(current_user, cursor=cursor)
+
+
+def toggle_like(current_user, post_id):
+    if engagement.like(post_id, current_user.username):
+        print("❤ Liked!")
+    else:
+        engagement.unlike(post_id, current_user.username)
+        print("💔 Like removed.")
+
+
+def display_search_results(query):
+    # "#python" alone -> the hashtag index, newest first (Hashtags.py)
+    is_tag = query.startswith("#") and len(query.split()) == 1
+    results = Post.get_by_hashtag(query) if is_tag else Post.search(query)[0]
+    print("=" * 100)
+    print("{:^100}".format(f"{Fore.LIGHTWHITE_EX}🔎 RESULTS FOR: {query}"))
+    print("=" * 100)
+    if not results:
+        print("{:^100}".format("😕 No posts matched your search..."))
+        print("=" * 100)
+        return
+    for i in range(len(results)):
+        username, title, content, created_at = results.row(i)
+        print(f"   {Fore.GREEN}{Style.BRIGHT}👤 {username}{Style.RESET_ALL}   |   {Fore.MAGENTA}{created_at}{Style.RESET_ALL}")
+        print(f"{Fore.CYAN}{i + 1}. {Style.RESET_ALL}{Fore.LIGHTWHITE_EX}🏷 {title} - {Fore.LIGHTWHITE_EX}{Style.BRIGHT}{content}{Style.RESET_ALL}")
         print("-" * 100)
+
+def display_trending(current_user):
+    print("\n" + "=" * 40)
+    print("📈 TRENDING (last hour)")
+    print("=" * 40)
+    trending = tag_index.trending(10)
+    if not trending:
+        print("Nothing trending yet, add a #hashtag to your next post!")
+    for idx, (tag, uses) in enumerate(trending, 1):
+        print(f"{idx}. #{tag}  (~{uses} posts)")
+    print("-" * 40)
+    mentions = Post.get_mentions(current_user.username, 5)
+    if mentions:
+        print("📣 Mentioning you:")
+        for i in range(len(mentions)):
+            username, title, content, created_at = mentions.row(i)
+            print(f"   {Fore.GREEN}{username}{Style.RESET_ALL} {Fore.MAGENTA}{created_at}{Style.RESET_ALL}: {content}")
+        print("-" * 40)
+    print('Tip: search "#tag" to see its posts')
+
+
+def display_notifications(current_user):
+    print("\n" + "=" * 40)
+    print("🔔 NOTIFICATIONS")
+    print("=" * 40)
+    latest = notifications.latest(current_user.username, 20)
+    if not latest:
+        print("Nothing here yet.")
+    for item in latest:
+        dot = f"{Fore.CYAN}●{Style.RESET_ALL}" if item["unread"] else " "
+        when = Timestamp.display(item["ts"])
+        if item["kind"] == FOLLOW:
+            print(f"{dot} 👤 {item['from']} started following you {Fore.MAGENTA}{when}{Style.RESET_ALL}")
+        elif item["kind"] == MENTION:
+            print(f"{dot} 📣 {item['from']} mentioned you in a post {Fore.MAGENTA}{when}{Style.RESET_ALL}")
+    print("-" * 40)
+    notifications.mark_all_read(current_user.username)
+
+
+def display_suggestions(current_user):
+    print("\n" + "=" * 40)
+    print("👥 SUGGESTED USERS")
+    print("=" * 40)
+    suggestions = sn.suggested_users(current_user)
+    if not suggestions:
+        print("No suggestions yet, follow a few people first!")
+    for idx, (username, mutual) in enumerate(suggestions, 1):
+        people = "person" if mutual == 1 else "people"
+        print(f"{idx}. {username}  ({mutual} {people} you follow follow them)")
+    print("-" * 40)
+
 """
 Exception classes
 """
@@ -75,6 +192,9 @@ def display_profile(current_user,searched_user):
     print("=" * 40)
     print(f"Age: {searched_user.age}")
     print(f"Bio: {searched_user.bio if searched_user.bio else 'No bio added yet.'}")
+    followers, following = sn.follow_counts(searched_user)
+    print(f"📝 {Post.count_by_username(searched_user.username)} posts   "
+          f"👥 {followers} followers   ➡ {following} following")
     print("-" * 40)
 
     # Determine current follow state
@@ -83,11 +203,12 @@ def display_profile(current_user,searched_user):
         print(f"[1] {action} this user")
         print("[0] Go Back")
         print("=" * 40 + "\n")
-    posts = Post.get_post_by_username(searched_user.username)
+    posts = Post.get_latest_by_username(searched_user.username, 5)  # reads 5 posts, not all of them
     if posts:
         print("📜 Recent Posts:")
-        for idx, post in enumerate(posts[-5:], 1):  # last 5 posts
-            print(f"{idx}. {post.title} – {post.content} (Posted on: {post.created_at})")
+        for idx, i in enumerate(range(len(posts)), 1):
+            _, title, content, created_at = posts.row(i)
+            print(f"{idx}. {title} – {content} (Posted on: {created_at})")
     else:
         print("No posts yet.")
     print("-" * 40)
@@ -0,0 +1,157 @@
+"""
+Validation.py – JSON-schema checks for users and posts, compiled once
+
+jsonschema.validate(instance, schema) looks up the validator class, checks the
+SCHEMA itself and builds a new validator on every call. Here both schemas are
+checked and compiled into a Draft7Validator once, the first time one is needed.
+
+    validate_user(record) / validate_post(record)  -> raises ValidationError (same as before)
+    errors(record, kind)                           -> every error message of one record
+    validate_many(records, kind)                   -> [(index, [messages])] for the bad ones
+validate_many is for bulk imports: a bad record doesn't stop the batch, and
+each one reports all its problems at once, not just the first.
+
+Even a compiled Draft7Validator is ~60 µs per record, too slow for a million
+records. So each schema is also turned into a plain Python function (generated
+source, exec'd once) that only does type() / `in` / `<` checks. It answers
+"definitely valid" or "not sure"; only the "not sure" records go to Draft7.
+
+Importing jsonschema takes ~100 ms (more than the rest of the app together),
+so it is only imported then: a valid record never loads it. The errors are
+this module's ValidationError, not jsonschema's, for the same reason.
+"""
+import threading
+
+
+class ValidationError(ValueError):
+    """A record doesn't match its schema. .message like jsonschema's, .path = where."""
+
+    def __init__(self, message, path=()):
+        super().__init__(message)
+        self.message = message
+        self.path = tuple(path)
+
+user_schema = {
+    "type": "object",
+    "properties": {
+        "username": {"type": "string"},
+        "password": {"type": "string"},
+        "age": {"type": "number", "minimum": 0},
+        "bio": {"type": "string"},
+        "created_at": {"type": "string"},
+        "ts": {"type": "integer"}
+    },
+    "required": ["username", "password", "age", "bio", "created_at"]
+}
+
+post_schema = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "content": {"type": "string"},
+        "username": {"type": "string"},
+        "created_at": {"type": "string"},
+        "id": {"type": "integer", "minimum": 0},
+        "ts": {"type": "integer"},
+    },
+    "required": ['content', 'username', 'created_at']
+}
+
+_PY_TYPES = {"string": "str", "integer": "int", "boolean": "bool", "object": "dict", "array": "list"}
+
+
+def compile_fast_check(schema):
+    """
+    Generate `def fast_check(record) -> bool` for a flat object schema. True means
+    valid for sure, False means "ask Draft7" (e.g. 1.0 is a valid integer there).
+    Returns None if the schema uses keywords this generator doesn't know.
+    """
+    if set(schema) - {"type", "properties", "required"} or schema.get("type") != "object":
+        return None
+    lines = ["def fast_check(r):", "    if type(r) is not dict: return False"]
+    for key in schema.get("required", ()):
+        lines.append(f"    if {key!r} not in r: return False")
+    for key, prop in schema.get("properties", {}).items():
+        if set(prop) - {"type", "minimum"} or prop.get("type", "string") not in _PY_TYPES.keys() | {"number"}:
+            return None
+        kind = prop.get("type")
+        conditions = []
+        if kind == "number":
+            conditions.append("(type(v) is not int and type(v) is not float)")
+        elif kind:
+            conditions.append(f"type(v) is not {_PY_TYPES[kind]}")
+        if "minimum" in prop:
+            conditions.append(f"v < {prop['minimum']!r}")
+        if conditions:
+            lines.append(f"    v = r.get({key!r}, _MISSING)")
+            lines.append(f"    if v is not _MISSING and ({' or '.join(conditions)}): return False")
+    lines.append("    return True")
+    namespace = {"_MISSING": object()}
+    exec("\n".join(lines), namespace)
+    return namespace["fast_check"]
+
+
+SCHEMAS = {"user": user_schema, "post": post_schema}
+_validators = {}
+_validators_lock = threading.Lock()
+
+
+def validator(kind):
+    """The compiled Draft7Validator for "user" / "post" (imports jsonschema the first time)."""
+    if kind not in _validators:
+        with _validators_lock:
+            if kind not in _validators:
+                from jsonschema import Draft7Validator
+                Draft7Validator.check_schema(SCHEMAS[kind])
+                _validators[kind] = Draft7Validator(SCHEMAS[kind])
+    return _validators[kind]
+
+
+def _not_sure(record):
+    return False
+
+
+FAST_CHECKS = {kind: compile_fast_check(schema) or _not_sure for kind, schema in SCHEMAS.items()}
+
+
+def _message(error):
+    where = ".".join(str(part) for part in error.absolute_path)
+    return f"{where}: {error.message}" if where else error.message
+
+
+def validate(record, kind):
+    """Raise the most relevant ValidationError, like jsonschema.validate()."""
+    if FAST_CHECKS[kind](record):
+        return
+    from jsonschema.exceptions import best_match
+    error = best_match(validator(kind).iter_errors(record))
+    if error is not None:
+        raise ValidationError(error.message, error.absolute_path)
+
+
+def validate_user(record):
+    validate(record, "user")
+
+
+def validate_post(record):
+    validate(record, "post")
+
+
+def is_valid(record, kind):
+    return FAST_CHECKS[kind](record) or validator(kind).is_valid(record)
+
+
+def errors(record, kind):
+    """All error messages of one record ([] if it's valid)."""
+    return [_message(error) for error in validator(kind).iter_errors(record)]
+
+
+def validate_many(records, kind):
+    """[(index, [messages]), ...] for every invalid record; valid ones cost one fast check."""
+    fast_check = FAST_CHECKS[kind]
+    problems = []
+    for index, record in enumerate(records):
+        if not fast_check(record) and not validator(kind).is_valid(record):
+            problems.append((index, [_message(error) for error in validator(kind).iter_errors(record)]))
+    return problems
+
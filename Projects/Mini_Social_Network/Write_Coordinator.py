@@ -0,0 +1,206 @@
+"""
+Write_Coordinator.py – one writer at a time, across threads AND processes
+
+A write to a JSON store is read-modify-write: look at the current data (e.g.
+"the next post id is len(posts)"), change it, write it back. Two writers that
+both read before either writes lose an update, the same race as `x += 1` in
+Day-32/MultiThreading3.py, only between processes. So every write goes:
+    1. into this process's queue, drained by ONE writer thread per store
+    2. which holds an exclusive fcntl.flock on <store>.lock while it
+    3. reloads the store (picks up what other processes wrote), applies the
+       change and commits it (journal write + fsync, or temp file + os.replace)
+Readers never take the lock: os.replace swaps files atomically and the journal
+reader skips half-written lines.
+
+Group commit: the writer thread doesn't commit after every write. It takes
+whatever arrives within `window` seconds (or up to `max_batch` writes), runs
+them all under one lock, then calls the store's commit() ONCE -> one write +
+one fsync for the whole batch. Every caller waits on a Future that resolves
+only after that commit, so a returned write is a durable write.
+    window = 0       -> no waiting, batch only what is already queued (lowest latency)
+    window = 0.005   -> up to 5 ms extra latency, much bigger batches under load
+batch_sizes counts batches per size bucket (see stats()).
+
+Bulk imports use exclusive(): the CALLING thread holds the lock for the whole
+import, its writes run inline (no queue, no Future per write) and are only
+committed at checkpoint() / the end. Other writers simply wait.
+
+The SQLite backend doesn't need this, it uses BEGIN IMMEDIATE transactions.
+On Windows (no fcntl) only the threads of one process are coordinated.
+"""
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+GROUP_COMMIT_WINDOW = 0  # seconds the writer waits for more writes after the first (0: only what is queued)
+GROUP_COMMIT_MAX_BATCH = 256
+
+
+class FileLock:
+    """Exclusive advisory lock on a file, re-entrant for the thread holding it."""
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def acquire(self):
+        self._thread_lock.acquire()
+        if self._depth == 0 and fcntl is not None:
+            # NOTE: flock is per open file, so other threads must wait on _thread_lock first
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        self._depth += 1
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def _bucket(size):
+    """1, 2-3, 4-7, 8-15, ... (powers of two)"""
+    low = 1 << (size.bit_length() - 1)
+    return str(low) if low == 1 else f"{low}-{2 * low - 1}"
+
+
+class WriteCoordinator:
+    """
+    Single writer thread per store; run(fn) executes fn under the file lock and
+    returns once commit() has made the batch it was part of durable.
+    """
+
+    def __init__(self, lock_path, commit=None, window=GROUP_COMMIT_WINDOW, max_batch=GROUP_COMMIT_MAX_BATCH):
+        self.lock_path = lock_path
+        self.commit = commit
+        self.window = window
+        self.max_batch = max_batch
+        self.batch_sizes = Counter()  # bucket -> number of batches
+        self.batches = self.writes = 0
+        self._owner = None  # thread inside exclusive()
+        self._start_lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.lock = FileLock(self.lock_path)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = os.getpid()
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self._reset()  # forked child: the parent's writer thread doesn't exist here
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            done = []  # (future, result, error)
+            with self.lock:
+                for fn, future in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        done.append((future, fn(), None))
+                    except BaseException as e:
+                        done.append((future, None, e))
+                commit_error = None
+                try:
+                    if self.commit is not None:
+                        self.commit()
+                except BaseException as e:
+                    commit_error = e  # nothing of this batch is durable
+
+            self.batches += 1
+            self.writes += len(done)
+            self.batch_sizes[_bucket(len(batch))] += 1
+            for future, result, error in done:
+                error = error or commit_error
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+    def submit(self, fn):
+        """Queue fn for the writer thread, returns a Future with its result."""
+        # NOTE: imported on the first write, concurrent.futures pulls in logging (~10 ms at startup)
+        from concurrent.futures import Future
+
+        self._ensure_started()
+        future = Future()
+        self._queue.put((fn, future))
+        return future
+
+    def run(self, fn):
+        """Run fn as a write and wait until it is committed."""
+        if threading.current_thread() in (self._thread, self._owner):
+            return fn()  # a write that calls another write of the same store (follow -> ensure_user)
+        return self.submit(fn).result()
+
+    @contextmanager
+    def exclusive(self):
+        """
+        Hold the lock in this thread, e.g. for a bulk import:
+            with store.writer.exclusive() as writer:
+                for chunk in chunks:
+                    store.add_many(chunk)   # runs inline
+                    writer.checkpoint()     # optional, commit what we have so far
+        Whatever was written is committed when the block ends (even on an error,
+        every write that returned was applied completely).
+        """
+        with self.lock:
+            self._owner = threading.current_thread()
+            try:
+                yield self
+            finally:
+                try:
+                    self.checkpoint()
+                finally:
+                    self._owner = None
+
+    def checkpoint(self):
+        """Inside exclusive(): commit the writes made so far."""
+        if self._owner is not threading.current_thread():
+            raise RuntimeError("checkpoint() outside of exclusive()")
+        if self.commit is not None:
+            self.commit()
+
+    def stats(self):
+        """Batch-size histogram, e.g. {"batches": 120, "writes": 4000, "mean_batch": 33.3, "histogram": {...}}"""
+        histogram = dict(sorted(self.batch_sizes.items(), key=lambda item: int(item[0].split("-")[0])))
+        return {"batches": self.batches, "writes": self.writes,
+                "mean_batch": round(self.writes / self.batches, 1) if self.batches else 0.0,
+                "histogram": histogram}
@@ -2,15 +2,20 @@
 Main.py for user input and operation perform
 """
 from colorama import Fore, Style, init
-from time1 import strftime
+from Lazy_Import import lazy_import
+import Timestamp
 from user import User
-import hashlib
-import Util as ut
-import Post as p
-from Social_Network import Social_Network as sn
+import Repository as repo
 
+# NOTE: run on first use (see Lazy_Import.py), the welcome menu doesn't wait for them
+Credentials = lazy_import("Credentials")
+ut = lazy_import("Util")
+p = lazy_import("Post")
+network = lazy_import("Social_Network")
+Session = lazy_import("Session")
 
-def mainMenu(user):
+
+def mainMenu(user, token=None):
     init(autoreset=True)
     while True:
         print("\n" + "=" * 125)
@@ -21,7 +26,13 @@ def mainMenu(user):
         print("{:^50} {:<10} {:<10}".format(" ", "2.", "✏️ Create Post"))
         print("{:^50} {:<10} {:<10}".format(" ", "3.", "🔍 Search User"))
         print("{:^50} {:<10} {:<10}".format(" ", "4.", "👤 View Profile"))
-        print("{:^50} {:<10} {:<10}".format(" ", "5.", Fore.RED + "🚪 Logout" + Style.RESET_ALL))
+        print("{:^50} {:<10} {:<10}".format(" ", "5.", "👥 Suggested Users"))
+        print("{:^50} {:<10} {:<10}".format(" ", "6.", "🔎 Search Posts"))
+        print("{:^50} {:<10} {:<10}".format(" ", "7.", "🔥 Popular Posts"))
+        print("{:^50} {:<10} {:<10}".format(" ", "8.", "📈 Trending"))
+        unread = ut.notifications.unread(user.username)
+        print("{:^50} {:<10} {:<10}".format(" ", "9.", "🔔 Notifications" + (f" ({unread} new)" if unread else "")))
+        print("{:^50} {:<10} {:<10}".format(" ", "10.", Fore.RED + "🚪 Logout" + Style.RESET_ALL))
 
         print("\n" + "=" * 125 + "\n")
 
@@ -29,21 +40,21 @@ def mainMenu(user):
             choice = int(input("Enter your choice : "))
             match choice:
                 case 1:
-                    feed = sn.get_feed(user)
-                    ut.display_feed(feed)
+                    ut.display_feed(user)
                 case 2:
                     print("\n📝 --- Create a New Post --- 📝\n")
                     title = input("🖊️ Title: ").strip()
                     content = input("🗒️ Content: ").strip()
-                    created_at = strftime("(%c)")
-                    Post = p.Post(title, content, user.username, created_at)
+                    ts = Timestamp.now_ns()
+                    Post = p.Post(title, content, user.username, Timestamp.display(ts), ts)
                     Post.create_post()
                     print("✔ Post created successfully!!")
                 case 3:
                     print("\n🔍 --- Search for a User --- 🔍\n")
                     FindUser = input("👤 Enter the username to search: ").strip()
-                    searched_user = User.from_dict(ut.search_user(FindUser))
-                    if searched_user:
+                    found = ut.pick_user(FindUser)
+                    if found:
+                        searched_user = User.from_dict(found)
                         print("✔ User found!!")
                         ut.display_profile(user, searched_user)
                     else:
@@ -52,14 +63,33 @@ def mainMenu(user):
                     print("\n👤 --- View Profile --- 👤\n")
                     ut.display_profile(user, user)
                 case 5:
+                    ut.display_suggestions(user)
+                case 6:
+                    print("\n🔎 --- Search Posts --- 🔎")
+                    print('Tip: use "quotes" for a phrase, OR for either word, #tag for a hashtag\n')
+                    query = input("🔎 Search: ").strip()
+                    ut.display_search_results(query)
+                case 7:
+                    ut.display_feed(user, order="popular")
+                case 8:
+                    ut.display_trending(user)
+                case 9:
+                    ut.display_notifications(user)
+                case 10:
                     print("🚪 Logging out...")
+                    if token:
+                        Session.sessions.revoke(token)
                     break
                 case _:
-                    print("⚠️ Please enter a number between 1 and 5!")
+                    print("⚠️ Please enter a number between 1 and 10!")
         except ValueError:
             print("⚠️ Invalid input! Please enter a number.")
 
 
+# Fold Data/posts.log and Data/followers.log into their JSON snapshots in the background
+repo.posts.start_compactor()
+repo.followers.start_compactor()
+
 print("═" * 125, "\n")
 print(f"{Style.BRIGHT + '🙏🏻  WELCOME TO MINI SOCIAL NETWORK  🌐' + Style.RESET_ALL:^{135}}", "\n")
 print("═" * 125)
@@ -106,7 +136,7 @@ while Flag:
                 else:
                     print("✔ Password created successfully!")
                     break
-            hashed_password = hashlib.sha256(password.encode()).hexdigest()
+            hashed_password = Credentials.hash_password(password)
             while (True):
                 try:
                     age = int(input("Please enter your age : "))
@@ -119,12 +149,13 @@ while Flag:
                     print(e)
 
             bio = input("📝 Please enter your bio (press Enter to skip): ")
-            created_at = strftime("(%c)")
-            user = User(username, hashed_password, age, bio, created_at)
+            ts = Timestamp.now_ns()
+            created_at = Timestamp.display(ts)
+            user = User(username, hashed_password, age, bio, created_at, ts)
             user.register()
             print(f"🎉 Your account was created successfully! ({created_at})")
-            sn.update_followers(user)
-            mainMenu(user)
+            network.Social_Network.update_followers(user)
+            mainMenu(user, Session.sessions.issue(user))
             pass
         case 2:
             print("Login")
@@ -132,10 +163,10 @@ while Flag:
             password = input("🔑 Please enter your password for login: ").strip()
             user = ut.login_verification(username, password)
             if user:
-                user_login = User(user['username'], user['password'], user['age'], user['bio'], user['created_at'])
+                user_login = User.from_dict(user)
                 user_login.login()
                 print("✔ Login Successful")
-                mainMenu(user_login)
+                mainMenu(user_login, Session.sessions.issue(user_login))
             else:
                 print("✖ Login Failed! Please try again")
         case 3:
@@ -1,30 +1,22 @@
 """
 This is user.py for user data and user operation
 """
-from jsonschema import validate
-from jsonschema.exceptions import ValidationError
-import json
-from Util import load_users
+import Repository as repo
+import Timestamp
+from Username_Index import username_index
+from Validation import ValidationError, user_schema, validate_user  # user_schema: kept importable from here
 
-user_schema = {
-    "type": "object",
-    "properties": {
-        "username": {"type": "string"},
-        "password": {"type": "string"},
-        "age": {"type": "number", "minimum": 0},
-        "bio": {"type": "string"},
-        "created_at": {"type": "string"}
-    },
-    "required": ["username","password","age","bio","created_at"]
-}
 
 class User:
-    def __init__(self,username,password,age,bio,created_at):
+    __slots__ = ("username", "password", "age", "bio", "created_at", "ts", "valid", "is_logged_in")
+
+    def __init__(self,username,password,age,bio,created_at,ts=None):
         self.username = username
         self.password = password
         self.age = age
         self.bio = bio
         self.created_at = created_at
+        self.ts = ts if ts is not None else Timestamp.parse_legacy(created_at)
         self.valid = False
 
     @classmethod
@@ -34,7 +26,8 @@ class User:
             password=data.get("password", ""),  # empty for safety
             age=data.get("age", None),
             bio=data.get("bio", ""),
-            created_at=data.get("created_at", "")
+            created_at=data.get("created_at", ""),
+            ts=data.get("ts")
         )
 
     def login(self):
@@ -43,23 +36,22 @@ class User:
 
     # Registration
     def register(self):
-        file_data = load_users()
         data = {
             "username": self.username,
             "password": self.password,
             "age": self.age,
             "bio": self.bio,
-            "created_at": self.created_at
+            "created_at": self.created_at,
+            "ts": self.ts or 0
         }
         try:
-            validate(instance=data, schema=user_schema)
+            validate_user(data)
             self.valid = True
         except ValidationError as e:
             print(f"❌ Invalid Format: {e.message}")
 
         if self.valid:
-            file_data.append(data)
-            with open("Data/users.json", "w") as file:
-                json.dump(file_data, file, indent=4)
+            repo.users.add(data)
+            username_index.add(self.username)
         else:
             print("There is some problem in formating, please try again.")